@@ -9,7 +9,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app.database.base import Base
-from app.models import user, ambulance, hospital, personnel, mission, maintenance
+from app.models import user, ambulance, hospital, personnel, mission, maintenance, location, analytics, cache
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,43 @@
+"""Index des requêtes chaudes missions / flotte
+
+Revision ID: a3f1c2d4e5b6
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c2d4e5b6'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (nom, table, colonnes) : mêmes noms que ceux générés par les modèles (index=True / Index)
+INDEXES = [
+    ("ix_missions_status_priority_created_at", "missions", ["status", "priority", "created_at"]),
+    ("ix_missions_ambulance_id", "missions", ["ambulance_id"]),
+    ("ix_missions_hospital_id", "missions", ["hospital_id"]),
+    ("ix_ambulances_status", "ambulances", ["status"]),
+    ("ix_ambulances_updated_at", "ambulances", ["updated_at"]),
+]
+
+
+def _existing_indexes(table: str) -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    # Les bases créées par init_db (create_all) après ce changement ont déjà ces index
+    for name, table, columns in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
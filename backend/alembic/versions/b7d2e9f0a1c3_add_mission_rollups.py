@@ -0,0 +1,46 @@
+"""Agrégats horaires/journaliers des missions
+
+Revision ID: b7d2e9f0a1c3
+Revises: a3f1c2d4e5b6
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e9f0a1c3'
+down_revision = 'a3f1c2d4e5b6'
+branch_labels = None
+depends_on = None
+
+PRIORITIES = ("CRITIQUE", "URGENTE", "NORMALE", "FAIBLE")
+STATUSES = ("EN_ATTENTE", "ASSIGNEE", "EN_COURS", "TERMINEE", "ANNULEE")
+
+
+def upgrade() -> None:
+    # Les tables vides se remplissent ensuite avec scripts/backfill_mission_rollups.py
+    op.create_table(
+        "mission_count_rollups",
+        sa.Column("granularity", sa.String(5), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(), primary_key=True),
+        sa.Column("priority", sa.Enum(*PRIORITIES, name="missionpriority"), primary_key=True),
+        sa.Column("status", sa.Enum(*STATUSES, name="missionstatus"), primary_key=True),
+        sa.Column("missions", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "mission_metric_rollups",
+        sa.Column("granularity", sa.String(5), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(), primary_key=True),
+        sa.Column("priority", sa.Enum(*PRIORITIES, name="missionpriority"), primary_key=True),
+        sa.Column("metric", sa.String(30), primary_key=True),
+        sa.Column("bin", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("mission_metric_rollups")
+    op.drop_table("mission_count_rollups")
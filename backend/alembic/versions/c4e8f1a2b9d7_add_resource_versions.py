@@ -0,0 +1,29 @@
+"""Versions partagées du cache de lecture
+
+Revision ID: c4e8f1a2b9d7
+Revises: b7d2e9f0a1c3
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8f1a2b9d7'
+down_revision = 'b7d2e9f0a1c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Les lignes sont créées à la première écriture de chaque ressource
+    op.create_table(
+        "resource_versions",
+        sa.Column("resource", sa.String(30), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("resource_versions")
@@ -1,37 +1,113 @@
-from typing import Generator
+from typing import Generator, Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.security import verify_token
-from app.database.base import get_db
-from app.models.user import User
+from app.core.config import settings
+from app.core.security import decode_token
+from app.database.base import SessionLocal, get_db, get_async_db
 from app.crud.user import get_user_by_username
+from app.crud.aio import user as crud_user_async
+from app.services.principal_cache import Principal, principal_cache
 
 security = HTTPBearer()
 
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _cached_principal(token: str) -> Tuple[Optional[str], Optional[Principal]]:
+    """Résoudre le token sans base : cache des principaux, puis claims du token si activés"""
+    payload = decode_token(token)
+    username = payload.get("sub") if payload else None
+    if username is None:
+        return None, None
+    principal = principal_cache.get(username)
+    if principal is None and settings.AUTH_TOKEN_CLAIMS:
+        principal = Principal.from_claims(payload)
+    return username, principal
+
 def get_current_user(
     db: Session = Depends(get_db),
     credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
-    token = credentials.credentials
-    username = verify_token(token)
+) -> Principal:
+    username, principal = _cached_principal(credentials.credentials)
     if username is None:
+        raise _credentials_exception()
+    if principal is None:
+        generation = principal_cache.generation
+        user = get_user_by_username(db, username=username)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.put(principal, generation)
+    return principal
+
+def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+def get_admin_user(current_user: Principal = Depends(get_current_active_user)) -> Principal:
+    if current_user.role != "admin":
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
         )
-    user = get_user_by_username(db, username=username)
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return current_user
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_admin_or_regulateur_user(current_user: Principal = Depends(get_current_active_user)) -> Principal:
+    if current_user.role not in ["admin", "regulateur"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
+
+def user_from_token(token: Optional[str]) -> Optional[Principal]:
+    """Authentifier un flux longue durée (SSE/WebSocket) sans garder de session ouverte pendant la connexion"""
+    username, principal = _cached_principal(token) if token else (None, None)
+    if username is None:
+        return None
+    if principal is None:
+        generation = principal_cache.generation
+        db = SessionLocal()
+        try:
+            user = get_user_by_username(db, username=username)
+        finally:
+            db.close()
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.put(principal, generation)
+    return principal if principal.is_active else None
+
+# Variantes async (mode DB_ASYNC_MODE) : aucune dépendance ne passe par le threadpool
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    username, principal = _cached_principal(credentials.credentials)
+    if username is None:
+        raise _credentials_exception()
+    if principal is None:
+        generation = principal_cache.generation
+        user = await crud_user_async.get_user_by_username(db, username=username)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.put(principal, generation)
+    return principal
+
+async def get_current_active_user_async(current_user: Principal = Depends(get_current_user_async)) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_admin_user_async(current_user: Principal = Depends(get_current_active_user_async)) -> Principal:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -39,10 +115,10 @@ def get_admin_user(current_user: User = Depends(get_current_active_user)) -> Use
         )
     return current_user
 
-def get_admin_or_regulateur_user(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_admin_or_regulateur_user_async(current_user: Principal = Depends(get_current_active_user_async)) -> Principal:
     if current_user.role not in ["admin", "regulateur"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user
\ No newline at end of file
+    return current_user
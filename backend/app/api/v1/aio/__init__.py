@@ -0,0 +1 @@
+# Async API v1 endpoints package
\ No newline at end of file
@@ -0,0 +1,193 @@
+import time
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.base import get_async_db
+from app.api.deps import get_current_active_user_async, get_admin_user_async, get_admin_or_regulateur_user_async
+from app.crud.aio import ambulance as crud_ambulance
+from app.crud.ambulance import AMBULANCE_FIELDSETS
+from app.crud.fieldsets import InvalidFields
+from app.crud.pagination import InvalidCursor
+from app.schemas.ambulance import Ambulance, AmbulanceCreate, AmbulanceUpdate, AmbulanceLocation, AmbulanceNearest, AmbulancePage
+from app.schemas.ambulance import AmbulanceBulkCreate, AmbulanceLocationBatch, AmbulanceLocationBatchResult
+from app.models.ambulance import AmbulanceStatus
+from app.models.user import User
+from app.schemas.bulk import BulkCreateResult
+from app.services.spatial_index import ambulance_index
+from app.core.config import settings
+from app.services.fast_json import dumps
+from app.services.read_cache import read_cache
+
+router = APIRouter()
+
+@router.get("/", response_model=List[Ambulance])
+async def read_ambulances(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description="Projection : summary, map ou champs séparés par des virgules"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    try:
+        projection = AMBULANCE_FIELDSETS.resolve(fields)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    read, response = read_cache.lookup(request, ("ambulances",))
+    if response is not None:
+        return response
+    if fields or settings.FAST_JSON_LISTS:
+        return read_cache.store_json(read, dumps(await crud_ambulance.get_ambulances_rows(db, skip=skip, limit=limit, projection=projection)))
+    return read_cache.store(read, List[Ambulance], await crud_ambulance.get_ambulances(db, skip=skip, limit=limit))
+
+@router.get("/page", response_model=AmbulancePage)
+async def read_ambulances_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    status: Optional[AmbulanceStatus] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    try:
+        ambulances, next_cursor = await crud_ambulance.get_ambulances_page(
+            db, cursor=cursor, limit=limit, descending=order == "desc", status=status
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": ambulances, "next_cursor": next_cursor, "limit": limit}
+
+@router.get("/available", response_model=List[Ambulance])
+async def read_available_ambulances(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Projection : summary, map ou champs séparés par des virgules"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    try:
+        projection = AMBULANCE_FIELDSETS.resolve(fields)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    read, response = read_cache.lookup(request, ("ambulances",))
+    if response is not None:
+        return response
+    if fields or settings.FAST_JSON_LISTS:
+        return read_cache.store_json(read, dumps(await crud_ambulance.get_available_ambulances_rows(db, projection=projection)))
+    return read_cache.store(read, List[Ambulance], await crud_ambulance.get_available_ambulances(db))
+
+@router.get("/nearest", response_model=List[AmbulanceNearest])
+async def read_nearest_ambulances(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    # Servi depuis l'index spatial en mémoire, sans requête sur la flotte
+    return [
+        AmbulanceNearest(
+            id=entry.id,
+            plate_number=entry.plate_number,
+            status=entry.status,
+            latitude=entry.latitude,
+            longitude=entry.longitude,
+            distance_km=round(distance, 3)
+        )
+        for entry, distance in ambulance_index.nearest(lat, lon, k=k)
+    ]
+
+@router.post("/", response_model=Ambulance)
+async def create_ambulance(
+    ambulance: AmbulanceCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_or_regulateur_user_async)
+):
+    db_ambulance = await crud_ambulance.get_ambulance_by_plate(db, plate_number=ambulance.plate_number)
+    if db_ambulance:
+        raise HTTPException(status_code=400, detail="Plate number already registered")
+    return await crud_ambulance.create_ambulance(db=db, ambulance=ambulance)
+
+@router.post("/bulk", response_model=BulkCreateResult)
+async def bulk_create_ambulances(
+    batch: AmbulanceBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_user_async)
+):
+    """Chargement d'une flotte : INSERT ensemblistes par lots de BULK_INSERT_CHUNK_SIZE, une transaction par lot"""
+    conflicts = await crud_ambulance.conflicting_plates(db, batch.items)
+    if conflicts:
+        raise HTTPException(status_code=400, detail=f"Plate numbers duplicated or already registered: {', '.join(conflicts[:20])}")
+    return await crud_ambulance.bulk_create_ambulances(db, ambulances=batch.items)
+
+@router.get("/{ambulance_id}", response_model=Ambulance)
+async def read_ambulance(
+    ambulance_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    db_ambulance = await crud_ambulance.get_ambulance(db, ambulance_id=ambulance_id)
+    if db_ambulance is None:
+        raise HTTPException(status_code=404, detail="Ambulance not found")
+    return db_ambulance
+
+@router.put("/{ambulance_id}", response_model=Ambulance)
+async def update_ambulance(
+    ambulance_id: int,
+    ambulance_update: AmbulanceUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_or_regulateur_user_async)
+):
+    db_ambulance = await crud_ambulance.update_ambulance(db, ambulance_id=ambulance_id, ambulance_update=ambulance_update)
+    if db_ambulance is None:
+        raise HTTPException(status_code=404, detail="Ambulance not found")
+    return db_ambulance
+
+@router.post("/locations", response_model=AmbulanceLocationBatchResult)
+async def ingest_ambulance_locations(
+    batch: AmbulanceLocationBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    # Ingestion groupée des positions GPS : une seule écriture ensembliste par lot
+    start = time.perf_counter()
+    stats = await crud_ambulance.ingest_location_fixes(db, fixes=batch.fixes)
+    duration = time.perf_counter() - start
+    return AmbulanceLocationBatchResult(
+        **stats,
+        duration_ms=round(duration * 1000, 3),
+        fixes_per_second=round(stats["ingested"] / duration, 1) if duration > 0 else 0.0
+    )
+
+@router.put("/{ambulance_id}/location", response_model=Ambulance)
+async def update_ambulance_location(
+    ambulance_id: int,
+    location: AmbulanceLocation,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    db_ambulance = await crud_ambulance.update_ambulance_location(db, ambulance_id=ambulance_id, location=location)
+    if db_ambulance is None:
+        raise HTTPException(status_code=404, detail="Ambulance not found")
+    return db_ambulance
+
+@router.put("/{ambulance_id}/status", response_model=Ambulance)
+async def update_ambulance_status(
+    ambulance_id: int,
+    status: AmbulanceStatus,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_or_regulateur_user_async)
+):
+    db_ambulance = await crud_ambulance.update_ambulance_status(db, ambulance_id=ambulance_id, status=status)
+    if db_ambulance is None:
+        raise HTTPException(status_code=404, detail="Ambulance not found")
+    return db_ambulance
+
+@router.delete("/{ambulance_id}")
+async def delete_ambulance(
+    ambulance_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_or_regulateur_user_async)
+):
+    success = await crud_ambulance.delete_ambulance(db, ambulance_id=ambulance_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Ambulance not found")
+    return {"message": "Ambulance deleted successfully"}
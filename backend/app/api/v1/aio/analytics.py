@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.base import get_async_db
+from app.api.deps import get_current_active_user_async
+from app.api.v1.endpoints.analytics import analytics_window
+from app.crud.aio import analytics as crud_analytics
+from app.models.mission import MissionPriority
+from app.models.user import User
+from app.schemas.analytics import MissionCounts, MissionMetric
+from app.services.analytics import METRIC_UNITS, count_series, metric_series
+
+router = APIRouter()
+
+@router.get("/missions/counts", response_model=MissionCounts)
+async def read_mission_counts(
+    window: Tuple[str, datetime, datetime] = Depends(analytics_window),
+    priority: Optional[MissionPriority] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    granularity, start, end = window
+    rows = await crud_analytics.get_count_rollups(db, granularity, start, end, priority=priority)
+    return {"granularity": granularity, "start": start, "end": end, "buckets": count_series(granularity, start, end, rows)}
+
+@router.get("/missions/metrics", response_model=MissionMetric)
+async def read_mission_metric(
+    metric: str = Query("duration", pattern="^(duration|assignment_latency)$"),
+    window: Tuple[str, datetime, datetime] = Depends(analytics_window),
+    priority: Optional[MissionPriority] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    granularity, start, end = window
+    rows = await crud_analytics.get_metric_rollups(db, metric, granularity, start, end, priority=priority)
+    summary, buckets = metric_series(metric, granularity, start, end, rows)
+    return {
+        "metric": metric, "unit": METRIC_UNITS[metric], "granularity": granularity,
+        "start": start, "end": end, "summary": summary, "buckets": buckets
+    }
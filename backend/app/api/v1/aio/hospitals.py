@@ -0,0 +1,90 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.database.base import get_async_db
+from app.api.deps import get_current_active_user_async, get_admin_user_async
+from app.api.v1.endpoints.hospitals import recommendations
+from app.crud.aio import hospital as crud_hospital
+from app.schemas.hospital import Hospital, HospitalBulkCreate, HospitalCreate, HospitalUpdate, HospitalRecommendation
+from app.models.mission import MissionPriority
+from app.models.user import User
+from app.schemas.bulk import BulkCreateResult
+from app.services.hospital_snapshot import hospital_snapshot, refresh_hospital_snapshot
+
+router = APIRouter()
+
+@router.get("/", response_model=List[Hospital])
+async def read_hospitals(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    return await crud_hospital.get_hospitals(db, skip=skip, limit=limit)
+
+@router.get("/recommend", response_model=List[HospitalRecommendation])
+async def recommend_hospitals(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    condition: Optional[str] = Query(None, max_length=100),
+    priority: Optional[MissionPriority] = None,
+    k: int = Query(5, ge=1, le=50),
+    max_distance_km: Optional[float] = Query(None, gt=0),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    if hospital_snapshot.stale:
+        # Rechargement (rare) par le moteur synchrone, hors de la boucle d'événements
+        await run_in_threadpool(refresh_hospital_snapshot)
+    return recommendations(hospital_snapshot, lat, lon, condition, priority, k, max_distance_km)
+
+@router.post("/", response_model=Hospital)
+async def create_hospital(
+    hospital: HospitalCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_user_async)
+):
+    return await crud_hospital.create_hospital(db=db, hospital=hospital)
+
+@router.post("/bulk", response_model=BulkCreateResult)
+async def bulk_create_hospitals(
+    batch: HospitalBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_user_async)
+):
+    """Chargement du référentiel : INSERT ensemblistes par lots de BULK_INSERT_CHUNK_SIZE, une transaction par lot"""
+    return await crud_hospital.bulk_create_hospitals(db, hospitals=batch.items)
+
+@router.get("/{hospital_id}", response_model=Hospital)
+async def read_hospital(
+    hospital_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    db_hospital = await crud_hospital.get_hospital(db, hospital_id=hospital_id)
+    if db_hospital is None:
+        raise HTTPException(status_code=404, detail="Hospital not found")
+    return db_hospital
+
+@router.put("/{hospital_id}", response_model=Hospital)
+async def update_hospital(
+    hospital_id: int,
+    hospital_update: HospitalUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_user_async)
+):
+    db_hospital = await crud_hospital.update_hospital(db, hospital_id=hospital_id, hospital_update=hospital_update)
+    if db_hospital is None:
+        raise HTTPException(status_code=404, detail="Hospital not found")
+    return db_hospital
+
+@router.delete("/{hospital_id}")
+async def delete_hospital(
+    hospital_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_user_async)
+):
+    success = await crud_hospital.delete_hospital(db, hospital_id=hospital_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Hospital not found")
+    return {"message": "Hospital deleted successfully"}
@@ -0,0 +1,249 @@
+import time
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.base import AsyncSessionLocal, get_async_db
+from app.api.deps import get_current_active_user_async, get_admin_user_async, get_admin_or_regulateur_user_async
+from app.crud.aio import mission as crud_mission
+from app.crud.mission import MISSION_EXPANSIONS, MISSION_FIELDSETS, read_resources
+from app.crud.fieldsets import InvalidFields, parse_expand
+from app.crud.aio.bulk import missing_ids
+from app.crud.pagination import InvalidCursor
+from app.schemas.mission import Mission, MissionBulkCreate, MissionCreate, MissionUpdate, MissionAssignment, MissionPage, DispatchResult, MissionQueue, MISSION_EXPANSION_SCHEMAS
+from app.models.ambulance import Ambulance
+from app.models.hospital import Hospital
+from app.models.mission import MissionPriority, MissionStatus
+from app.models.user import User
+from app.schemas.bulk import BulkCreateResult
+from app.core.config import settings
+from app.services.mission_queue import mission_queue
+from app.services.export import EXPORT_FORMATS, stream_export_async
+from app.services.fast_json import dumps
+from app.services.read_cache import read_cache
+
+router = APIRouter()
+
+@router.get("/", response_model=List[Mission])
+async def read_missions(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description="Projection : summary, map ou champs séparés par des virgules"),
+    expand: Optional[str] = Query(None, description="Relations à inclure : ambulance, hospital"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    try:
+        projection = MISSION_FIELDSETS.resolve(fields)
+        expansions = parse_expand(expand, MISSION_EXPANSIONS)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if fields and expansions:
+        raise HTTPException(status_code=400, detail="fields and expand cannot be combined")
+    read, response = read_cache.lookup(request, read_resources(expansions))
+    if response is not None:
+        return response
+    if fields or (settings.FAST_JSON_LISTS and not expansions):
+        return read_cache.store_json(read, dumps(await crud_mission.get_missions_rows(db, skip=skip, limit=limit, projection=projection)))
+    return read_cache.store(read, List[MISSION_EXPANSION_SCHEMAS[expansions]], await crud_mission.get_missions(db, skip=skip, limit=limit, expand=expansions))
+
+@router.post("/bulk", response_model=BulkCreateResult)
+async def import_missions(
+    batch: MissionBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_user_async)
+):
+    """Reprise de missions d'un autre système (historique compris) par lots ; sans événements temps réel"""
+    unknown_hospitals = await missing_ids(db, Hospital, (m.hospital_id for m in batch.items))
+    if unknown_hospitals:
+        raise HTTPException(status_code=400, detail=f"Unknown hospital ids: {', '.join(map(str, unknown_hospitals[:20]))}")
+    unknown_ambulances = await missing_ids(db, Ambulance, (m.ambulance_id for m in batch.items if m.ambulance_id is not None))
+    if unknown_ambulances:
+        raise HTTPException(status_code=400, detail=f"Unknown ambulance ids: {', '.join(map(str, unknown_ambulances[:20]))}")
+    return await crud_mission.import_missions(db, missions=batch.items)
+
+@router.get("/page", response_model=MissionPage)
+async def read_missions_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    status: Optional[MissionStatus] = None,
+    priority: Optional[MissionPriority] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    try:
+        missions, next_cursor = await crud_mission.get_missions_page(
+            db, cursor=cursor, limit=limit, descending=order == "desc", status=status, priority=priority,
+            created_from=created_from, created_to=created_to
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": missions, "next_cursor": next_cursor, "limit": limit}
+
+async def export_batches(**filters) -> AsyncIterator[Sequence]:
+    # Session propre au flux : celle de get_async_db est fermée avant l'envoi du corps (FastAPI >= 0.106)
+    async with AsyncSessionLocal() as db:
+        async for batch in crud_mission.stream_missions(db, batch_size=settings.EXPORT_BATCH_SIZE, **filters):
+            yield batch
+
+@router.get("/export")
+async def export_missions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[MissionStatus] = None,
+    priority: Optional[MissionPriority] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: User = Depends(get_current_active_user_async)
+):
+    started_at = time.perf_counter()
+    batches = export_batches(status=status, priority=priority, created_from=created_from, created_to=created_to)
+    return StreamingResponse(
+        stream_export_async(format, batches, started_at),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="missions.{format}"'}
+    )
+
+@router.get("/active", response_model=List[Mission])
+async def read_active_missions(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Projection : summary, map ou champs séparés par des virgules"),
+    expand: Optional[str] = Query(None, description="Relations à inclure : ambulance, hospital"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    try:
+        projection = MISSION_FIELDSETS.resolve(fields)
+        expansions = parse_expand(expand, MISSION_EXPANSIONS)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if fields and expansions:
+        raise HTTPException(status_code=400, detail="fields and expand cannot be combined")
+    read, response = read_cache.lookup(request, read_resources(expansions))
+    if response is not None:
+        return response
+    if fields or (settings.FAST_JSON_LISTS and not expansions):
+        return read_cache.store_json(read, dumps(await crud_mission.get_active_missions_rows(db, projection=projection)))
+    return read_cache.store(read, List[MISSION_EXPANSION_SCHEMAS[expansions]], await crud_mission.get_active_missions(db, expand=expansions))
+
+@router.get("/status/{status}", response_model=List[Mission])
+async def read_missions_by_status(
+    status: MissionStatus,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    missions = await crud_mission.get_missions_by_status(db, status=status)
+    return missions
+
+@router.post("/", response_model=Mission)
+async def create_mission(
+    mission: MissionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_or_regulateur_user_async)
+):
+    return await crud_mission.create_mission(db=db, mission=mission)
+
+@router.get("/queue", response_model=MissionQueue)
+async def read_mission_queue(
+    limit: int = Query(20, ge=1, le=500),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    now = datetime.utcnow()
+    return {
+        "size": len(mission_queue),
+        "items": [
+            {"id": entry.id, "priority": entry.priority, "created_at": entry.created_at,
+             "waiting_seconds": round(max(0.0, (now - entry.created_at).total_seconds()), 3)}
+            for entry in mission_queue.peek(limit)
+        ]
+    }
+
+@router.post("/queue/claim", response_model=Mission)
+async def claim_next_mission(
+    assignment: MissionAssignment,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_or_regulateur_user_async)
+):
+    db_mission = await crud_mission.claim_next_mission(db, assignment=assignment)
+    if db_mission is None:
+        raise HTTPException(status_code=404, detail="No pending mission")
+    return db_mission
+
+@router.post("/dispatch", response_model=DispatchResult)
+async def dispatch_missions(
+    dry_run: bool = False,
+    max_distance_km: Optional[float] = Query(None, gt=0),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_or_regulateur_user_async)
+):
+    return await crud_mission.dispatch_pending_missions(db, max_distance_km=max_distance_km, dry_run=dry_run)
+
+@router.get("/{mission_id}", response_model=Mission)
+async def read_mission(
+    mission_id: int,
+    expand: Optional[str] = Query(None, description="Relations à inclure : ambulance, hospital"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    try:
+        expansions = parse_expand(expand, MISSION_EXPANSIONS)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    db_mission = await crud_mission.get_mission(db, mission_id=mission_id, expand=expansions)
+    if db_mission is None:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    if expansions:
+        # Sérialisé ici : response_model (Mission) retirerait les relations incluses
+        return read_cache.store(None, MISSION_EXPANSION_SCHEMAS[expansions], db_mission)
+    return db_mission
+
+@router.put("/{mission_id}", response_model=Mission)
+async def update_mission(
+    mission_id: int,
+    mission_update: MissionUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_or_regulateur_user_async)
+):
+    db_mission = await crud_mission.update_mission(db, mission_id=mission_id, mission_update=mission_update)
+    if db_mission is None:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    return db_mission
+
+@router.post("/{mission_id}/assign", response_model=Mission)
+async def assign_mission(
+    mission_id: int,
+    assignment: MissionAssignment,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_or_regulateur_user_async)
+):
+    db_mission = await crud_mission.assign_mission(db, mission_id=mission_id, assignment=assignment)
+    if db_mission is None:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    return db_mission
+
+@router.put("/{mission_id}/status", response_model=Mission)
+async def update_mission_status(
+    mission_id: int,
+    status: MissionStatus,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    db_mission = await crud_mission.update_mission_status(db, mission_id=mission_id, status=status)
+    if db_mission is None:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    return db_mission
+
+@router.delete("/{mission_id}")
+async def delete_mission(
+    mission_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_admin_or_regulateur_user_async)
+):
+    success = await crud_mission.delete_mission(db, mission_id=mission_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    return {"message": "Mission deleted successfully"}
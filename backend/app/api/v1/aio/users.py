@@ -0,0 +1,107 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.base import get_async_db
+from app.api.deps import get_current_active_user_async, get_admin_user_async
+from app.crud.aio import user as crud_user
+from app.crud.pagination import InvalidCursor
+from app.schemas.user import User, UserCreate, UserUpdate, UserPage
+from app.models.user import User as UserModel, UserRole
+from app.core.config import settings
+from app.services.fast_json import dumps
+from app.services.read_cache import read_cache
+
+router = APIRouter()
+
+@router.get("/", response_model=List[User])
+async def read_users(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_admin_user_async)
+):
+    read, response = read_cache.lookup(request, ("users",))
+    if response is not None:
+        return response
+    if settings.FAST_JSON_LISTS:
+        return read_cache.store_json(read, dumps(await crud_user.get_users_rows(db, skip=skip, limit=limit)))
+    return read_cache.store(read, List[User], await crud_user.get_users(db, skip=skip, limit=limit))
+
+@router.get("/page", response_model=UserPage)
+async def read_users_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_admin_user_async)
+):
+    try:
+        users, next_cursor = await crud_user.get_users_page(
+            db, cursor=cursor, limit=limit, descending=order == "desc", role=role, is_active=is_active
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": users, "next_cursor": next_cursor, "limit": limit}
+
+@router.post("/", response_model=User)
+async def create_user(
+    user: UserCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_admin_user_async)
+):
+    db_user = await crud_user.get_user_by_username(db, username=user.username)
+    if db_user:
+        raise HTTPException(status_code=400, detail="Username already registered")
+    db_user = await crud_user.get_user_by_email(db, email=user.email)
+    if db_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    return await crud_user.create_user(db=db, user=user)
+
+@router.get("/me", response_model=User)
+async def read_user_me(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user_async)
+):
+    if not current_user.complete:
+        db_user = await crud_user.get_user(db, user_id=current_user.id)
+        if db_user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return db_user
+    return current_user
+
+@router.get("/{user_id}", response_model=User)
+async def read_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_admin_user_async)
+):
+    db_user = await crud_user.get_user(db, user_id=user_id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
+@router.put("/{user_id}", response_model=User)
+async def update_user(
+    user_id: int,
+    user_update: UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_admin_user_async)
+):
+    db_user = await crud_user.update_user(db, user_id=user_id, user_update=user_update)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
+@router.delete("/{user_id}")
+async def delete_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_admin_user_async)
+):
+    success = await crud_user.delete_user(db, user_id=user_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"message": "User deleted successfully"}
@@ -1,9 +1,48 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, ambulances, missions
+from app.core.config import settings
+from app.api.v1.endpoints import auth, users, ambulances, missions, events, analytics, hospitals, cache, database, profiling
+
+def with_async_overrides(router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """Remplacer chaque route synchrone par sa variante async (même chemin, même méthode).
+
+    L'ordre des routes synchrones est conservé, et les routes sans variante async
+    restent servies par l'implémentation synchrone.
+    """
+    overrides = {(route.path, frozenset(route.methods)): route for route in async_router.routes}
+    merged = APIRouter()
+    for route in router.routes:
+        merged.routes.append(overrides.pop((route.path, frozenset(route.methods)), route))
+    merged.routes.extend(overrides.values())
+    return merged
+
+auth_router = auth.router
+users_router = users.router
+ambulances_router = ambulances.router
+missions_router = missions.router
+analytics_router = analytics.router
+hospitals_router = hospitals.router
+
+if settings.DB_ASYNC_MODE:
+    from app.api.v1.aio import auth as auth_async, users as users_async
+    from app.api.v1.aio import ambulances as ambulances_async, missions as missions_async
+    from app.api.v1.aio import analytics as analytics_async, hospitals as hospitals_async
+
+    auth_router = with_async_overrides(auth.router, auth_async.router)
+    users_router = with_async_overrides(users.router, users_async.router)
+    ambulances_router = with_async_overrides(ambulances.router, ambulances_async.router)
+    missions_router = with_async_overrides(missions.router, missions_async.router)
+    analytics_router = with_async_overrides(analytics.router, analytics_async.router)
+    hospitals_router = with_async_overrides(hospitals.router, hospitals_async.router)
 
 api_router = APIRouter()
 
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(ambulances.router, prefix="/ambulances", tags=["ambulances"])
-api_router.include_router(missions.router, prefix="/missions", tags=["missions"])
\ No newline at end of file
+api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
+api_router.include_router(users_router, prefix="/users", tags=["users"])
+api_router.include_router(ambulances_router, prefix="/ambulances", tags=["ambulances"])
+api_router.include_router(missions_router, prefix="/missions", tags=["missions"])
+api_router.include_router(hospitals_router, prefix="/hospitals", tags=["hospitals"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(analytics_router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(cache.router, prefix="/cache", tags=["cache"])
+api_router.include_router(database.router, prefix="/database", tags=["database"])
+api_router.include_router(profiling.router, prefix="/profiling", tags=["profiling"])
@@ -1,32 +1,110 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from app.database.base import get_db
-from app.api.deps import get_current_active_user, get_admin_or_regulateur_user
+from app.api.deps import get_current_active_user, get_admin_user, get_admin_or_regulateur_user
+from app.core.config import settings
 from app.crud import ambulance as crud_ambulance
-from app.schemas.ambulance import Ambulance, AmbulanceCreate, AmbulanceUpdate, AmbulanceLocation
+from app.crud import location as crud_location
+from app.crud.ambulance import AMBULANCE_FIELDSETS
+from app.crud.fieldsets import InvalidFields
+from app.crud.pagination import InvalidCursor
+from app.schemas.ambulance import Ambulance, AmbulanceCreate, AmbulanceUpdate, AmbulanceLocation, AmbulanceNearest, AmbulancePage
+from app.schemas.ambulance import AmbulanceBulkCreate, AmbulanceLocationBatch, AmbulanceLocationBatchResult, AmbulanceTrack, TrackPoint
 from app.models.ambulance import AmbulanceStatus
 from app.models.user import User
+from app.schemas.bulk import BulkCreateResult
+from app.services.position_store import position_store
+from app.services.spatial_index import ambulance_index
+from app.services.track import downsample_track
+from app.services.fast_json import dumps
+from app.services.read_cache import read_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Ambulance])
 def read_ambulances(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Projection : summary, map ou champs séparés par des virgules"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    ambulances = crud_ambulance.get_ambulances(db, skip=skip, limit=limit)
-    return ambulances
+    # Sert 304 ou la réponse déjà sérialisée tant que la ressource n'a pas changé
+    try:
+        projection = AMBULANCE_FIELDSETS.resolve(fields)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    read, response = read_cache.lookup(request, ("ambulances",))
+    if response is not None:
+        return response
+    # ?fields= ou chemin rapide : seules les colonnes projetées sont lues en SQL, encodées en une passe
+    if fields or settings.FAST_JSON_LISTS:
+        return read_cache.store_json(read, dumps(crud_ambulance.get_ambulances_rows(db, skip=skip, limit=limit, projection=projection)))
+    return read_cache.store(read, List[Ambulance], crud_ambulance.get_ambulances(db, skip=skip, limit=limit))
+
+@router.get("/page", response_model=AmbulancePage)
+def read_ambulances_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    status: Optional[AmbulanceStatus] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    try:
+        ambulances, next_cursor = crud_ambulance.get_ambulances_page(
+            db, cursor=cursor, limit=limit, descending=order == "desc", status=status
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": ambulances, "next_cursor": next_cursor, "limit": limit}
 
 @router.get("/available", response_model=List[Ambulance])
 def read_available_ambulances(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Projection : summary, map ou champs séparés par des virgules"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    ambulances = crud_ambulance.get_available_ambulances(db)
-    return ambulances
+    try:
+        projection = AMBULANCE_FIELDSETS.resolve(fields)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    read, response = read_cache.lookup(request, ("ambulances",))
+    if response is not None:
+        return response
+    if fields or settings.FAST_JSON_LISTS:
+        return read_cache.store_json(read, dumps(crud_ambulance.get_available_ambulances_rows(db, projection=projection)))
+    return read_cache.store(read, List[Ambulance], crud_ambulance.get_available_ambulances(db))
+
+@router.get("/nearest", response_model=List[AmbulanceNearest])
+def read_nearest_ambulances(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user)
+):
+    # Servi depuis l'index spatial en mémoire, sans requête sur la flotte
+    return [
+        AmbulanceNearest(
+            id=entry.id,
+            plate_number=entry.plate_number,
+            status=entry.status,
+            latitude=entry.latitude,
+            longitude=entry.longitude,
+            distance_km=round(distance, 3)
+        )
+        for entry, distance in ambulance_index.nearest(lat, lon, k=k)
+    ]
+
+@router.get("/positions/stats")
+def read_position_store_stats(current_user: User = Depends(get_admin_user)):
+    # Métriques de l'écriture différée des positions (retard de flush, positions en attente)
+    return position_store.metrics()
 
 @router.post("/", response_model=Ambulance)
 def create_ambulance(
@@ -39,6 +117,18 @@ def create_ambulance(
         raise HTTPException(status_code=400, detail="Plate number already registered")
     return crud_ambulance.create_ambulance(db=db, ambulance=ambulance)
 
+@router.post("/bulk", response_model=BulkCreateResult)
+def bulk_create_ambulances(
+    batch: AmbulanceBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Chargement d'une flotte : INSERT ensemblistes par lots de BULK_INSERT_CHUNK_SIZE, une transaction par lot"""
+    conflicts = crud_ambulance.conflicting_plates(db, batch.items)
+    if conflicts:
+        raise HTTPException(status_code=400, detail=f"Plate numbers duplicated or already registered: {', '.join(conflicts[:20])}")
+    return crud_ambulance.bulk_create_ambulances(db, ambulances=batch.items)
+
 @router.get("/{ambulance_id}", response_model=Ambulance)
 def read_ambulance(
     ambulance_id: int,
@@ -62,6 +152,22 @@ def update_ambulance(
         raise HTTPException(status_code=404, detail="Ambulance not found")
     return db_ambulance
 
+@router.post("/locations", response_model=AmbulanceLocationBatchResult)
+def ingest_ambulance_locations(
+    batch: AmbulanceLocationBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    # Ingestion groupée des positions GPS : une seule écriture ensembliste par lot
+    start = time.perf_counter()
+    stats = crud_ambulance.ingest_location_fixes(db, fixes=batch.fixes)
+    duration = time.perf_counter() - start
+    return AmbulanceLocationBatchResult(
+        **stats,
+        duration_ms=round(duration * 1000, 3),
+        fixes_per_second=round(stats["ingested"] / duration, 1) if duration > 0 else 0.0
+    )
+
 @router.put("/{ambulance_id}/location", response_model=Ambulance)
 def update_ambulance_location(
     ambulance_id: int,
@@ -74,6 +180,37 @@ def update_ambulance_location(
         raise HTTPException(status_code=404, detail="Ambulance not found")
     return db_ambulance
 
+@router.get("/{ambulance_id}/track", response_model=AmbulanceTrack)
+def read_ambulance_track(
+    ambulance_id: int,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    resolution: Optional[int] = Query(None, ge=1, description="Pas de temps en secondes"),
+    tolerance_m: Optional[float] = Query(None, gt=0, description="Tolérance Douglas–Peucker en mètres"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    end = crud_ambulance.as_naive_utc(end) if end else datetime.utcnow()
+    start = crud_ambulance.as_naive_utc(start) if start else end - timedelta(hours=12)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    if crud_ambulance.get_ambulance(db, ambulance_id=ambulance_id) is None:
+        raise HTTPException(status_code=404, detail="Ambulance not found")
+    raw_points = crud_location.get_track_points(db, ambulance_id=ambulance_id, start=start, end=end)
+    points, resolution = downsample_track(
+        raw_points, resolution_seconds=resolution, tolerance_m=tolerance_m,
+        max_points=settings.LOCATION_TRACK_MAX_POINTS
+    )
+    return AmbulanceTrack(
+        ambulance_id=ambulance_id,
+        start=start,
+        end=end,
+        resolution_seconds=resolution,
+        tolerance_m=tolerance_m,
+        raw_points=len(raw_points),
+        points=[TrackPoint(recorded_at=t, latitude=lat, longitude=lon) for t, lat, lon in points]
+    )
+
 @router.put("/{ambulance_id}/status", response_model=Ambulance)
 def update_ambulance_status(
     ambulance_id: int,
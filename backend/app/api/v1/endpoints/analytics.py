@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.database.base import get_db
+from app.api.deps import get_current_active_user
+from app.core.config import settings
+from app.crud import analytics as crud_analytics
+from app.crud.ambulance import as_naive_utc
+from app.models.mission import MissionPriority
+from app.models.user import User
+from app.schemas.analytics import MissionCounts, MissionMetric
+from app.services.analytics import GRANULARITIES, METRIC_UNITS, count_series, metric_series, truncate
+
+router = APIRouter()
+
+DEFAULT_BUCKETS = {"hour": 24, "day": 30}
+
+def analytics_window(
+    granularity: str = Query("hour", pattern="^(hour|day)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Tuple[str, datetime, datetime]:
+    """Fenêtre [start, end) alignée sur les créneaux ; par défaut les 24 dernières heures ou 30 derniers jours"""
+    step = GRANULARITIES[granularity]
+    end = as_naive_utc(end) if end is not None else truncate(datetime.utcnow(), granularity) + step
+    start = truncate(as_naive_utc(start), granularity) if start is not None else end - step * DEFAULT_BUCKETS[granularity]
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'end' must be after 'start'")
+    if (end - start) / step > settings.ANALYTICS_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Window too large: at most {settings.ANALYTICS_MAX_BUCKETS} buckets")
+    return granularity, start, end
+
+@router.get("/missions/counts", response_model=MissionCounts)
+def read_mission_counts(
+    window: Tuple[str, datetime, datetime] = Depends(analytics_window),
+    priority: Optional[MissionPriority] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Missions créées par créneau, par priorité et statut courant (lu dans les agrégats)"""
+    granularity, start, end = window
+    rows = crud_analytics.get_count_rollups(db, granularity, start, end, priority=priority)
+    return {"granularity": granularity, "start": start, "end": end, "buckets": count_series(granularity, start, end, rows)}
+
+@router.get("/missions/metrics", response_model=MissionMetric)
+def read_mission_metric(
+    metric: str = Query("duration", pattern="^(duration|assignment_latency)$"),
+    window: Tuple[str, datetime, datetime] = Depends(analytics_window),
+    priority: Optional[MissionPriority] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Moyenne et percentiles de la durée réelle ou du délai d'assignation, par créneau de création"""
+    granularity, start, end = window
+    rows = crud_analytics.get_metric_rollups(db, metric, granularity, start, end, priority=priority)
+    summary, buckets = metric_series(metric, granularity, start, end, rows)
+    return {
+        "metric": metric, "unit": METRIC_UNITS[metric], "granularity": granularity,
+        "start": start, "end": end, "summary": summary, "buckets": buckets
+    }
@@ -2,21 +2,26 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.api.deps import get_admin_user
 from app.core.config import settings
-from app.core.security import create_access_token
+from app.core.security import create_access_token, principal_claims
 from app.database.base import get_db
-from app.crud.user import authenticate_user
+from app.crud.user import get_user_by_username
+from app.models.user import User
 from app.schemas.user import Token
+from app.services.password_hasher import password_hasher
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
-    if not user:
+    # Seule la lecture de l'utilisateur passe par le threadpool ; bcrypt est attendu sans occuper de thread
+    user = await run_in_threadpool(get_user_by_username, db, form_data.username)
+    if not user or not await password_hasher.verify_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -24,6 +29,10 @@ def login_for_access_token(
         )
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=user.username, expires_delta=access_token_expires
+        subject=user.username, expires_delta=access_token_expires, claims=principal_claims(user)
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.get("/password-pool/stats")
+def read_password_pool_stats(current_user: User = Depends(get_admin_user)):
+    return password_hasher.metrics()
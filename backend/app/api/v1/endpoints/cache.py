@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+from app.api.deps import get_admin_user
+from app.models.user import User
+from app.services.read_cache import read_cache
+
+router = APIRouter()
+
+@router.get("/stats")
+def read_cache_stats(current_user: User = Depends(get_admin_user)):
+    # Taux de réponses servies sans base (cache ou 304) et octets non renvoyés grâce aux 304
+    return read_cache.metrics()
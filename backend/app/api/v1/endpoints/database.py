@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from app.api.deps import get_admin_user
+from app.models.user import User
+from app.services.pool_monitor import pool_monitor
+from app.services.sql_profiler import sql_profiler
+
+router = APIRouter()
+
+@router.get("/pool/stats")
+def read_pool_stats(current_user: User = Depends(get_admin_user)):
+    # Connexions prêtées, pic d'occupation et checkouts ayant trouvé le pool plein
+    return pool_monitor.metrics()
+
+@router.get("/queries/stats")
+def read_query_stats(current_user: User = Depends(get_admin_user)):
+    # Requêtes SQL par route (moyenne, maximum, temps en base) et formes répétées (N+1)
+    return sql_profiler.metrics()
+
+@router.delete("/queries/stats", status_code=204)
+def reset_query_stats(current_user: User = Depends(get_admin_user)):
+    # Repartir de zéro avant de mesurer l'effet d'une correction
+    sql_profiler.reset()
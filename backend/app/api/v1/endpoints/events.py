@@ -0,0 +1,146 @@
+import asyncio
+from typing import AsyncIterator, Optional, Set
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.api.deps import get_admin_user, user_from_token
+from app.core.config import settings
+from app.models.user import User
+from app.services.events import EVENT_TYPES, EventFilter, Subscription, event_bus
+
+router = APIRouter()
+
+PING_MESSAGE = '{"type":"ping"}'
+
+def _parse_ids(value: Optional[str], name: str) -> Optional[Set[int]]:
+    if not value:
+        return None
+    try:
+        return {int(item) for item in value.split(",") if item.strip()}
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}': expected comma-separated integers")
+
+def build_event_filter(
+    types: Optional[str] = Query(None, description="Types d'événements séparés par des virgules"),
+    bbox: Optional[str] = Query(None, description="Zone min_lat,min_lon,max_lat,max_lon"),
+    mission_ids: Optional[str] = Query(None),
+    ambulance_ids: Optional[str] = Query(None)
+) -> EventFilter:
+    event_filter = EventFilter(
+        mission_ids=_parse_ids(mission_ids, "mission_ids"),
+        ambulance_ids=_parse_ids(ambulance_ids, "ambulance_ids")
+    )
+    if types:
+        requested = frozenset(item.strip() for item in types.split(",") if item.strip())
+        unknown = requested - EVENT_TYPES
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown event types: {', '.join(sorted(unknown))}")
+        event_filter.types = requested
+    if bbox:
+        try:
+            min_lat, min_lon, max_lat, max_lon = (float(item) for item in bbox.split(","))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid 'bbox': expected min_lat,min_lon,max_lat,max_lon")
+        if min_lat > max_lat or min_lon > max_lon:
+            raise HTTPException(status_code=400, detail="Invalid 'bbox': min must be lower than max")
+        event_filter.bbox = (min_lat, min_lon, max_lat, max_lon)
+    return event_filter
+
+def _bearer_token(authorization: Optional[str], token: Optional[str]) -> Optional[str]:
+    # EventSource et WebSocket ne permettent pas d'envoyer d'en-tête : le token peut passer en paramètre
+    if token:
+        return token
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    return None
+
+def _subscribe(event_filter: EventFilter) -> Subscription:
+    subscription = event_bus.subscribe(event_filter)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many event subscribers")
+    return subscription
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    token: Optional[str] = None,
+    event_filter: EventFilter = Depends(build_event_filter)
+):
+    """Flux Server-Sent Events des changements de positions, statuts et missions"""
+    user = await run_in_threadpool(user_from_token, _bearer_token(request.headers.get("authorization"), token))
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    subscription = _subscribe(event_filter)
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                events = await subscription.next_batch(settings.EVENTS_HEARTBEAT_SECONDS)
+                if events:
+                    yield "".join(event.to_sse() for event in events)
+                else:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    types: Optional[str] = None,
+    bbox: Optional[str] = None,
+    mission_ids: Optional[str] = None,
+    ambulance_ids: Optional[str] = None
+):
+    """Même flux que /stream sur WebSocket (un message JSON par événement)"""
+    user = await run_in_threadpool(user_from_token, _bearer_token(websocket.headers.get("authorization"), token))
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        subscription = _subscribe(build_event_filter(types, bbox, mission_ids, ambulance_ids))
+    except HTTPException as exc:
+        code = status.WS_1013_TRY_AGAIN_LATER if exc.status_code == 503 else status.WS_1008_POLICY_VIOLATION
+        await websocket.close(code=code, reason=exc.detail)
+        return
+
+    await websocket.accept()
+
+    async def send_events():
+        while True:
+            events = await subscription.next_batch(settings.EVENTS_HEARTBEAT_SECONDS)
+            if not events:
+                # Heartbeat : sans trafic, les proxys ferment les connexions inactives
+                await websocket.send_text(PING_MESSAGE)
+            for event in events:
+                await websocket.send_text(event.to_json())
+
+    async def wait_disconnect():
+        # Les messages du client sont ignorés ; seule la déconnexion nous intéresse
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(wait_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        event_bus.unsubscribe(subscription)
+
+@router.get("/stats")
+def read_event_stats(current_user: User = Depends(get_admin_user)):
+    return event_bus.metrics()
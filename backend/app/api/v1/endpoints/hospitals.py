@@ -0,0 +1,109 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.database.base import get_db
+from app.api.deps import get_current_active_user, get_admin_user
+from app.crud import hospital as crud_hospital
+from app.schemas.hospital import Hospital, HospitalBulkCreate, HospitalCreate, HospitalUpdate, HospitalRecommendation
+from app.models.mission import MissionPriority
+from app.models.user import User
+from app.schemas.bulk import BulkCreateResult
+from app.services.hospital_snapshot import HospitalSnapshot, hospital_snapshot, refresh_hospital_snapshot
+
+router = APIRouter()
+
+def recommendations(snapshot: HospitalSnapshot, lat: float, lon: float, condition: Optional[str],
+                    priority: Optional[MissionPriority], k: int, max_distance_km: Optional[float]) -> List[HospitalRecommendation]:
+    return [
+        HospitalRecommendation(
+            id=entry.id,
+            name=entry.name,
+            latitude=entry.latitude,
+            longitude=entry.longitude,
+            distance_km=round(distance, 3),
+            emergency_beds=entry.emergency_beds,
+            icu_beds=entry.icu_beds,
+            specialty_match=match,
+            score=round(score, 4)
+        )
+        for entry, distance, match, score in snapshot.recommend(lat, lon, condition, priority, k, max_distance_km)
+    ]
+
+@router.get("/", response_model=List[Hospital])
+def read_hospitals(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return crud_hospital.get_hospitals(db, skip=skip, limit=limit)
+
+@router.get("/recommend", response_model=List[HospitalRecommendation])
+def recommend_hospitals(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    condition: Optional[str] = Query(None, max_length=100),
+    priority: Optional[MissionPriority] = None,
+    k: int = Query(5, ge=1, le=50),
+    max_distance_km: Optional[float] = Query(None, gt=0),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Hôpitaux classés par proximité, lits d'urgence disponibles et spécialité adaptée à la pathologie"""
+    # Servi depuis l'instantané en mémoire ; la base n'est relue que s'il est périmé
+    refresh_hospital_snapshot()
+    return recommendations(hospital_snapshot, lat, lon, condition, priority, k, max_distance_km)
+
+@router.get("/recommend/stats")
+def read_recommendation_stats(current_user: User = Depends(get_admin_user)):
+    return hospital_snapshot.metrics()
+
+@router.post("/", response_model=Hospital)
+def create_hospital(
+    hospital: HospitalCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    return crud_hospital.create_hospital(db=db, hospital=hospital)
+
+@router.post("/bulk", response_model=BulkCreateResult)
+def bulk_create_hospitals(
+    batch: HospitalBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Chargement du référentiel : INSERT ensemblistes par lots de BULK_INSERT_CHUNK_SIZE, une transaction par lot"""
+    return crud_hospital.bulk_create_hospitals(db, hospitals=batch.items)
+
+@router.get("/{hospital_id}", response_model=Hospital)
+def read_hospital(
+    hospital_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    db_hospital = crud_hospital.get_hospital(db, hospital_id=hospital_id)
+    if db_hospital is None:
+        raise HTTPException(status_code=404, detail="Hospital not found")
+    return db_hospital
+
+@router.put("/{hospital_id}", response_model=Hospital)
+def update_hospital(
+    hospital_id: int,
+    hospital_update: HospitalUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    db_hospital = crud_hospital.update_hospital(db, hospital_id=hospital_id, hospital_update=hospital_update)
+    if db_hospital is None:
+        raise HTTPException(status_code=404, detail="Hospital not found")
+    return db_hospital
+
+@router.delete("/{hospital_id}")
+def delete_hospital(
+    hospital_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    success = crud_hospital.delete_hospital(db, hospital_id=hospital_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Hospital not found")
+    return {"message": "Hospital deleted successfully"}
@@ -1,32 +1,141 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database.base import get_db
-from app.api.deps import get_current_active_user, get_admin_or_regulateur_user
+from app.database.base import SessionLocal, get_db
+from app.api.deps import get_current_active_user, get_admin_or_regulateur_user, get_admin_user
 from app.crud import mission as crud_mission
-from app.schemas.mission import Mission, MissionCreate, MissionUpdate, MissionAssignment
-from app.models.mission import MissionStatus
+from app.crud.mission import MISSION_EXPANSIONS, MISSION_FIELDSETS, read_resources
+from app.crud.fieldsets import InvalidFields, parse_expand
+from app.crud.bulk import missing_ids
+from app.crud.pagination import InvalidCursor
+from app.schemas.mission import Mission, MissionBulkCreate, MissionCreate, MissionUpdate, MissionAssignment, MissionPage, DispatchResult, MissionQueue, MISSION_EXPANSION_SCHEMAS
+from app.models.ambulance import Ambulance
+from app.models.hospital import Hospital
+from app.models.mission import MissionPriority, MissionStatus
 from app.models.user import User
+from app.schemas.bulk import BulkCreateResult
+from app.core.config import settings
+from app.services.mission_queue import mission_queue
+from app.services.export import EXPORT_FORMATS, export_metrics, stream_export
+from app.services.fast_json import dumps
+from app.services.read_cache import read_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Mission])
 def read_missions(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Projection : summary, map ou champs séparés par des virgules"),
+    expand: Optional[str] = Query(None, description="Relations à inclure : ambulance, hospital"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    missions = crud_mission.get_missions(db, skip=skip, limit=limit)
-    return missions
+    try:
+        projection = MISSION_FIELDSETS.resolve(fields)
+        expansions = parse_expand(expand, MISSION_EXPANSIONS)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if fields and expansions:
+        raise HTTPException(status_code=400, detail="fields and expand cannot be combined")
+    read, response = read_cache.lookup(request, read_resources(expansions))
+    if response is not None:
+        return response
+    if fields or (settings.FAST_JSON_LISTS and not expansions):
+        return read_cache.store_json(read, dumps(crud_mission.get_missions_rows(db, skip=skip, limit=limit, projection=projection)))
+    return read_cache.store(read, List[MISSION_EXPANSION_SCHEMAS[expansions]], crud_mission.get_missions(db, skip=skip, limit=limit, expand=expansions))
+
+@router.post("/bulk", response_model=BulkCreateResult)
+def import_missions(
+    batch: MissionBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Reprise de missions d'un autre système (historique compris) par lots ; sans événements temps réel"""
+    unknown_hospitals = missing_ids(db, Hospital, (m.hospital_id for m in batch.items))
+    if unknown_hospitals:
+        raise HTTPException(status_code=400, detail=f"Unknown hospital ids: {', '.join(map(str, unknown_hospitals[:20]))}")
+    unknown_ambulances = missing_ids(db, Ambulance, (m.ambulance_id for m in batch.items if m.ambulance_id is not None))
+    if unknown_ambulances:
+        raise HTTPException(status_code=400, detail=f"Unknown ambulance ids: {', '.join(map(str, unknown_ambulances[:20]))}")
+    return crud_mission.import_missions(db, missions=batch.items)
+
+@router.get("/page", response_model=MissionPage)
+def read_missions_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    status: Optional[MissionStatus] = None,
+    priority: Optional[MissionPriority] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    try:
+        missions, next_cursor = crud_mission.get_missions_page(
+            db, cursor=cursor, limit=limit, descending=order == "desc", status=status, priority=priority,
+            created_from=created_from, created_to=created_to
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": missions, "next_cursor": next_cursor, "limit": limit}
+
+def export_batches(**filters) -> Iterator[Sequence]:
+    # Session propre au flux : celle de get_db est fermée avant l'envoi du corps (FastAPI >= 0.106)
+    db = SessionLocal()
+    try:
+        yield from crud_mission.stream_missions(db, batch_size=settings.EXPORT_BATCH_SIZE, **filters)
+    finally:
+        db.close()
+
+@router.get("/export")
+def export_missions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[MissionStatus] = None,
+    priority: Optional[MissionPriority] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Export en flux (NDJSON ou CSV), lu par lots dans une session ouverte jusqu'à la fin de la réponse"""
+    started_at = time.perf_counter()
+    batches = export_batches(status=status, priority=priority, created_from=created_from, created_to=created_to)
+    return StreamingResponse(
+        stream_export(format, batches, started_at),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="missions.{format}"'}
+    )
+
+@router.get("/export/stats")
+def read_export_stats(current_user: User = Depends(get_admin_user)):
+    return export_metrics.metrics()
 
 @router.get("/active", response_model=List[Mission])
 def read_active_missions(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Projection : summary, map ou champs séparés par des virgules"),
+    expand: Optional[str] = Query(None, description="Relations à inclure : ambulance, hospital"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    missions = crud_mission.get_active_missions(db)
-    return missions
+    try:
+        projection = MISSION_FIELDSETS.resolve(fields)
+        expansions = parse_expand(expand, MISSION_EXPANSIONS)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if fields and expansions:
+        raise HTTPException(status_code=400, detail="fields and expand cannot be combined")
+    read, response = read_cache.lookup(request, read_resources(expansions))
+    if response is not None:
+        return response
+    if fields or (settings.FAST_JSON_LISTS and not expansions):
+        return read_cache.store_json(read, dumps(crud_mission.get_active_missions_rows(db, projection=projection)))
+    return read_cache.store(read, List[MISSION_EXPANSION_SCHEMAS[expansions]], crud_mission.get_active_missions(db, expand=expansions))
 
 @router.get("/status/{status}", response_model=List[Mission])
 def read_missions_by_status(
@@ -45,15 +154,61 @@ def create_mission(
 ):
     return crud_mission.create_mission(db=db, mission=mission)
 
+@router.get("/queue", response_model=MissionQueue)
+def read_mission_queue(
+    limit: int = Query(20, ge=1, le=500),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Missions en attente, de la plus prioritaire à la moins prioritaire (puis par ancienneté)"""
+    now = datetime.utcnow()
+    return {
+        "size": len(mission_queue),
+        "items": [
+            {"id": entry.id, "priority": entry.priority, "created_at": entry.created_at,
+             "waiting_seconds": round(max(0.0, (now - entry.created_at).total_seconds()), 3)}
+            for entry in mission_queue.peek(limit)
+        ]
+    }
+
+@router.post("/queue/claim", response_model=Mission)
+def claim_next_mission(
+    assignment: MissionAssignment,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_or_regulateur_user)
+):
+    """Assigner à l'ambulance la mission en attente la plus prioritaire ; sûr entre régulateurs concurrents"""
+    db_mission = crud_mission.claim_next_mission(db, assignment=assignment)
+    if db_mission is None:
+        raise HTTPException(status_code=404, detail="No pending mission")
+    return db_mission
+
+@router.post("/dispatch", response_model=DispatchResult)
+def dispatch_missions(
+    dry_run: bool = False,
+    max_distance_km: Optional[float] = Query(None, gt=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_or_regulateur_user)
+):
+    """Affectation optimale de toutes les missions en attente (distance pondérée par la priorité)"""
+    return crud_mission.dispatch_pending_missions(db, max_distance_km=max_distance_km, dry_run=dry_run)
+
 @router.get("/{mission_id}", response_model=Mission)
 def read_mission(
     mission_id: int,
+    expand: Optional[str] = Query(None, description="Relations à inclure : ambulance, hospital"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_mission = crud_mission.get_mission(db, mission_id=mission_id)
+    try:
+        expansions = parse_expand(expand, MISSION_EXPANSIONS)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    db_mission = crud_mission.get_mission(db, mission_id=mission_id, expand=expansions)
     if db_mission is None:
         raise HTTPException(status_code=404, detail="Mission not found")
+    if expansions:
+        # Sérialisé ici : response_model (Mission) retirerait les relations incluses
+        return read_cache.store(None, MISSION_EXPANSION_SCHEMAS[expansions], db_mission)
     return db_mission
 
 @router.put("/{mission_id}", response_model=Mission)
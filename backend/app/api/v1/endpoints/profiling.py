@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.api.deps import get_admin_user
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.profiling import ProfilingStart
+from app.services.sampling_profiler import sampling_profiler
+
+router = APIRouter()
+
+def last_session():
+    if sampling_profiler.last is None:
+        raise HTTPException(status_code=404, detail="No profiling session")
+    return sampling_profiler.last
+
+@router.post("/start")
+def start_profiling(params: ProfilingStart, current_user: User = Depends(get_admin_user)):
+    # Remplace la session en cours ; s'applique au worker qui reçoit cet appel
+    if params.duration_seconds > settings.SAMPLING_PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Duration too long: at most {settings.SAMPLING_PROFILER_MAX_SECONDS} seconds")
+    session = sampling_profiler.start(params.route, params.sample_rate, params.interval_ms, params.duration_seconds,
+                                      settings.SAMPLING_PROFILER_MAX_STACKS)
+    return session.status()
+
+@router.post("/stop")
+def stop_profiling(current_user: User = Depends(get_admin_user)):
+    sampling_profiler.stop()
+    return last_session().status()
+
+@router.get("/status")
+def read_profiling_status(current_user: User = Depends(get_admin_user)):
+    return last_session().status()
+
+@router.get("/profile")
+def read_profile(
+    format: str = Query("folded", pattern="^(folded|json)$"),
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: User = Depends(get_admin_user)
+):
+    # folded : entrée directe de flamegraph.pl / inferno / speedscope ; json : fonctions les plus coûteuses
+    session = last_session()
+    if format == "folded":
+        return PlainTextResponse(sampling_profiler.folded(session))
+    return sampling_profiler.summary(session, limit)
@@ -1,42 +1,87 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.database.base import get_db
 from app.api.deps import get_current_active_user, get_admin_user
 from app.crud import user as crud_user
-from app.schemas.user import User, UserCreate, UserUpdate
-from app.models.user import User as UserModel
+from app.crud.pagination import InvalidCursor
+from app.schemas.user import User, UserCreate, UserUpdate, UserPage
+from app.models.user import User as UserModel, UserRole
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+from app.core.config import settings
+from app.services.fast_json import dumps
+from app.services.read_cache import read_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=List[User])
 def read_users(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_admin_user)
 ):
-    users = crud_user.get_users(db, skip=skip, limit=limit)
-    return users
+    read, response = read_cache.lookup(request, ("users",))
+    if response is not None:
+        return response
+    if settings.FAST_JSON_LISTS:
+        return read_cache.store_json(read, dumps(crud_user.get_users_rows(db, skip=skip, limit=limit)))
+    return read_cache.store(read, List[User], crud_user.get_users(db, skip=skip, limit=limit))
+
+@router.get("/page", response_model=UserPage)
+def read_users_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_admin_user)
+):
+    try:
+        users, next_cursor = crud_user.get_users_page(
+            db, cursor=cursor, limit=limit, descending=order == "desc", role=role, is_active=is_active
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": users, "next_cursor": next_cursor, "limit": limit}
 
 @router.post("/", response_model=User)
-def create_user(
+async def create_user(
     user: UserCreate,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_admin_user)
 ):
-    db_user = crud_user.get_user_by_username(db, username=user.username)
+    # Comme /auth/login : seules les lectures et l'écriture passent par le threadpool, bcrypt est attendu sans thread
+    db_user = await run_in_threadpool(crud_user.get_user_by_username, db, user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
-    db_user = crud_user.get_user_by_email(db, email=user.email)
+    db_user = await run_in_threadpool(crud_user.get_user_by_email, db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud_user.create_user(db=db, user=user)
+    hashed_password = await password_hasher.hash_async(user.password)
+    return await run_in_threadpool(crud_user.create_user, db, user, hashed_password)
 
 @router.get("/me", response_model=User)
-def read_user_me(current_user: UserModel = Depends(get_current_active_user)):
+def read_user_me(
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    # Un principal issu des claims du token ne porte pas le profil complet
+    if not current_user.complete:
+        db_user = crud_user.get_user(db, user_id=current_user.id)
+        if db_user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return db_user
     return current_user
 
+@router.get("/principal-cache/stats")
+def read_principal_cache_stats(current_user: UserModel = Depends(get_admin_user)):
+    return principal_cache.metrics()
+
 @router.get("/{user_id}", response_model=User)
 def read_user(
     user_id: int,
@@ -10,6 +10,10 @@ class Settings(BaseSettings):
     DB_USER: str = "root"
     DB_: str = ""
     DB_NAME: str = "ambulance_db"
+
+    # Mode asynchrone : AsyncSession + endpoints async def pour les CRUD principaux
+    DB_ASYNC_MODE: bool = False
+    ASYNC_DATABASE_URL: str = "mysql+aiomysql://root:@localhost:3306/ambulance_db"
     
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -19,6 +23,86 @@ class Settings(BaseSettings):
     # CORS - Utiliser une chaîne séparée par des virgules
     ALLOWED_ORIGINS: str = "http://localhost:5173,https://localhost:5173,http://localhost:3000"
     
+    # Index spatial des ambulances (taille de cellule en degrés, resynchronisation en secondes)
+    SPATIAL_INDEX_CELL_DEG: float = 0.02
+    SPATIAL_INDEX_REFRESH_SECONDS: int = 30
+
+    # Télémétrie GPS : tolérance sur l'horloge des terminaux embarqués
+    TELEMETRY_MAX_CLOCK_SKEW_SECONDS: int = 300
+
+    # Écriture différée des positions (dernière position connue, flush groupé)
+    POSITION_WRITE_BEHIND: bool = False
+    POSITION_FLUSH_INTERVAL_SECONDS: float = 2.0
+    POSITION_FLUSH_MAX_PENDING: int = 500
+
+    # Historique des positions : nombre maximal de points renvoyés par tracé
+    LOCATION_TRACK_MAX_POINTS: int = 1000
+
+    # Flux d'événements temps réel (SSE/WebSocket) : journal partagé, abonnés et heartbeat
+    EVENTS_BACKLOG: int = 20000
+    EVENTS_MAX_SUBSCRIBERS: int = 5000
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
+    # Cache des utilisateurs authentifiés (TTL en secondes, 0 pour désactiver). Les invalidations gagnent les
+    # autres workers via les versions partagées : au plus deux READ_CACHE_VERSION_REFRESH_SECONDS de retard
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # Rôle et statut actif dans le token : aucune lecture en base même sur défaut de cache,
+    # mais une désactivation ou un changement de rôle n'est pris en compte qu'à l'expiration du token
+    AUTH_TOKEN_CLAIMS: bool = False
+
+    # Hachage bcrypt dans un pool dédié (processus séparés, file bornée)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 256
+    PASSWORD_HASH_USE_PROCESSES: bool = True
+
+    # Export des missions : lignes lues par aller-retour du curseur serveur
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Agrégats horaires/journaliers des missions, maintenus à chaque écriture de mission.
+    # Après une période désactivée, les reconstruire avec scripts/backfill_mission_rollups.py.
+    # Désactivés au démarrage, avec un avertissement, hors MySQL, PostgreSQL et SQLite
+    ANALYTICS_ROLLUPS_ENABLED: bool = True
+    ANALYTICS_MAX_BUCKETS: int = 2232  # 93 jours en créneaux horaires
+
+    # Recommandation d'hôpital : âge maximal (secondes) de l'instantané en mémoire des hôpitaux
+    HOSPITAL_SNAPSHOT_MAX_AGE_SECONDS: int = 60
+
+    # File de priorité des missions en attente : resynchronisation avec la base (secondes)
+    MISSION_QUEUE_REFRESH_SECONDS: int = 30
+
+    # Cache des listes très sollicitées (ETag) : conservation d'un corps en mémoire en secondes, 0 pour désactiver ;
+    # intervalle de report des écritures locales et de relecture des versions partagées, en secondes : une écriture
+    # sur un autre worker peut rester invisible (304 ou corps en cache périmé) jusqu'à deux intervalles
+    READ_CACHE_TTL_SECONDS: float = 5.0
+    READ_CACHE_MAX_ENTRIES: int = 256
+    READ_CACHE_VERSION_REFRESH_SECONDS: float = 1.0
+
+    # Listes sérialisées directement depuis les colonnes projetées (sans validation pydantic par ligne)
+    FAST_JSON_LISTS: bool = False
+
+    # Imports groupés (POST /bulk) : lignes par INSERT ensembliste, chaque lot étant une transaction
+    BULK_INSERT_CHUNK_SIZE: int = 1000
+
+    # Exposition Prometheus (GET /metrics, non authentifiée : à restreindre au réseau de supervision)
+    METRICS_ENABLED: bool = True
+
+    # Profilage SQL par requête : empreintes des requêtes, détection N+1 (même forme de SELECT répétée
+    # au moins SQL_N_PLUS_ONE_THRESHOLD fois), journal échantillonné des requêtes lentes (paramètres masqués)
+    SQL_PROFILING: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_SAMPLE_RATE: float = 1.0
+    # En-têtes Server-Timing / X-DB-* sur chaque réponse (révèlent l'activité SQL : développement)
+    SQL_PROFILE_HEADERS: bool = False
+    # Trace complète des requêtes par SQLAlchemy (echo) : inutilisable en charge
+    SQL_ECHO: bool = False
+
+    # Profileur par échantillonnage à la demande (POST /profiling/start, admin) : durée maximale d'une
+    # session et nombre de piles distinctes conservées
+    SAMPLING_PROFILER_MAX_SECONDS: int = 600
+    SAMPLING_PROFILER_MAX_STACKS: int = 20000
+
     # Application
     DEBUG: bool = True
     API_V1_STR: str = "/api/v1"
@@ -0,0 +1 @@
+# Async CRUD package
\ No newline at end of file
@@ -0,0 +1,193 @@
+import time
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.models.ambulance import Ambulance, AmbulanceStatus
+from app.schemas.ambulance import AmbulanceCreate, AmbulanceUpdate, AmbulanceLocation, AmbulanceLocationFix
+from app.core.config import settings
+from app.crud.ambulance import AMBULANCE_ROWS, ambulance_rows, duplicated_plates, registered_plates_statement
+from app.crud.ambulance import coalesce_location_fixes, drop_future_fixes, filter_fresh_fixes, fixes_history, fixes_to_positions
+from app.crud.aio.bulk import insert_chunked
+from app.crud.bulk import bulk_stats
+from app.crud.location import history_row, location_history_insert
+from app.crud.pagination import keyset, page
+from app.services.fast_json import RowProjection
+from app.services.position_store import position_store, positions_update
+from app.services.events import AMBULANCE_LOCATION, AMBULANCE_STATUS, ambulance_event, event_bus, position_event
+from app.services.metrics import count_location_fixes, location_fixes
+from app.services.read_cache import read_cache
+from app.services.spatial_index import ambulance_index, refresh_ambulance_index
+from datetime import datetime
+
+async def get_ambulance(db: AsyncSession, ambulance_id: int) -> Optional[Ambulance]:
+    result = await db.execute(select(Ambulance).filter(Ambulance.id == ambulance_id))
+    return position_store.overlay(result.scalars().first())
+
+async def get_ambulance_by_plate(db: AsyncSession, plate_number: str) -> Optional[Ambulance]:
+    result = await db.execute(select(Ambulance).filter(Ambulance.plate_number == plate_number))
+    return result.scalars().first()
+
+async def get_ambulances(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Ambulance]:
+    result = await db.execute(select(Ambulance).offset(skip).limit(limit))
+    return [position_store.overlay(a) for a in result.scalars().all()]
+
+async def get_ambulances_page(db: AsyncSession, cursor: Optional[str] = None, limit: int = 50, descending: bool = False,
+                              status: Optional[AmbulanceStatus] = None) -> Tuple[List[Ambulance], Optional[str]]:
+    statement = select(Ambulance)
+    if status is not None:
+        statement = statement.filter(Ambulance.status == status)
+    result = await db.execute(keyset(statement, Ambulance.id, cursor, limit, descending))
+    ambulances, next_cursor = page(result.scalars().all(), limit, descending)
+    return [position_store.overlay(a) for a in ambulances], next_cursor
+
+async def get_available_ambulances(db: AsyncSession) -> List[Ambulance]:
+    result = await db.execute(select(Ambulance).filter(Ambulance.status == AmbulanceStatus.DISPONIBLE))
+    return [position_store.overlay(a) for a in result.scalars().all()]
+
+async def get_ambulances_rows(db: AsyncSession, skip: int = 0, limit: int = 100, projection: RowProjection = AMBULANCE_ROWS) -> List[dict]:
+    result = await db.execute(projection.select().offset(skip).limit(limit))
+    return position_store.overlay_rows(projection.as_dicts(result))
+
+async def get_available_ambulances_rows(db: AsyncSession, projection: RowProjection = AMBULANCE_ROWS) -> List[dict]:
+    result = await db.execute(projection.select().filter(Ambulance.status == AmbulanceStatus.DISPONIBLE))
+    return position_store.overlay_rows(projection.as_dicts(result))
+
+async def create_ambulance(db: AsyncSession, ambulance: AmbulanceCreate) -> Ambulance:
+    db_ambulance = Ambulance(
+        plate_number=ambulance.plate_number,
+        model=ambulance.model,
+        capacity=ambulance.capacity,
+        status=ambulance.status,
+        latitude=ambulance.latitude,
+        longitude=ambulance.longitude,
+        location_updated_at=datetime.utcnow() if ambulance.latitude and ambulance.longitude else None,
+        equipment=ambulance.equipment,
+        fuel_level=ambulance.fuel_level,
+        mileage=ambulance.mileage
+    )
+    db.add(db_ambulance)
+    await db.commit()
+    await db.refresh(db_ambulance)
+    ambulance_index.upsert_ambulance(db_ambulance)
+    read_cache.bump("ambulances")
+    return db_ambulance
+
+async def conflicting_plates(db: AsyncSession, ambulances: Sequence[AmbulanceCreate]) -> List[str]:
+    registered = (await db.execute(registered_plates_statement(ambulances))).scalars()
+    return sorted(set(duplicated_plates(ambulances)) | set(registered))
+
+async def bulk_create_ambulances(db: AsyncSession, ambulances: Sequence[AmbulanceCreate]) -> dict:
+    started = time.perf_counter()
+    rows = ambulance_rows(ambulances)
+    try:
+        chunks = await insert_chunked(db, Ambulance, rows, settings.BULK_INSERT_CHUNK_SIZE)
+    finally:
+        await run_in_threadpool(refresh_ambulance_index)
+        read_cache.bump("ambulances")
+    return bulk_stats(len(rows), chunks, started)
+
+async def update_ambulance(db: AsyncSession, ambulance_id: int, ambulance_update: AmbulanceUpdate) -> Optional[Ambulance]:
+    db_ambulance = await get_ambulance(db, ambulance_id)
+    if db_ambulance:
+        update_data = ambulance_update.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(db_ambulance, field, value)
+
+        # Mettre à jour la timestamp de localisation si les coordonnées changent
+        if 'latitude' in update_data or 'longitude' in update_data:
+            db_ambulance.location_updated_at = datetime.utcnow()
+
+        await db.commit()
+        if 'latitude' in update_data or 'longitude' in update_data:
+            position_store.discard(ambulance_id)
+        await db.refresh(db_ambulance)
+        position_store.overlay(db_ambulance)
+        ambulance_index.upsert_ambulance(db_ambulance)
+        read_cache.bump("ambulances")
+    return db_ambulance
+
+async def update_ambulance_location(db: AsyncSession, ambulance_id: int, location: AmbulanceLocation) -> Optional[Ambulance]:
+    db_ambulance = await get_ambulance(db, ambulance_id)
+    if db_ambulance:
+        now = datetime.utcnow()
+        history = [history_row(ambulance_id, location.latitude, location.longitude, now)]
+        if settings.POSITION_WRITE_BEHIND:
+            # Écriture différée : pas d'UPDATE ni de verrou de ligne, la position est lue depuis le store
+            position_store.record(ambulance_id, location.latitude, location.longitude, now)
+            position_store.append_history(history)
+            position_store.overlay(db_ambulance)
+        else:
+            db_ambulance.latitude = location.latitude
+            db_ambulance.longitude = location.longitude
+            db_ambulance.location_updated_at = now
+            await db.execute(location_history_insert(), history)
+            await db.commit()
+            await db.refresh(db_ambulance)
+        ambulance_index.upsert_ambulance(db_ambulance)
+        read_cache.touch("ambulances")
+        location_fixes.inc(1, ("ingested",))
+        event_bus.publish(ambulance_event(AMBULANCE_LOCATION, db_ambulance))
+    return db_ambulance
+
+async def ingest_location_fixes(db: AsyncSession, fixes: List[AmbulanceLocationFix]) -> dict:
+    stats = {
+        "received": len(fixes),
+        "ingested": 0,
+        "superseded": 0,
+        "out_of_order": 0,
+        "rejected": 0,
+        "unknown_ambulances": [],
+    }
+    valid = drop_future_fixes(fixes, stats)
+    latest = coalesce_location_fixes(valid, stats)
+    result = await db.execute(
+        select(Ambulance.id, Ambulance.location_updated_at).filter(Ambulance.id.in_(list(latest)))
+    )
+    stored = dict(result.all())
+    accepted = filter_fresh_fixes(latest, stored, stats)
+    history = fixes_history(valid, stored)
+    positions = fixes_to_positions(accepted)
+    if settings.POSITION_WRITE_BEHIND:
+        stats["ingested"] = sum(
+            position_store.record(ambulance_id, p.latitude, p.longitude, p.timestamp)
+            for ambulance_id, p in positions.items()
+        )
+        position_store.append_history(history)
+    elif history:
+        if positions:
+            stats["ingested"] = (await db.execute(positions_update(positions))).rowcount
+        await db.execute(location_history_insert(), history)
+        await db.commit()
+    stats["out_of_order"] += len(accepted) - stats["ingested"]
+    for ambulance_id, fix in accepted.items():
+        ambulance_index.update_position(ambulance_id, fix.latitude, fix.longitude)
+    if accepted:
+        read_cache.touch("ambulances")
+    count_location_fixes(stats)
+    event_bus.publish(*(
+        position_event(ambulance_id, p.latitude, p.longitude, p.timestamp) for ambulance_id, p in positions.items()
+    ))
+    return stats
+
+async def update_ambulance_status(db: AsyncSession, ambulance_id: int, status: AmbulanceStatus) -> Optional[Ambulance]:
+    db_ambulance = await get_ambulance(db, ambulance_id)
+    if db_ambulance:
+        db_ambulance.status = status
+        await db.commit()
+        await db.refresh(db_ambulance)
+        position_store.overlay(db_ambulance)
+        ambulance_index.upsert_ambulance(db_ambulance)
+        read_cache.bump("ambulances")
+        event_bus.publish(ambulance_event(AMBULANCE_STATUS, db_ambulance))
+    return db_ambulance
+
+async def delete_ambulance(db: AsyncSession, ambulance_id: int) -> bool:
+    db_ambulance = await get_ambulance(db, ambulance_id)
+    if db_ambulance:
+        await db.delete(db_ambulance)
+        await db.commit()
+        ambulance_index.remove(ambulance_id)
+        read_cache.bump("ambulances")
+        return True
+    return False
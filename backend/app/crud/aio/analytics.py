@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.crud.analytics import count_rollups_query, metric_rollups_query, rollup_statements
+from app.models.mission import MissionPriority
+from app.services.analytics import MissionFacts, RollupDelta, mission_delta
+
+async def apply_rollup_delta(db: AsyncSession, delta: RollupDelta) -> None:
+    if not settings.ANALYTICS_ROLLUPS_ENABLED:
+        return
+    for statement, rows in rollup_statements(db.bind.dialect.name, delta):
+        await db.execute(statement, rows)
+
+async def apply_mission_rollups(db: AsyncSession, before: Optional[MissionFacts], after: Optional[MissionFacts]) -> None:
+    await apply_rollup_delta(db, mission_delta(before, after))
+
+async def get_count_rollups(db: AsyncSession, granularity: str, start: datetime, end: datetime,
+                            priority: Optional[MissionPriority] = None) -> List[tuple]:
+    result = await db.execute(count_rollups_query(granularity, start, end, priority))
+    return result.all()
+
+async def get_metric_rollups(db: AsyncSession, metric: str, granularity: str, start: datetime, end: datetime,
+                             priority: Optional[MissionPriority] = None) -> List[tuple]:
+    result = await db.execute(metric_rollups_query(metric, granularity, start, end, priority))
+    return result.all()
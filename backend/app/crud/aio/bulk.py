@@ -0,0 +1,26 @@
+from typing import Awaitable, Callable, Iterable, List, Optional, Sequence
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.bulk import chunked, existing_ids_statement
+
+async def missing_ids(db: AsyncSession, model, ids: Iterable[int]) -> List[int]:
+    wanted = set(ids)
+    if not wanted:
+        return []
+    result = await db.execute(existing_ids_statement(model, wanted))
+    return sorted(wanted - set(result.scalars()))
+
+async def insert_chunked(db: AsyncSession, model, rows: Sequence[dict], chunk_size: int,
+                         before_commit: Optional[Callable[[AsyncSession, Sequence[dict]], Awaitable[None]]] = None) -> int:
+    chunks = 0
+    for chunk in chunked(rows, chunk_size):
+        try:
+            await db.execute(insert(model), chunk)
+            if before_commit is not None:
+                await before_commit(db, chunk)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        chunks += 1
+    return chunks
@@ -0,0 +1,59 @@
+import time
+from typing import List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.crud.aio.bulk import insert_chunked
+from app.crud.bulk import bulk_stats
+from app.models.hospital import Hospital
+from app.schemas.hospital import HospitalCreate, HospitalUpdate
+from app.services.hospital_snapshot import hospital_snapshot
+from app.services.read_cache import read_cache
+
+async def get_hospital(db: AsyncSession, hospital_id: int) -> Optional[Hospital]:
+    result = await db.execute(select(Hospital).filter(Hospital.id == hospital_id))
+    return result.scalars().first()
+
+async def get_hospitals(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Hospital]:
+    result = await db.execute(select(Hospital).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def create_hospital(db: AsyncSession, hospital: HospitalCreate) -> Hospital:
+    db_hospital = Hospital(**hospital.dict())
+    db.add(db_hospital)
+    await db.commit()
+    await db.refresh(db_hospital)
+    hospital_snapshot.invalidate()
+    read_cache.bump("hospitals")
+    return db_hospital
+
+async def bulk_create_hospitals(db: AsyncSession, hospitals: Sequence[HospitalCreate]) -> dict:
+    started = time.perf_counter()
+    rows = [hospital.dict() for hospital in hospitals]
+    try:
+        chunks = await insert_chunked(db, Hospital, rows, settings.BULK_INSERT_CHUNK_SIZE)
+    finally:
+        hospital_snapshot.invalidate()
+        read_cache.bump("hospitals")
+    return bulk_stats(len(rows), chunks, started)
+
+async def update_hospital(db: AsyncSession, hospital_id: int, hospital_update: HospitalUpdate) -> Optional[Hospital]:
+    db_hospital = await get_hospital(db, hospital_id)
+    if db_hospital:
+        for field, value in hospital_update.dict(exclude_unset=True).items():
+            setattr(db_hospital, field, value)
+        await db.commit()
+        await db.refresh(db_hospital)
+        hospital_snapshot.invalidate()
+        read_cache.bump("hospitals")
+    return db_hospital
+
+async def delete_hospital(db: AsyncSession, hospital_id: int) -> bool:
+    db_hospital = await get_hospital(db, hospital_id)
+    if db_hospital:
+        await db.delete(db_hospital)
+        await db.commit()
+        hospital_snapshot.invalidate()
+        read_cache.bump("hospitals")
+        return True
+    return False
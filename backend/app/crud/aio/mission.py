@@ -0,0 +1,217 @@
+import time
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.crud.aio.analytics import apply_mission_rollups, apply_rollup_delta
+from app.crud.aio.bulk import insert_chunked
+from app.crud.bulk import bulk_stats
+from app.crud.mission import (
+    ACTIVE_MISSION_STATUSES, MISSION_ROWS, apply_dispatch_plan, claim_statement, dispatch_candidates_statement, expansion_options,
+    export_missions_statement, filter_missions, import_rollup_delta, mission_import_rows, next_pending_statement, overlay_expansions,
+    pending_dispatch_statement, plan_pending_dispatch
+)
+from app.crud.pagination import keyset, page
+from app.models.mission import Mission, MissionStatus
+from app.schemas.mission import MissionCreate, MissionImport, MissionUpdate, MissionAssignment
+from app.services.analytics import mission_facts
+from app.services.fast_json import RowProjection
+from app.services.events import MISSION_ASSIGNED, MISSION_CREATED, MISSION_STATUS, event_bus, mission_event
+from app.services.metrics import missions_assigned, missions_completed, missions_created
+from app.services.read_cache import read_cache
+from app.services.mission_queue import mission_queue, refresh_mission_queue
+from datetime import datetime
+
+async def get_mission(db: AsyncSession, mission_id: int, expand: Sequence[str] = ()) -> Optional[Mission]:
+    result = await db.execute(select(Mission).options(*expansion_options(expand, joined=True)).filter(Mission.id == mission_id))
+    db_mission = result.scalars().first()
+    if db_mission is not None:
+        overlay_expansions([db_mission], expand)
+    return db_mission
+
+async def get_missions(db: AsyncSession, skip: int = 0, limit: int = 100, expand: Sequence[str] = ()) -> List[Mission]:
+    result = await db.execute(select(Mission).options(*expansion_options(expand)).offset(skip).limit(limit))
+    return overlay_expansions(result.scalars().all(), expand)
+
+async def get_missions_page(db: AsyncSession, cursor: Optional[str] = None, limit: int = 50, descending: bool = True,
+                            **filters) -> Tuple[List[Mission], Optional[str]]:
+    statement = keyset(filter_missions(select(Mission), **filters), Mission.id, cursor, limit, descending)
+    result = await db.execute(statement)
+    return page(result.scalars().all(), limit, descending)
+
+async def stream_missions(db: AsyncSession, batch_size: int = 1000, **filters) -> AsyncIterator[Sequence]:
+    result = await db.stream(export_missions_statement(**filters).execution_options(yield_per=batch_size))
+    try:
+        async for partition in result.partitions():
+            yield partition
+    finally:
+        await result.close()
+
+async def get_missions_by_status(db: AsyncSession, status: MissionStatus) -> List[Mission]:
+    result = await db.execute(select(Mission).filter(Mission.status == status))
+    return result.scalars().all()
+
+async def get_active_missions(db: AsyncSession, expand: Sequence[str] = ()) -> List[Mission]:
+    result = await db.execute(select(Mission).options(*expansion_options(expand)).filter(Mission.status.in_(ACTIVE_MISSION_STATUSES)))
+    return overlay_expansions(result.scalars().all(), expand)
+
+async def get_missions_rows(db: AsyncSession, skip: int = 0, limit: int = 100, projection: RowProjection = MISSION_ROWS) -> List[dict]:
+    return projection.as_dicts(await db.execute(projection.select().offset(skip).limit(limit)))
+
+async def get_active_missions_rows(db: AsyncSession, projection: RowProjection = MISSION_ROWS) -> List[dict]:
+    return projection.as_dicts(await db.execute(projection.select().filter(Mission.status.in_(ACTIVE_MISSION_STATUSES))))
+
+async def create_mission(db: AsyncSession, mission: MissionCreate) -> Mission:
+    db_mission = Mission(
+        patient_name=mission.patient_name,
+        patient_phone=mission.patient_phone,
+        patient_age=mission.patient_age,
+        patient_condition=mission.patient_condition,
+        priority=mission.priority,
+        pickup_address=mission.pickup_address,
+        pickup_latitude=mission.pickup_latitude,
+        pickup_longitude=mission.pickup_longitude,
+        hospital_id=mission.hospital_id,
+        estimated_duration=mission.estimated_duration,
+        symptoms=mission.symptoms,
+        notes=mission.notes
+    )
+    db.add(db_mission)
+    # created_at (défaut serveur) fixe le créneau des agrégats
+    await db.flush()
+    await db.refresh(db_mission, ["created_at"])
+    await apply_mission_rollups(db, None, mission_facts(db_mission))
+    await db.commit()
+    await db.refresh(db_mission)
+    mission_queue.track(db_mission)
+    read_cache.bump("missions")
+    missions_created.inc(1, ("api",))
+    event_bus.publish(mission_event(MISSION_CREATED, db_mission))
+    return db_mission
+
+async def import_missions(db: AsyncSession, missions: Sequence[MissionImport]) -> dict:
+    started = time.perf_counter()
+    rows = mission_import_rows(missions)
+
+    async def apply_chunk_rollups(db: AsyncSession, chunk) -> None:
+        await apply_rollup_delta(db, import_rollup_delta(chunk))
+
+    try:
+        chunks = await insert_chunked(db, Mission, rows, settings.BULK_INSERT_CHUNK_SIZE, before_commit=apply_chunk_rollups)
+    finally:
+        if any(row["status"] == MissionStatus.EN_ATTENTE for row in rows):
+            await run_in_threadpool(refresh_mission_queue)
+        read_cache.bump("missions")
+    missions_created.inc(len(rows), ("import",))
+    return bulk_stats(len(rows), chunks, started)
+
+async def update_mission(db: AsyncSession, mission_id: int, mission_update: MissionUpdate) -> Optional[Mission]:
+    db_mission = await get_mission(db, mission_id)
+    if db_mission:
+        before = mission_facts(db_mission)
+        update_data = mission_update.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(db_mission, field, value)
+        await apply_mission_rollups(db, before, mission_facts(db_mission))
+        await db.commit()
+        await db.refresh(db_mission)
+        mission_queue.track(db_mission)
+        read_cache.bump("missions")
+    return db_mission
+
+async def assign_mission(db: AsyncSession, mission_id: int, assignment: MissionAssignment) -> Optional[Mission]:
+    db_mission = await get_mission(db, mission_id)
+    if db_mission:
+        before = mission_facts(db_mission)
+        db_mission.ambulance_id = assignment.ambulance_id
+        db_mission.assigned_personnel = assignment.personnel_ids
+        db_mission.status = MissionStatus.ASSIGNEE
+        db_mission.assigned_at = datetime.utcnow()
+        await apply_mission_rollups(db, before, mission_facts(db_mission))
+        await db.commit()
+        await db.refresh(db_mission)
+        mission_queue.track(db_mission)
+        read_cache.bump("missions")
+        missions_assigned.inc(1, ("manual",))
+        event_bus.publish(mission_event(MISSION_ASSIGNED, db_mission))
+    return db_mission
+
+async def update_mission_status(db: AsyncSession, mission_id: int, status: MissionStatus) -> Optional[Mission]:
+    db_mission = await get_mission(db, mission_id)
+    if db_mission:
+        before = mission_facts(db_mission)
+        completing = status == MissionStatus.TERMINEE and db_mission.status != MissionStatus.TERMINEE
+        db_mission.status = status
+
+        if status == MissionStatus.EN_COURS and not db_mission.started_at:
+            db_mission.started_at = datetime.utcnow()
+        elif status == MissionStatus.TERMINEE and not db_mission.completed_at:
+            db_mission.completed_at = datetime.utcnow()
+            if db_mission.started_at:
+                duration = (datetime.utcnow() - db_mission.started_at).total_seconds() / 60
+                db_mission.actual_duration = int(duration)
+
+        await apply_mission_rollups(db, before, mission_facts(db_mission))
+        await db.commit()
+        await db.refresh(db_mission)
+        mission_queue.track(db_mission)
+        read_cache.bump("missions")
+        if completing:
+            missions_completed.inc()
+        event_bus.publish(mission_event(MISSION_STATUS, db_mission))
+    return db_mission
+
+async def delete_mission(db: AsyncSession, mission_id: int) -> bool:
+    db_mission = await get_mission(db, mission_id)
+    if db_mission:
+        before = mission_facts(db_mission)
+        await apply_mission_rollups(db, before, None)
+        await db.delete(db_mission)
+        await db.commit()
+        mission_queue.discard(mission_id)
+        read_cache.bump("missions")
+        return True
+    return False
+
+async def dispatch_pending_missions(db: AsyncSession, max_distance_km: Optional[float] = None, dry_run: bool = False) -> dict:
+    missions = (await db.execute(pending_dispatch_statement())).scalars().all()
+    ambulances = (await db.execute(dispatch_candidates_statement())).scalars().all() if missions else []
+    # Le calcul (matrice + affectation) est CPU : hors de la boucle d'événements
+    plan = await run_in_threadpool(plan_pending_dispatch, missions, ambulances, max_distance_km)
+    if dry_run or not plan["assignments"]:
+        await db.rollback()
+        return {**plan, "applied": False}
+    assigned, delta = apply_dispatch_plan({m.id: m for m in missions}, plan)
+    await apply_rollup_delta(db, delta)
+    await db.commit()
+    for db_mission in assigned:
+        mission_queue.discard(db_mission.id)
+    read_cache.bump("missions")
+    missions_assigned.inc(len(assigned), ("dispatch",))
+    event_bus.publish(*(mission_event(MISSION_ASSIGNED, db_mission) for db_mission in assigned))
+    return {**plan, "applied": True}
+
+async def claim_next_mission(db: AsyncSession, assignment: MissionAssignment) -> Optional[Mission]:
+    while True:
+        db_mission = (await db.execute(next_pending_statement())).scalars().first()
+        if db_mission is None:
+            await db.rollback()
+            return None
+        try:
+            before = mission_facts(db_mission)
+            result = await db.execute(claim_statement(db_mission.id, assignment, datetime.utcnow()))
+            if result.rowcount != 1:
+                await db.rollback()
+                continue
+            await db.refresh(db_mission)
+            await apply_mission_rollups(db, before, mission_facts(db_mission))
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        mission_queue.discard(db_mission.id)
+        read_cache.bump("missions")
+        missions_assigned.inc(1, ("queue",))
+        event_bus.publish(mission_event(MISSION_ASSIGNED, db_mission))
+        return db_mission
@@ -0,0 +1,90 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.pagination import keyset, page
+from app.models.user import User, UserRole
+from app.crud.user import USER_ROWS
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.read_cache import read_cache
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(select(User).filter(User.id == user_id))
+    return result.scalars().first()
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(select(User).filter(User.username == username))
+    return result.scalars().first()
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).filter(User.email == email))
+    return result.scalars().first()
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await db.execute(select(User).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_users_rows(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[dict]:
+    return USER_ROWS.as_dicts(await db.execute(USER_ROWS.select().offset(skip).limit(limit)))
+
+async def get_users_page(db: AsyncSession, cursor: Optional[str] = None, limit: int = 50, descending: bool = False,
+                         role: Optional[UserRole] = None, is_active: Optional[bool] = None) -> Tuple[List[User], Optional[str]]:
+    statement = select(User)
+    if role is not None:
+        statement = statement.filter(User.role == role)
+    if is_active is not None:
+        statement = statement.filter(User.is_active == is_active)
+    result = await db.execute(keyset(statement, User.id, cursor, limit, descending))
+    return page(result.scalars().all(), limit, descending)
+
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
+    # bcrypt est CPU-bound : calculé dans le pool dédié, sans bloquer la boucle d'événements
+    hashed_password = await password_hasher.hash_async(user.password)
+    db_user = User(
+        username=user.username,
+        email=user.email,
+        hashed_password=hashed_password,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        phone=user.phone,
+        role=user.role,
+        is_active=user.is_active
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    read_cache.bump("users")
+    return db_user
+
+async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate) -> Optional[User]:
+    db_user = await get_user(db, user_id)
+    if db_user:
+        previous_username = db_user.username
+        update_data = user_update.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(db_user, field, value)
+        await db.commit()
+        await db.refresh(db_user)
+        principal_cache.invalidate(previous_username, db_user.username)
+        read_cache.bump("users")
+    return db_user
+
+async def delete_user(db: AsyncSession, user_id: int) -> bool:
+    db_user = await get_user(db, user_id)
+    if db_user:
+        username = db_user.username
+        await db.delete(db_user)
+        await db.commit()
+        principal_cache.invalidate(username)
+        read_cache.bump("users")
+        return True
+    return False
+
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
+    user = await get_user_by_username(db, username)
+    if not user:
+        return None
+    if not await password_hasher.verify_async(password, user.hashed_password):
+        return None
+    return user
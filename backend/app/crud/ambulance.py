@@ -1,20 +1,54 @@
-from typing import List, Optional
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.bulk import bulk_stats, insert_chunked
+from app.crud.location import append_locations, history_row
+from app.crud.pagination import keyset, page
 from app.models.ambulance import Ambulance, AmbulanceStatus
-from app.schemas.ambulance import AmbulanceCreate, AmbulanceUpdate, AmbulanceLocation
-from datetime import datetime
+from app.schemas.ambulance import Ambulance as AmbulanceSchema, AmbulanceCreate, AmbulanceUpdate, AmbulanceLocation, AmbulanceLocationFix
+from app.schemas.ambulance import AmbulanceMapPoint, AmbulanceSummary
+from app.crud.fieldsets import Fieldsets
+from app.services.fast_json import RowProjection
+from app.services.position_store import LivePosition, position_store, positions_update
+from app.services.events import AMBULANCE_LOCATION, AMBULANCE_STATUS, ambulance_event, event_bus, position_event
+from app.services.metrics import count_location_fixes, location_fixes
+from app.services.read_cache import read_cache
+from app.services.spatial_index import ambulance_index, refresh_ambulance_index
+from datetime import datetime, timedelta, timezone
 
 def get_ambulance(db: Session, ambulance_id: int) -> Optional[Ambulance]:
-    return db.query(Ambulance).filter(Ambulance.id == ambulance_id).first()
+    return position_store.overlay(db.query(Ambulance).filter(Ambulance.id == ambulance_id).first())
 
 def get_ambulance_by_plate(db: Session, plate_number: str) -> Optional[Ambulance]:
     return db.query(Ambulance).filter(Ambulance.plate_number == plate_number).first()
 
 def get_ambulances(db: Session, skip: int = 0, limit: int = 100) -> List[Ambulance]:
-    return db.query(Ambulance).offset(skip).limit(limit).all()
+    return [position_store.overlay(a) for a in db.query(Ambulance).offset(skip).limit(limit).all()]
+
+def get_ambulances_page(db: Session, cursor: Optional[str] = None, limit: int = 50, descending: bool = False,
+                        status: Optional[AmbulanceStatus] = None) -> Tuple[List[Ambulance], Optional[str]]:
+    query = db.query(Ambulance)
+    if status is not None:
+        query = query.filter(Ambulance.status == status)
+    ambulances, next_cursor = page(keyset(query, Ambulance.id, cursor, limit, descending).all(), limit, descending)
+    return [position_store.overlay(a) for a in ambulances], next_cursor
 
 def get_available_ambulances(db: Session) -> List[Ambulance]:
-    return db.query(Ambulance).filter(Ambulance.status == AmbulanceStatus.DISPONIBLE).all()
+    ambulances = db.query(Ambulance).filter(Ambulance.status == AmbulanceStatus.DISPONIBLE).all()
+    return [position_store.overlay(a) for a in ambulances]
+
+AMBULANCE_FIELDSETS = Fieldsets(AmbulanceSchema, Ambulance, {"summary": AmbulanceSummary, "map": AmbulanceMapPoint})
+AMBULANCE_ROWS = AMBULANCE_FIELDSETS.full
+
+def get_ambulances_rows(db: Session, skip: int = 0, limit: int = 100, projection: RowProjection = AMBULANCE_ROWS) -> List[dict]:
+    return position_store.overlay_rows(projection.as_dicts(db.execute(projection.select().offset(skip).limit(limit))))
+
+def get_available_ambulances_rows(db: Session, projection: RowProjection = AMBULANCE_ROWS) -> List[dict]:
+    rows = db.execute(projection.select().filter(Ambulance.status == AmbulanceStatus.DISPONIBLE))
+    return position_store.overlay_rows(projection.as_dicts(rows))
 
 def create_ambulance(db: Session, ambulance: AmbulanceCreate) -> Ambulance:
     db_ambulance = Ambulance(
@@ -32,8 +66,44 @@ def create_ambulance(db: Session, ambulance: AmbulanceCreate) -> Ambulance:
     db.add(db_ambulance)
     db.commit()
     db.refresh(db_ambulance)
+    ambulance_index.upsert_ambulance(db_ambulance)
+    read_cache.bump("ambulances")
     return db_ambulance
 
+def ambulance_rows(ambulances: Sequence[AmbulanceCreate]) -> List[dict]:
+    now = datetime.utcnow()
+    return [
+        dict(
+            plate_number=a.plate_number, model=a.model, capacity=a.capacity, status=a.status,
+            latitude=a.latitude, longitude=a.longitude,
+            location_updated_at=now if a.latitude and a.longitude else None,
+            equipment=a.equipment, fuel_level=a.fuel_level, mileage=a.mileage
+        )
+        for a in ambulances
+    ]
+
+def duplicated_plates(ambulances: Sequence[AmbulanceCreate]) -> List[str]:
+    return [plate for plate, count in Counter(a.plate_number for a in ambulances).items() if count > 1]
+
+def registered_plates_statement(ambulances: Sequence[AmbulanceCreate]):
+    return select(Ambulance.plate_number).filter(Ambulance.plate_number.in_({a.plate_number for a in ambulances}))
+
+def conflicting_plates(db: Session, ambulances: Sequence[AmbulanceCreate]) -> List[str]:
+    """Immatriculations en double dans le lot ou déjà enregistrées"""
+    registered = db.execute(registered_plates_statement(ambulances)).scalars()
+    return sorted(set(duplicated_plates(ambulances)) | set(registered))
+
+def bulk_create_ambulances(db: Session, ambulances: Sequence[AmbulanceCreate]) -> dict:
+    started = time.perf_counter()
+    rows = ambulance_rows(ambulances)
+    try:
+        chunks = insert_chunked(db, Ambulance, rows, settings.BULK_INSERT_CHUNK_SIZE)
+    finally:
+        # Les lots validés restent écrits même si un lot suivant échoue : index rechargé depuis la base
+        refresh_ambulance_index()
+        read_cache.bump("ambulances")
+    return bulk_stats(len(rows), chunks, started)
+
 def update_ambulance(db: Session, ambulance_id: int, ambulance_update: AmbulanceUpdate) -> Optional[Ambulance]:
     db_ambulance = get_ambulance(db, ambulance_id)
     if db_ambulance:
@@ -46,25 +116,143 @@ def update_ambulance(db: Session, ambulance_id: int, ambulance_update: Ambulance
             db_ambulance.location_updated_at = datetime.utcnow()
         
         db.commit()
+        if 'latitude' in update_data or 'longitude' in update_data:
+            position_store.discard(ambulance_id)
         db.refresh(db_ambulance)
+        position_store.overlay(db_ambulance)
+        ambulance_index.upsert_ambulance(db_ambulance)
+        read_cache.bump("ambulances")
     return db_ambulance
 
 def update_ambulance_location(db: Session, ambulance_id: int, location: AmbulanceLocation) -> Optional[Ambulance]:
     db_ambulance = get_ambulance(db, ambulance_id)
     if db_ambulance:
-        db_ambulance.latitude = location.latitude
-        db_ambulance.longitude = location.longitude
-        db_ambulance.location_updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_ambulance)
+        now = datetime.utcnow()
+        history = [history_row(ambulance_id, location.latitude, location.longitude, now)]
+        if settings.POSITION_WRITE_BEHIND:
+            # Écriture différée : pas d'UPDATE ni de verrou de ligne, la position est lue depuis le store
+            position_store.record(ambulance_id, location.latitude, location.longitude, now)
+            position_store.append_history(history)
+            position_store.overlay(db_ambulance)
+        else:
+            db_ambulance.latitude = location.latitude
+            db_ambulance.longitude = location.longitude
+            db_ambulance.location_updated_at = now
+            append_locations(db, history)
+            db.commit()
+            db.refresh(db_ambulance)
+        ambulance_index.upsert_ambulance(db_ambulance)
+        read_cache.touch("ambulances")
+        location_fixes.inc(1, ("ingested",))
+        event_bus.publish(ambulance_event(AMBULANCE_LOCATION, db_ambulance))
     return db_ambulance
 
+def as_naive_utc(value: datetime) -> datetime:
+    # Les horodatages sont stockés en UTC naïf (datetime.utcnow)
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def drop_future_fixes(fixes: List[AmbulanceLocationFix], stats: dict) -> List[AmbulanceLocationFix]:
+    """Écarter les horodatages trop loin dans le futur (horloge du terminal déréglée)"""
+    max_timestamp = datetime.utcnow() + timedelta(seconds=settings.TELEMETRY_MAX_CLOCK_SKEW_SECONDS)
+    valid = [fix for fix in fixes if as_naive_utc(fix.device_timestamp) <= max_timestamp]
+    stats["rejected"] += len(fixes) - len(valid)
+    return valid
+
+def coalesce_location_fixes(fixes: List[AmbulanceLocationFix], stats: dict) -> Dict[int, AmbulanceLocationFix]:
+    """Ne garder que la position la plus récente (horodatage terminal) de chaque ambulance du lot"""
+    latest: Dict[int, AmbulanceLocationFix] = {}
+    for fix in fixes:
+        current = latest.get(fix.ambulance_id)
+        if current is not None:
+            stats["superseded"] += 1
+            if as_naive_utc(fix.device_timestamp) <= as_naive_utc(current.device_timestamp):
+                continue
+        latest[fix.ambulance_id] = fix
+    return latest
+
+def fixes_history(fixes: List[AmbulanceLocationFix], known_ids) -> List[dict]:
+    # Toutes les positions valides sont historisées, y compris celles arrivées en retard
+    return [
+        history_row(fix.ambulance_id, fix.latitude, fix.longitude, as_naive_utc(fix.device_timestamp))
+        for fix in fixes if fix.ambulance_id in known_ids
+    ]
+
+def filter_fresh_fixes(latest: Dict[int, AmbulanceLocationFix], stored: Dict[int, Optional[datetime]], stats: dict) -> Dict[int, AmbulanceLocationFix]:
+    """Écarter les ambulances inconnues et les positions antérieures à la dernière connue (base ou store)"""
+    accepted = {}
+    for ambulance_id, fix in latest.items():
+        if ambulance_id not in stored:
+            stats["unknown_ambulances"].append(ambulance_id)
+            continue
+        last_known = stored[ambulance_id]
+        pending = position_store.get(ambulance_id)
+        if pending is not None and (last_known is None or pending.timestamp > as_naive_utc(last_known)):
+            last_known = pending.timestamp
+        if last_known is not None and as_naive_utc(fix.device_timestamp) <= as_naive_utc(last_known):
+            stats["out_of_order"] += 1
+        else:
+            accepted[ambulance_id] = fix
+    return accepted
+
+def fixes_to_positions(accepted: Dict[int, AmbulanceLocationFix]) -> Dict[int, LivePosition]:
+    received_at = time.monotonic()
+    return {
+        ambulance_id: LivePosition(fix.latitude, fix.longitude, as_naive_utc(fix.device_timestamp), received_at)
+        for ambulance_id, fix in accepted.items()
+    }
+
+def ingest_location_fixes(db: Session, fixes: List[AmbulanceLocationFix]) -> dict:
+    stats = {
+        "received": len(fixes),
+        "ingested": 0,
+        "superseded": 0,
+        "out_of_order": 0,
+        "rejected": 0,
+        "unknown_ambulances": [],
+    }
+    valid = drop_future_fixes(fixes, stats)
+    latest = coalesce_location_fixes(valid, stats)
+    stored = dict(
+        db.query(Ambulance.id, Ambulance.location_updated_at).filter(Ambulance.id.in_(list(latest))).all()
+    )
+    accepted = filter_fresh_fixes(latest, stored, stats)
+    history = fixes_history(valid, stored)
+    positions = fixes_to_positions(accepted)
+    if settings.POSITION_WRITE_BEHIND:
+        stats["ingested"] = sum(
+            position_store.record(ambulance_id, p.latitude, p.longitude, p.timestamp)
+            for ambulance_id, p in positions.items()
+        )
+        position_store.append_history(history)
+    elif history:
+        if positions:
+            stats["ingested"] = db.execute(positions_update(positions)).rowcount
+        append_locations(db, history)
+        db.commit()
+    # Une écriture concurrente plus récente a pu gagner : elle n'est pas comptée comme ingérée
+    stats["out_of_order"] += len(accepted) - stats["ingested"]
+    for ambulance_id, fix in accepted.items():
+        ambulance_index.update_position(ambulance_id, fix.latitude, fix.longitude)
+    if accepted:
+        read_cache.touch("ambulances")
+    count_location_fixes(stats)
+    event_bus.publish(*(
+        position_event(ambulance_id, p.latitude, p.longitude, p.timestamp) for ambulance_id, p in positions.items()
+    ))
+    return stats
+
 def update_ambulance_status(db: Session, ambulance_id: int, status: AmbulanceStatus) -> Optional[Ambulance]:
     db_ambulance = get_ambulance(db, ambulance_id)
     if db_ambulance:
         db_ambulance.status = status
         db.commit()
         db.refresh(db_ambulance)
+        position_store.overlay(db_ambulance)
+        ambulance_index.upsert_ambulance(db_ambulance)
+        read_cache.bump("ambulances")
+        event_bus.publish(ambulance_event(AMBULANCE_STATUS, db_ambulance))
     return db_ambulance
 
 def delete_ambulance(db: Session, ambulance_id: int) -> bool:
@@ -72,5 +260,7 @@ def delete_ambulance(db: Session, ambulance_id: int) -> bool:
     if db_ambulance:
         db.delete(db_ambulance)
         db.commit()
+        ambulance_index.remove(ambulance_id)
+        read_cache.bump("ambulances")
         return True
     return False
\ No newline at end of file
@@ -0,0 +1,127 @@
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.analytics import MissionCountRollup, MissionMetricRollup
+from app.models.mission import Mission, MissionPriority
+from app.services.analytics import MissionFacts, RollupDelta, mission_delta, mission_facts
+
+logger = logging.getLogger(__name__)
+
+COUNT_KEYS = ["granularity", "bucket_start", "priority", "status"]
+METRIC_KEYS = ["granularity", "bucket_start", "priority", "metric", "bin"]
+# Dialectes disposant d'un upsert incrémental (voir _increment_upsert)
+ROLLUP_DIALECTS = ("mysql", "sqlite", "postgresql")
+
+def check_rollup_dialect(dialect_name: str) -> None:
+    """Au démarrage : sans upsert pour ce dialecte, désactiver les agrégats plutôt que faire échouer chaque écriture"""
+    if settings.ANALYTICS_ROLLUPS_ENABLED and dialect_name not in ROLLUP_DIALECTS:
+        logger.warning("Agrégats des missions désactivés : dialecte %s non pris en charge (%s)", dialect_name,
+                       ", ".join(ROLLUP_DIALECTS))
+        settings.ANALYTICS_ROLLUPS_ENABLED = False
+
+def _increment_upsert(dialect_name: str, model, keys: List[str], counters: List[str]):
+    """INSERT ... ON CONFLICT/DUPLICATE KEY UPDATE compteur = compteur + valeur insérée"""
+    table = model.__table__
+    if dialect_name == "mysql":
+        statement = mysql.insert(table)
+        return statement.on_duplicate_key_update({name: table.c[name] + statement.inserted[name] for name in counters})
+    if dialect_name in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect_name == "sqlite" else postgresql).insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=keys, set_={name: table.c[name] + statement.excluded[name] for name in counters}
+        )
+    raise NotImplementedError(f"Agrégats non pris en charge pour le dialecte {dialect_name}")
+
+def rollup_statements(dialect_name: str, delta: RollupDelta) -> List[Tuple[object, List[dict]]]:
+    statements = []
+    count_rows = delta.count_rows()
+    if count_rows:
+        statements.append((_increment_upsert(dialect_name, MissionCountRollup, COUNT_KEYS, ["missions"]), count_rows))
+    metric_rows = delta.metric_rows()
+    if metric_rows:
+        statements.append((_increment_upsert(dialect_name, MissionMetricRollup, METRIC_KEYS, ["samples", "total"]), metric_rows))
+    return statements
+
+def apply_rollup_delta(db: Session, delta: RollupDelta) -> None:
+    """Reporter des variations cumulées dans les agrégats, dans la transaction courante (sans commit)"""
+    if not settings.ANALYTICS_ROLLUPS_ENABLED:
+        return
+    for statement, rows in rollup_statements(db.bind.dialect.name, delta):
+        db.execute(statement, rows)
+
+def apply_mission_rollups(db: Session, before: Optional[MissionFacts], after: Optional[MissionFacts]) -> None:
+    apply_rollup_delta(db, mission_delta(before, after))
+
+def count_rollups_query(granularity: str, start: datetime, end: datetime, priority: Optional[MissionPriority] = None):
+    query = select(
+        MissionCountRollup.bucket_start, MissionCountRollup.priority, MissionCountRollup.status, MissionCountRollup.missions
+    ).filter(
+        MissionCountRollup.granularity == granularity,
+        MissionCountRollup.bucket_start >= start,
+        MissionCountRollup.bucket_start < end,
+        MissionCountRollup.missions != 0
+    )
+    if priority is not None:
+        query = query.filter(MissionCountRollup.priority == priority)
+    return query
+
+def metric_rollups_query(metric: str, granularity: str, start: datetime, end: datetime,
+                         priority: Optional[MissionPriority] = None):
+    query = select(
+        MissionMetricRollup.bucket_start, MissionMetricRollup.bin, MissionMetricRollup.samples, MissionMetricRollup.total
+    ).filter(
+        MissionMetricRollup.granularity == granularity,
+        MissionMetricRollup.bucket_start >= start,
+        MissionMetricRollup.bucket_start < end,
+        MissionMetricRollup.metric == metric
+    )
+    if priority is not None:
+        query = query.filter(MissionMetricRollup.priority == priority)
+    return query
+
+def get_count_rollups(db: Session, granularity: str, start: datetime, end: datetime,
+                      priority: Optional[MissionPriority] = None) -> List[tuple]:
+    return db.execute(count_rollups_query(granularity, start, end, priority)).all()
+
+def get_metric_rollups(db: Session, metric: str, granularity: str, start: datetime, end: datetime,
+                       priority: Optional[MissionPriority] = None) -> List[tuple]:
+    return db.execute(metric_rollups_query(metric, granularity, start, end, priority)).all()
+
+def rebuild_mission_rollups(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            batch_size: int = 5000, chunk_size: int = 1000) -> dict:
+    """Recalculer les agrégats des missions créées dans [start, end) à partir de la table missions.
+
+    `start` et `end` doivent tomber sur un début de journée pour que les créneaux journaliers
+    soient complets. Les missions sont lues en un seul passage (yield_per) ; les agrégats
+    existants de la période sont remplacés dans une seule transaction.
+    """
+    delta = RollupDelta()
+    query = select(
+        Mission.created_at, Mission.priority, Mission.status, Mission.actual_duration, Mission.assigned_at
+    ).order_by(Mission.id).execution_options(yield_per=batch_size)
+    if start is not None:
+        query = query.filter(Mission.created_at >= start)
+    if end is not None:
+        query = query.filter(Mission.created_at < end)
+    missions = 0
+    for mission in db.execute(query):
+        delta.add(mission_facts(mission))
+        missions += 1
+
+    for model in (MissionCountRollup, MissionMetricRollup):
+        statement = delete(model)
+        if start is not None:
+            statement = statement.where(model.bucket_start >= start)
+        if end is not None:
+            statement = statement.where(model.bucket_start < end)
+        db.execute(statement)
+    count_rows, metric_rows = delta.count_rows(), delta.metric_rows()
+    for model, rows in ((MissionCountRollup, count_rows), (MissionMetricRollup, metric_rows)):
+        for offset in range(0, len(rows), chunk_size):
+            db.execute(model.__table__.insert(), rows[offset:offset + chunk_size])
+    db.commit()
+    return {"missions": missions, "count_rows": len(count_rows), "metric_rows": len(metric_rows)}
@@ -0,0 +1,48 @@
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+def chunked(rows: Sequence[dict], chunk_size: int) -> Iterator[Sequence[dict]]:
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+def existing_ids_statement(model, ids: Iterable[int]):
+    return select(model.id).filter(model.id.in_(sorted(set(ids))))
+
+def missing_ids(db: Session, model, ids: Iterable[int]) -> List[int]:
+    """Ids absents de la table de `model`, pour refuser un import avant toute écriture"""
+    wanted = set(ids)
+    if not wanted:
+        return []
+    return sorted(wanted - set(db.execute(existing_ids_statement(model, wanted)).scalars()))
+
+def insert_chunked(db: Session, model, rows: Sequence[dict], chunk_size: int,
+                   before_commit: Optional[Callable[[Session, Sequence[dict]], None]] = None) -> int:
+    """INSERT ensembliste (executemany) par lots de `chunk_size` lignes, une transaction par lot.
+
+    `before_commit` écrit ce qui doit être validé avec le lot (agrégats). Un échec n'annule
+    que le lot en cours : les lots précédents restent écrits. Retourne le nombre de lots validés.
+    """
+    chunks = 0
+    for chunk in chunked(rows, chunk_size):
+        try:
+            db.execute(insert(model), chunk)
+            if before_commit is not None:
+                before_commit(db, chunk)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        chunks += 1
+    return chunks
+
+def bulk_stats(received: int, chunks: int, started: float) -> dict:
+    duration = time.perf_counter() - started
+    return {
+        "received": received,
+        "created": received,
+        "chunks": chunks,
+        "duration_ms": round(duration * 1000, 3),
+        "rows_per_second": round(received / duration, 1) if duration > 0 else 0.0,
+    }
@@ -0,0 +1,55 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+from app.services.fast_json import RowProjection
+
+MAX_CUSTOM_FIELDSETS = 128
+
+class InvalidFields(ValueError):
+    pass
+
+class Fieldsets:
+    """Projections demandées par `?fields=` : nom de projection (summary, map...) ou liste de champs du schéma.
+
+    La sélection des colonnes est faite en SQL (select des seules colonnes demandées) ; `id`
+    est toujours inclus. Les projections sont construites une fois puis réutilisées.
+    """
+
+    def __init__(self, schema, model, named: Dict[str, type]):
+        self.schema = schema
+        self.model = model
+        self.full = RowProjection(schema, model)
+        self.named = {name: RowProjection(named_schema, model) for name, named_schema in named.items()}
+        self._lock = threading.Lock()
+        self._custom: Dict[Tuple[str, ...], RowProjection] = {}
+
+    def resolve(self, fields: Optional[str]) -> RowProjection:
+        """Projection correspondant à `fields` ; représentation complète si `fields` est vide"""
+        if fields is None or not fields.strip():
+            return self.full
+        fields = fields.strip()
+        if fields in self.named:
+            return self.named[fields]
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested - set(self.full.fields)
+        if unknown:
+            raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+        # Ordre du schéma : une même sélection donne toujours la même projection (et le même JSON)
+        key = tuple(field for field in self.full.fields if field in requested or field == "id")
+        with self._lock:
+            projection = self._custom.get(key)
+            if projection is None:
+                if len(self._custom) >= MAX_CUSTOM_FIELDSETS:
+                    self._custom.clear()
+                projection = self._custom[key] = RowProjection(self.schema, self.model, key)
+        return projection
+
+def parse_expand(expand: Optional[str], allowed: Iterable[str]) -> Tuple[str, ...]:
+    """Relations demandées par `?expand=`, dédoublonnées et dans l'ordre de `allowed`"""
+    if expand is None:
+        return ()
+    allowed = list(allowed)
+    requested = {name.strip() for name in expand.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise InvalidFields(f"Unknown expansions: {', '.join(sorted(unknown))}")
+    return tuple(name for name in allowed if name in requested)
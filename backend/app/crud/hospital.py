@@ -0,0 +1,55 @@
+import time
+from typing import List, Optional, Sequence
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.bulk import bulk_stats, insert_chunked
+from app.models.hospital import Hospital
+from app.schemas.hospital import HospitalCreate, HospitalUpdate
+from app.services.hospital_snapshot import hospital_snapshot
+from app.services.read_cache import read_cache
+
+def get_hospital(db: Session, hospital_id: int) -> Optional[Hospital]:
+    return db.query(Hospital).filter(Hospital.id == hospital_id).first()
+
+def get_hospitals(db: Session, skip: int = 0, limit: int = 100) -> List[Hospital]:
+    return db.query(Hospital).offset(skip).limit(limit).all()
+
+def create_hospital(db: Session, hospital: HospitalCreate) -> Hospital:
+    db_hospital = Hospital(**hospital.dict())
+    db.add(db_hospital)
+    db.commit()
+    db.refresh(db_hospital)
+    hospital_snapshot.invalidate()
+    read_cache.bump("hospitals")
+    return db_hospital
+
+def bulk_create_hospitals(db: Session, hospitals: Sequence[HospitalCreate]) -> dict:
+    started = time.perf_counter()
+    rows = [hospital.dict() for hospital in hospitals]
+    try:
+        chunks = insert_chunked(db, Hospital, rows, settings.BULK_INSERT_CHUNK_SIZE)
+    finally:
+        hospital_snapshot.invalidate()
+        read_cache.bump("hospitals")
+    return bulk_stats(len(rows), chunks, started)
+
+def update_hospital(db: Session, hospital_id: int, hospital_update: HospitalUpdate) -> Optional[Hospital]:
+    db_hospital = get_hospital(db, hospital_id)
+    if db_hospital:
+        for field, value in hospital_update.dict(exclude_unset=True).items():
+            setattr(db_hospital, field, value)
+        db.commit()
+        db.refresh(db_hospital)
+        hospital_snapshot.invalidate()
+        read_cache.bump("hospitals")
+    return db_hospital
+
+def delete_hospital(db: Session, hospital_id: int) -> bool:
+    db_hospital = get_hospital(db, hospital_id)
+    if db_hospital:
+        db.delete(db_hospital)
+        db.commit()
+        hospital_snapshot.invalidate()
+        read_cache.bump("hospitals")
+        return True
+    return False
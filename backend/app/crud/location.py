@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.location import AmbulanceLocationHistory
+
+def history_row(ambulance_id: int, latitude: float, longitude: float, recorded_at: datetime) -> dict:
+    return {
+        "ambulance_id": ambulance_id,
+        "latitude": latitude,
+        "longitude": longitude,
+        "recorded_at": recorded_at,
+    }
+
+def location_history_insert():
+    # Insertion append-only ; une position déjà historisée (même ambulance, même horodatage) est ignorée
+    return (
+        insert(AmbulanceLocationHistory.__table__)
+        .prefix_with("IGNORE", dialect="mysql")
+        .prefix_with("OR IGNORE", dialect="sqlite")
+    )
+
+def append_locations(db: Session, rows: List[dict]) -> None:
+    """Ajouter des positions à l'historique dans la transaction courante (sans commit)"""
+    if rows:
+        db.execute(location_history_insert(), rows)
+
+def get_track_points(db: Session, ambulance_id: int, start: datetime, end: datetime) -> List[Tuple[datetime, float, float]]:
+    return (
+        db.query(
+            AmbulanceLocationHistory.recorded_at,
+            AmbulanceLocationHistory.latitude,
+            AmbulanceLocationHistory.longitude
+        )
+        .filter(
+            AmbulanceLocationHistory.ambulance_id == ambulance_id,
+            AmbulanceLocationHistory.recorded_at >= start,
+            AmbulanceLocationHistory.recorded_at <= end
+        )
+        .order_by(AmbulanceLocationHistory.recorded_at)
+        .all()
+    )
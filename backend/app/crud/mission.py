@@ -1,21 +1,104 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.models.mission import Mission, MissionStatus
-from app.schemas.mission import MissionCreate, MissionUpdate, MissionAssignment
+import time
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.core.config import settings
+from app.crud.analytics import apply_mission_rollups, apply_rollup_delta
+from app.crud.ambulance import as_naive_utc
+from app.crud.bulk import bulk_stats, insert_chunked
+from app.crud.pagination import keyset, page
+from app.models.ambulance import Ambulance, AmbulanceStatus
+from app.models.mission import Mission, MissionPriority, MissionStatus
+from app.schemas.mission import Mission as MissionSchema, MissionCreate, MissionImport, MissionUpdate, MissionAssignment, MissionMapPoint, MissionSummary
+from app.services.analytics import RollupDelta, mission_facts
+from app.services.dispatch import PRIORITY_RANK, CandidateAmbulance, PendingMission, plan_dispatch
+from app.services.events import MISSION_ASSIGNED, MISSION_CREATED, MISSION_STATUS, event_bus, mission_event
+from app.services.export import MISSION_EXPORT_FIELDS
+from app.crud.fieldsets import Fieldsets
+from app.services.fast_json import RowProjection
+from app.services.metrics import missions_assigned, missions_completed, missions_created
+from app.services.read_cache import read_cache
+from app.services.mission_queue import mission_queue, refresh_mission_queue
+from app.services.position_store import position_store
 from datetime import datetime
 
-def get_mission(db: Session, mission_id: int) -> Optional[Mission]:
-    return db.query(Mission).filter(Mission.id == mission_id).first()
+# Relations exposées par ?expand= et ressource du cache de lecture dont elles dépendent
+MISSION_EXPANSIONS = {"ambulance": Mission.ambulance, "hospital": Mission.hospital}
+EXPANSION_RESOURCES = {"ambulance": "ambulances", "hospital": "hospitals"}
 
-def get_missions(db: Session, skip: int = 0, limit: int = 100) -> List[Mission]:
-    return db.query(Mission).offset(skip).limit(limit).all()
+def read_resources(expand: Sequence[str]) -> Tuple[str, ...]:
+    """Ressources du cache de lecture dont dépend une liste de missions étendue"""
+    return ("missions", *(EXPANSION_RESOURCES[name] for name in expand))
+
+def expansion_options(expand: Sequence[str], joined: bool = False) -> list:
+    """Chargement anticipé : une requête IN par relation pour une liste (selectinload), une jointure pour une mission"""
+    loader = joinedload if joined else selectinload
+    return [loader(MISSION_EXPANSIONS[name]) for name in expand]
+
+def overlay_expansions(missions: Sequence[Mission], expand: Sequence[str]) -> Sequence[Mission]:
+    if "ambulance" in expand:
+        for mission in missions:
+            position_store.overlay(mission.ambulance)
+    return missions
+
+def get_mission(db: Session, mission_id: int, expand: Sequence[str] = ()) -> Optional[Mission]:
+    db_mission = db.query(Mission).options(*expansion_options(expand, joined=True)).filter(Mission.id == mission_id).first()
+    if db_mission is not None:
+        overlay_expansions([db_mission], expand)
+    return db_mission
+
+def get_missions(db: Session, skip: int = 0, limit: int = 100, expand: Sequence[str] = ()) -> List[Mission]:
+    missions = db.query(Mission).options(*expansion_options(expand)).offset(skip).limit(limit).all()
+    return overlay_expansions(missions, expand)
+
+def filter_missions(statement, status: Optional[MissionStatus] = None, priority: Optional[MissionPriority] = None,
+                    created_from: Optional[datetime] = None, created_to: Optional[datetime] = None):
+    if status is not None:
+        statement = statement.filter(Mission.status == status)
+    if priority is not None:
+        statement = statement.filter(Mission.priority == priority)
+    if created_from is not None:
+        statement = statement.filter(Mission.created_at >= as_naive_utc(created_from))
+    if created_to is not None:
+        statement = statement.filter(Mission.created_at < as_naive_utc(created_to))
+    return statement
+
+def get_missions_page(db: Session, cursor: Optional[str] = None, limit: int = 50, descending: bool = True,
+                      **filters) -> Tuple[List[Mission], Optional[str]]:
+    query = keyset(filter_missions(db.query(Mission), **filters), Mission.id, cursor, limit, descending)
+    return page(query.all(), limit, descending)
+
+def export_missions_statement(**filters):
+    columns = [getattr(Mission, field) for field in MISSION_EXPORT_FIELDS]
+    return filter_missions(select(*columns), **filters).order_by(Mission.id)
+
+def stream_missions(db: Session, batch_size: int = 1000, **filters) -> Iterator[Sequence]:
+    """Lots de tuples lus par curseur serveur (yield_per) : mémoire constante quelle que soit la période"""
+    result = db.execute(export_missions_statement(**filters).execution_options(yield_per=batch_size))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
 
 def get_missions_by_status(db: Session, status: MissionStatus) -> List[Mission]:
     return db.query(Mission).filter(Mission.status == status).all()
 
-def get_active_missions(db: Session) -> List[Mission]:
-    active_statuses = [MissionStatus.EN_ATTENTE, MissionStatus.ASSIGNEE, MissionStatus.EN_COURS]
-    return db.query(Mission).filter(Mission.status.in_(active_statuses)).all()
+ACTIVE_MISSION_STATUSES = [MissionStatus.EN_ATTENTE, MissionStatus.ASSIGNEE, MissionStatus.EN_COURS]
+
+def get_active_missions(db: Session, expand: Sequence[str] = ()) -> List[Mission]:
+    missions = db.query(Mission).options(*expansion_options(expand)).filter(Mission.status.in_(ACTIVE_MISSION_STATUSES)).all()
+    return overlay_expansions(missions, expand)
+
+# Chemin rapide des listes (FAST_JSON_LISTS) : dicts prêts à sérialiser, sans objets ORM
+MISSION_FIELDSETS = Fieldsets(MissionSchema, Mission, {"summary": MissionSummary, "map": MissionMapPoint})
+MISSION_ROWS = MISSION_FIELDSETS.full
+
+def get_missions_rows(db: Session, skip: int = 0, limit: int = 100, projection: RowProjection = MISSION_ROWS) -> List[dict]:
+    return projection.as_dicts(db.execute(projection.select().offset(skip).limit(limit)))
+
+def get_active_missions_rows(db: Session, projection: RowProjection = MISSION_ROWS) -> List[dict]:
+    return projection.as_dicts(db.execute(projection.select().filter(Mission.status.in_(ACTIVE_MISSION_STATUSES))))
 
 def create_mission(db: Session, mission: MissionCreate) -> Mission:
     db_mission = Mission(
@@ -33,34 +116,91 @@ def create_mission(db: Session, mission: MissionCreate) -> Mission:
         notes=mission.notes
     )
     db.add(db_mission)
+    # created_at (défaut serveur) fixe le créneau des agrégats
+    db.flush()
+    db.refresh(db_mission, ["created_at"])
+    apply_mission_rollups(db, None, mission_facts(db_mission))
     db.commit()
     db.refresh(db_mission)
+    mission_queue.track(db_mission)
+    read_cache.bump("missions")
+    missions_created.inc(1, ("api",))
+    event_bus.publish(mission_event(MISSION_CREATED, db_mission))
     return db_mission
 
+IMPORT_TIMESTAMPS = ("created_at", "assigned_at", "started_at", "completed_at")
+
+def mission_import_rows(missions: Sequence[MissionImport]) -> List[dict]:
+    now = datetime.utcnow()
+    rows = []
+    for mission in missions:
+        row = mission.dict()
+        for field in IMPORT_TIMESTAMPS:
+            if row[field] is not None:
+                row[field] = as_naive_utc(row[field])
+        # created_at explicite : il fixe le créneau des agrégats, calculés avant l'insertion
+        row["created_at"] = row["created_at"] or now
+        rows.append(row)
+    return rows
+
+def import_rollup_delta(rows: Sequence[dict]) -> RollupDelta:
+    delta = RollupDelta()
+    for row in rows:
+        delta.add(mission_facts(SimpleNamespace(**row)))
+    return delta
+
+def import_missions(db: Session, missions: Sequence[MissionImport]) -> dict:
+    """Reprise de missions par INSERT ensemblistes ; agrégats validés avec chaque lot, sans événements temps réel"""
+    started = time.perf_counter()
+    rows = mission_import_rows(missions)
+    try:
+        chunks = insert_chunked(
+            db, Mission, rows, settings.BULK_INSERT_CHUNK_SIZE,
+            before_commit=lambda db, chunk: apply_rollup_delta(db, import_rollup_delta(chunk))
+        )
+    finally:
+        if any(row["status"] == MissionStatus.EN_ATTENTE for row in rows):
+            refresh_mission_queue()
+        read_cache.bump("missions")
+    missions_created.inc(len(rows), ("import",))
+    return bulk_stats(len(rows), chunks, started)
+
 def update_mission(db: Session, mission_id: int, mission_update: MissionUpdate) -> Optional[Mission]:
     db_mission = get_mission(db, mission_id)
     if db_mission:
+        before = mission_facts(db_mission)
         update_data = mission_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_mission, field, value)
+        apply_mission_rollups(db, before, mission_facts(db_mission))
         db.commit()
         db.refresh(db_mission)
+        mission_queue.track(db_mission)
+        read_cache.bump("missions")
     return db_mission
 
 def assign_mission(db: Session, mission_id: int, assignment: MissionAssignment) -> Optional[Mission]:
     db_mission = get_mission(db, mission_id)
     if db_mission:
+        before = mission_facts(db_mission)
         db_mission.ambulance_id = assignment.ambulance_id
         db_mission.assigned_personnel = assignment.personnel_ids
         db_mission.status = MissionStatus.ASSIGNEE
         db_mission.assigned_at = datetime.utcnow()
+        apply_mission_rollups(db, before, mission_facts(db_mission))
         db.commit()
         db.refresh(db_mission)
+        mission_queue.track(db_mission)
+        read_cache.bump("missions")
+        missions_assigned.inc(1, ("manual",))
+        event_bus.publish(mission_event(MISSION_ASSIGNED, db_mission))
     return db_mission
 
 def update_mission_status(db: Session, mission_id: int, status: MissionStatus) -> Optional[Mission]:
     db_mission = get_mission(db, mission_id)
     if db_mission:
+        before = mission_facts(db_mission)
+        completing = status == MissionStatus.TERMINEE and db_mission.status != MissionStatus.TERMINEE
         db_mission.status = status
         
         if status == MissionStatus.EN_COURS and not db_mission.started_at:
@@ -71,14 +211,136 @@ def update_mission_status(db: Session, mission_id: int, status: MissionStatus) -
                 duration = (datetime.utcnow() - db_mission.started_at).total_seconds() / 60
                 db_mission.actual_duration = int(duration)
         
+        apply_mission_rollups(db, before, mission_facts(db_mission))
         db.commit()
         db.refresh(db_mission)
+        mission_queue.track(db_mission)
+        read_cache.bump("missions")
+        if completing:
+            missions_completed.inc()
+        event_bus.publish(mission_event(MISSION_STATUS, db_mission))
     return db_mission
 
 def delete_mission(db: Session, mission_id: int) -> bool:
     db_mission = get_mission(db, mission_id)
     if db_mission:
+        before = mission_facts(db_mission)
+        apply_mission_rollups(db, before, None)
         db.delete(db_mission)
         db.commit()
+        mission_queue.discard(mission_id)
+        read_cache.bump("missions")
         return True
-    return False
\ No newline at end of file
+    return False
+
+def pending_dispatch_statement():
+    # SKIP LOCKED : deux dispatchs concurrents ne se disputent pas les mêmes missions ni ambulances
+    return select(Mission).filter(Mission.status == MissionStatus.EN_ATTENTE).with_for_update(skip_locked=True)
+
+def dispatch_candidates_statement():
+    engaged = select(Mission.ambulance_id).filter(
+        Mission.status.in_([MissionStatus.ASSIGNEE, MissionStatus.EN_COURS]), Mission.ambulance_id.isnot(None)
+    )
+    return select(Ambulance).filter(
+        Ambulance.status == AmbulanceStatus.DISPONIBLE, Ambulance.id.not_in(engaged)
+    ).with_for_update(skip_locked=True)
+
+def plan_pending_dispatch(missions: Sequence[Mission], ambulances: Sequence[Ambulance],
+                          max_distance_km: Optional[float] = None) -> dict:
+    """Plan d'affectation (sans écriture) ; les ambulances sans position connue sont ignorées"""
+    start = time.perf_counter()
+    candidates = [
+        CandidateAmbulance(a.id, a.latitude, a.longitude)
+        for a in map(position_store.overlay, ambulances) if a.latitude is not None and a.longitude is not None
+    ]
+    assignments, unassigned = plan_dispatch([
+        PendingMission(m.id, MissionPriority(m.priority), m.created_at, m.pickup_latitude, m.pickup_longitude)
+        for m in missions
+    ], candidates, max_distance_km)
+    return {
+        "pending_missions": len(missions),
+        "available_ambulances": len(candidates),
+        "assignments": assignments,
+        "unassigned_mission_ids": unassigned,
+        "total_distance_km": round(sum(a.distance_km for a in assignments), 3),
+        "solve_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+def apply_dispatch_plan(missions: Dict[int, Mission], plan: dict) -> Tuple[List[Mission], RollupDelta]:
+    now = datetime.utcnow()
+    delta = RollupDelta()
+    assigned = []
+    for assignment in plan["assignments"]:
+        db_mission = missions[assignment.mission_id]
+        before = mission_facts(db_mission)
+        db_mission.ambulance_id = assignment.ambulance_id
+        db_mission.status = MissionStatus.ASSIGNEE
+        db_mission.assigned_at = now
+        delta.add(before, -1).add(mission_facts(db_mission))
+        assigned.append(db_mission)
+    return assigned, delta
+
+def dispatch_pending_missions(db: Session, max_distance_km: Optional[float] = None, dry_run: bool = False) -> dict:
+    """Affecter en une transaction toutes les missions en attente aux ambulances disponibles"""
+    missions = db.execute(pending_dispatch_statement()).scalars().all()
+    ambulances = db.execute(dispatch_candidates_statement()).scalars().all() if missions else []
+    plan = plan_pending_dispatch(missions, ambulances, max_distance_km)
+    if dry_run or not plan["assignments"]:
+        db.rollback()
+        return {**plan, "applied": False}
+    assigned, delta = apply_dispatch_plan({m.id: m for m in missions}, plan)
+    apply_rollup_delta(db, delta)
+    # Événements construits avant le commit : les missions ne sont pas rechargées une à une
+    events = [mission_event(MISSION_ASSIGNED, db_mission) for db_mission in assigned]
+    db.commit()
+    for db_mission in assigned:
+        mission_queue.discard(db_mission.id)
+    read_cache.bump("missions")
+    missions_assigned.inc(len(assigned), ("dispatch",))
+    event_bus.publish(*events)
+    return {**plan, "applied": True}
+
+def claim_statement(mission_id: int, assignment: MissionAssignment, now: datetime):
+    # Conditionnel sur le statut : une seule transaction peut prendre la mission, même entre workers
+    return update(Mission).where(Mission.id == mission_id, Mission.status == MissionStatus.EN_ATTENTE).values(
+        ambulance_id=assignment.ambulance_id,
+        assigned_personnel=assignment.personnel_ids,
+        status=MissionStatus.ASSIGNEE,
+        assigned_at=now
+    ).execution_options(synchronize_session=False)
+
+def next_pending_statement():
+    # Choix en base et non dans le tas local : une mission critique créée sur un autre worker passe
+    # devant. Sans verrou : l'ordre par rang n'est pas servi par l'index et FOR UPDATE verrouillerait
+    # toutes les lignes parcourues ; l'UPDATE conditionnel du claim départage les concurrents.
+    # Comparaisons typées par la colonne : l'Enum est stocké par nom, pas par valeur
+    rank = case(*((Mission.priority == priority, rank) for priority, rank in PRIORITY_RANK.items()))
+    return select(Mission).filter(Mission.status == MissionStatus.EN_ATTENTE).order_by(
+        rank, Mission.created_at, Mission.id
+    ).limit(1)
+
+def claim_next_mission(db: Session, assignment: MissionAssignment) -> Optional[Mission]:
+    """Assigner la mission en attente la plus prioritaire (puis la plus ancienne) ; None si aucune n'attend"""
+    while True:
+        db_mission = db.execute(next_pending_statement()).scalars().first()
+        if db_mission is None:
+            db.rollback()
+            return None
+        try:
+            before = mission_facts(db_mission)
+            # Mission prise entre-temps par un autre claim ou le dispatch : candidat suivant
+            if db.execute(claim_statement(db_mission.id, assignment, datetime.utcnow())).rowcount != 1:
+                db.rollback()
+                continue
+            db.refresh(db_mission)
+            apply_mission_rollups(db, before, mission_facts(db_mission))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        db.refresh(db_mission)
+        mission_queue.discard(db_mission.id)
+        read_cache.bump("missions")
+        missions_assigned.inc(1, ("queue",))
+        event_bus.publish(mission_event(MISSION_ASSIGNED, db_mission))
+        return db_mission
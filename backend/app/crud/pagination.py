@@ -0,0 +1,36 @@
+import base64
+import json
+from typing import List, Optional, Tuple
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(last_id: int, descending: bool) -> str:
+    raw = json.dumps({"id": last_id, "desc": descending}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[int, bool]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(data["id"]), bool(data["desc"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+def keyset(statement, id_column, cursor: Optional[str], limit: int, descending: bool):
+    """Pagination par clé (id) : coût constant quelle que soit la profondeur de la page, contrairement à OFFSET.
+
+    Fonctionne sur une Query (sync) comme sur un select() (async). Une ligne de plus que
+    `limit` est lue pour savoir s'il existe une page suivante.
+    """
+    if cursor:
+        last_id, cursor_descending = decode_cursor(cursor)
+        if cursor_descending != descending:
+            raise InvalidCursor("Cursor does not match the requested order")
+        statement = statement.filter(id_column < last_id if descending else id_column > last_id)
+    return statement.order_by(id_column.desc() if descending else id_column.asc()).limit(limit + 1)
+
+def page(rows: List, limit: int, descending: bool) -> Tuple[List, Optional[str]]:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].id, descending)
+    return rows, None
@@ -1,8 +1,12 @@
-from typing import Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
-from app.core.security import get_password_hash, verify_password
-from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.crud.pagination import keyset, page
+from app.models.user import User, UserRole
+from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
+from app.services.fast_json import RowProjection
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.read_cache import read_cache
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
@@ -16,8 +20,25 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(User).offset(skip).limit(limit).all()
 
-def create_user(db: Session, user: UserCreate) -> User:
-    hashed_password = get_password_hash(user.password)
+# Sans hashed_password : seuls les champs du schéma de réponse sont lus
+USER_ROWS = RowProjection(UserSchema, User)
+
+def get_users_rows(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
+    return USER_ROWS.as_dicts(db.execute(USER_ROWS.select().offset(skip).limit(limit)))
+
+def get_users_page(db: Session, cursor: Optional[str] = None, limit: int = 50, descending: bool = False,
+                   role: Optional[UserRole] = None, is_active: Optional[bool] = None) -> Tuple[List[User], Optional[str]]:
+    query = db.query(User)
+    if role is not None:
+        query = query.filter(User.role == role)
+    if is_active is not None:
+        query = query.filter(User.is_active == is_active)
+    return page(keyset(query, User.id, cursor, limit, descending).all(), limit, descending)
+
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+    # Les routes passent le hash calculé par password_hasher.hash_async, sans occuper de thread pendant bcrypt
+    if hashed_password is None:
+        hashed_password = password_hasher.hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -31,23 +52,30 @@ def create_user(db: Session, user: UserCreate) -> User:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    read_cache.bump("users")
     return db_user
 
 def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[User]:
     db_user = get_user(db, user_id)
     if db_user:
+        previous_username = db_user.username
         update_data = user_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_user, field, value)
         db.commit()
         db.refresh(db_user)
+        principal_cache.invalidate(previous_username, db_user.username)
+        read_cache.bump("users")
     return db_user
 
 def delete_user(db: Session, user_id: int) -> bool:
     db_user = get_user(db, user_id)
     if db_user:
+        username = db_user.username
         db.delete(db_user)
         db.commit()
+        principal_cache.invalidate(username)
+        read_cache.bump("users")
         return True
     return False
 
@@ -55,6 +83,6 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     user = get_user_by_username(db, username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not password_hasher.verify(password, user.hashed_password):
         return None
     return user
\ No newline at end of file
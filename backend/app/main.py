@@ -1,15 +1,93 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
 from .api.v1.api import api_router
-from .database.base import engine, Base
+from .crud.analytics import check_rollup_dialect
+from .database.base import engine, async_engine, Base
+from .models import user, ambulance, hospital, personnel, mission, maintenance, location, analytics, cache
+from .services.events import event_bus
+from .services.password_hasher import PasswordPoolBusy, password_hasher
+from .services.position_store import position_store
+from .services.spatial_index import refresh_ambulance_index
+from .services.hospital_snapshot import refresh_hospital_snapshot
+from .services.mission_queue import refresh_mission_queue
+from .services.pool_monitor import pool_monitor
+from .services.read_cache import read_cache
+from .services.metrics import CONTENT_TYPE, MetricsMiddleware, instrument_engine, registry, threadpool_samples
+from .services.sampling_profiler import SamplingProfilerMiddleware, sampling_profiler
+
+logger = logging.getLogger(__name__)
 
 # Créer les tables
 Base.metadata.create_all(bind=engine)
+check_rollup_dialect(engine.dialect.name)
+if async_engine is not None:
+    check_rollup_dialect(async_engine.dialect.name)
+
+# Occupation des pools de connexions (GET /database/pool/stats)
+pool_monitor.attach("sync", engine)
+if async_engine is not None:
+    pool_monitor.attach("async", async_engine)
+
+# Un seul écouteur SQL pour les métriques Prometheus et le profil SQL par requête
+# (GET /database/queries/stats, journal des requêtes lentes)
+if settings.METRICS_ENABLED or settings.SQL_PROFILING:
+    instrument_engine("sync", engine)
+    if async_engine is not None:
+        instrument_engine("async", async_engine)
+
+if settings.METRICS_ENABLED:
+    registry.collector(pool_monitor.samples)
+    registry.collector(password_hasher.samples)
+    registry.collector(read_cache.samples)
+
+async def resync_periodically(refresh, interval: float, label: str):
+    # Chaque worker a ses propres structures en mémoire : resynchroniser avec les écritures des autres workers
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(refresh)
+        except Exception:
+            logger.exception("Échec de la resynchronisation : %s", label)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Les CRUD synchrones publient depuis le threadpool : les événements sont remis à cette boucle
+    event_bus.bind(asyncio.get_running_loop())
+    await run_in_threadpool(refresh_ambulance_index)
+    await run_in_threadpool(refresh_hospital_snapshot)
+    await run_in_threadpool(refresh_mission_queue)
+    await run_in_threadpool(read_cache.refresh_versions)
+    await run_in_threadpool(password_hasher.start)
+    resync_tasks = [
+        asyncio.create_task(resync_periodically(refresh_ambulance_index, settings.SPATIAL_INDEX_REFRESH_SECONDS, "index spatial")),
+        asyncio.create_task(resync_periodically(refresh_mission_queue, settings.MISSION_QUEUE_REFRESH_SECONDS, "file des missions")),
+        asyncio.create_task(resync_periodically(read_cache.refresh_versions, settings.READ_CACHE_VERSION_REFRESH_SECONDS,
+                                                "versions du cache de lecture")),
+    ]
+    if settings.POSITION_WRITE_BEHIND:
+        position_store.start()
+    yield
+    for task in resync_tasks:
+        task.cancel()
+    event_bus.bind(None)
+    # Écrire les dernières positions en attente avant l'arrêt du worker
+    await run_in_threadpool(position_store.stop)
+    await run_in_threadpool(read_cache.refresh_versions)
+    await run_in_threadpool(password_hasher.shutdown)
+    await run_in_threadpool(sampling_profiler.stop)
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Configuration CORS - Utiliser la propriété qui retourne une liste
@@ -21,12 +99,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED or settings.SQL_PROFILING:
+    app.add_middleware(MetricsMiddleware)
+
+# Profilage à la demande (POST /profiling/start) : sans session, une lecture d'attribut par requête
+app.add_middleware(SamplingProfilerMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.exception_handler(PasswordPoolBusy)
+async def password_pool_busy_handler(request: Request, exc: PasswordPoolBusy):
+    # Afflux de connexions : refuser vite plutôt que d'allonger la file de hachage
+    return JSONResponse(status_code=503, content={"detail": "Authentication service busy, retry shortly"},
+                        headers={"Retry-After": "1"})
+
 @app.get("/")
 def read_root():
     return {"message": "Ambulance Management System API", "version": "1.0.0"}
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        # Route async : la file du threadpool est lue depuis la boucle, sans y prendre de place
+        return Response(registry.render(extra=threadpool_samples()), media_type=CONTENT_TYPE)
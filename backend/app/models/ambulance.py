@@ -16,7 +16,7 @@ class Ambulance(Base):
     plate_number = Column(String(20), unique=True, index=True, nullable=False)
     model = Column(String(100), nullable=False)
     capacity = Column(Integer, nullable=False, default=2)
-    status = Column(Enum(AmbulanceStatus), nullable=False, default=AmbulanceStatus.DISPONIBLE)
+    status = Column(Enum(AmbulanceStatus), nullable=False, default=AmbulanceStatus.DISPONIBLE, index=True)
     latitude = Column(Float)
     longitude = Column(Float)
     location_updated_at = Column(DateTime(timezone=True))
@@ -24,4 +24,4 @@ class Ambulance(Base):
     fuel_level = Column(Integer, default=100)  # Pourcentage
     mileage = Column(Integer, default=0)  # Kilométrage
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum
+from app.database.base import Base
+from app.models.mission import MissionPriority, MissionStatus
+
+class MissionCountRollup(Base):
+    __tablename__ = "mission_count_rollups"
+
+    # Nombre de missions créées dans le créneau, par priorité et statut courant.
+    # Maintenu dans la transaction de chaque écriture de crud.mission (voir crud/analytics.py)
+    granularity = Column(String(5), primary_key=True)  # "hour" ou "day"
+    bucket_start = Column(DateTime, primary_key=True)  # UTC naïf, début du créneau
+    priority = Column(Enum(MissionPriority), primary_key=True)
+    status = Column(Enum(MissionStatus), primary_key=True)
+    missions = Column(Integer, nullable=False, default=0)
+
+class MissionMetricRollup(Base):
+    __tablename__ = "mission_metric_rollups"
+
+    # Histogramme d'une mesure (durée réelle, délai d'assignation) des missions créées dans
+    # le créneau : une ligne par classe, la moyenne et les percentiles en sont déduits
+    granularity = Column(String(5), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    priority = Column(Enum(MissionPriority), primary_key=True)
+    metric = Column(String(30), primary_key=True)
+    bin = Column(Integer, primary_key=True, autoincrement=False)  # indice de classe, voir METRIC_BOUNDS
+    samples = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, BigInteger, String
+from app.database.base import Base
+
+class ResourceVersion(Base):
+    __tablename__ = "resource_versions"
+
+    # Version partagée entre workers d'une ressource servie par le cache de lecture
+    # (services/read_cache.py) : incrémentée après chaque écriture, elle fonde les ETag
+    resource = Column(String(30), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Float, DateTime
+from sqlalchemy.sql import func
+from app.database.base import Base
+
+class AmbulanceLocationHistory(Base):
+    __tablename__ = "ambulance_locations"
+
+    # Historique append-only des positions, clé naturelle (ambulance, horodatage) :
+    # les positions renvoyées deux fois par un terminal sont dédoublonnées à l'insertion
+    ambulance_id = Column(Integer, primary_key=True, autoincrement=False)
+    recorded_at = Column(DateTime(timezone=True), primary_key=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Partitionnement mensuel sur recorded_at (MySQL). Les partitions sont créées et purgées
+    # par scripts/manage_location_partitions.py ; InnoDB n'accepte pas de clé étrangère ici.
+    __table_args__ = {
+        "mysql_partition_by": "RANGE (TO_DAYS(recorded_at)) (PARTITION p_future VALUES LESS THAN MAXVALUE)"
+    }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Text, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.base import Base
@@ -34,10 +34,10 @@ class Mission(Base):
     pickup_longitude = Column(Float, nullable=False)
     
     # Destination
-    hospital_id = Column(Integer, ForeignKey("hospitals.id"), nullable=False)
+    hospital_id = Column(Integer, ForeignKey("hospitals.id"), nullable=False, index=True)
     
     # Assignation
-    ambulance_id = Column(Integer, ForeignKey("ambulances.id"))
+    ambulance_id = Column(Integer, ForeignKey("ambulances.id"), index=True)
     assigned_personnel = Column(JSON)  # Liste des IDs du personnel assigné
     
     # Timing
@@ -54,4 +54,10 @@ class Mission(Base):
     
     # Relations
     hospital = relationship("Hospital")
-    ambulance = relationship("Ambulance")
\ No newline at end of file
+    ambulance = relationship("Ambulance")
+
+    # Filtres chauds : missions actives (status IN ...), par statut, priorité et période.
+    # Voir alembic/versions et scripts/check_query_plans.py
+    __table_args__ = (
+        Index("ix_missions_status_priority_created_at", "status", "priority", "created_at"),
+    )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 from app.models.ambulance import AmbulanceStatus
@@ -27,10 +27,54 @@ class AmbulanceUpdate(BaseModel):
     fuel_level: Optional[int] = None
     mileage: Optional[int] = None
 
+class AmbulanceBulkCreate(BaseModel):
+    items: List[AmbulanceCreate] = Field(..., min_length=1, max_length=10000)
+
 class AmbulanceLocation(BaseModel):
     latitude: float
     longitude: float
 
+class AmbulanceLocationFix(BaseModel):
+    ambulance_id: int
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    device_timestamp: datetime
+
+class AmbulanceLocationBatch(BaseModel):
+    fixes: List[AmbulanceLocationFix] = Field(..., min_length=1, max_length=5000)
+
+class AmbulanceLocationBatchResult(BaseModel):
+    received: int
+    ingested: int
+    superseded: int  # positions plus anciennes d'une même ambulance dans le lot
+    out_of_order: int  # positions antérieures à celle déjà enregistrée
+    rejected: int  # horodatage trop loin dans le futur
+    unknown_ambulances: List[int] = []
+    duration_ms: float
+    fixes_per_second: float
+
+class TrackPoint(BaseModel):
+    recorded_at: datetime
+    latitude: float
+    longitude: float
+
+class AmbulanceTrack(BaseModel):
+    ambulance_id: int
+    start: datetime
+    end: datetime
+    resolution_seconds: Optional[int] = None
+    tolerance_m: Optional[float] = None
+    raw_points: int
+    points: List[TrackPoint]
+
+class AmbulanceNearest(BaseModel):
+    id: int
+    plate_number: str
+    status: AmbulanceStatus
+    latitude: float
+    longitude: float
+    distance_km: float
+
 class AmbulanceInDB(AmbulanceBase):
     id: int
     latitude: Optional[float] = None
@@ -43,4 +87,26 @@ class AmbulanceInDB(AmbulanceBase):
         from_attributes = True
 
 class Ambulance(AmbulanceInDB):
-    pass
\ No newline at end of file
+    pass
+
+class AmbulancePage(BaseModel):
+    items: List[Ambulance]
+    next_cursor: Optional[str] = None  # None sur la dernière page
+    limit: int
+
+# Projections nommées (?fields=summary|map) : chaque champ est une colonne de la table ambulances
+class AmbulanceSummary(BaseModel):
+    id: int
+    plate_number: str
+    model: str
+    status: AmbulanceStatus
+    fuel_level: int
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    location_updated_at: Optional[datetime] = None
+
+class AmbulanceMapPoint(BaseModel):
+    id: int
+    status: AmbulanceStatus
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
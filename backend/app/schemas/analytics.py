@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+
+class MissionCountBucket(BaseModel):
+    bucket_start: datetime
+    total: int
+    counts: Dict[str, Dict[str, int]]  # priorité -> statut -> nombre de missions
+
+class MissionCounts(BaseModel):
+    granularity: str
+    start: datetime
+    end: datetime
+    buckets: List[MissionCountBucket]
+
+class MetricSummary(BaseModel):
+    samples: int
+    mean: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+
+class MetricBucket(MetricSummary):
+    bucket_start: datetime
+
+class MissionMetric(BaseModel):
+    metric: str
+    unit: str
+    granularity: str
+    start: datetime
+    end: datetime
+    summary: MetricSummary
+    buckets: List[MetricBucket]
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+class BulkCreateResult(BaseModel):
+    received: int
+    created: int
+    chunks: int  # transactions validées (BULK_INSERT_CHUNK_SIZE lignes au plus chacune)
+    duration_ms: float
+    rows_per_second: float
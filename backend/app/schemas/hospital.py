@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -18,6 +18,9 @@ class HospitalBase(BaseModel):
 class HospitalCreate(HospitalBase):
     pass
 
+class HospitalBulkCreate(BaseModel):
+    items: List[HospitalCreate] = Field(..., min_length=1, max_length=10000)
+
 class HospitalUpdate(BaseModel):
     name: Optional[str] = None
     address: Optional[str] = None
@@ -40,4 +43,14 @@ class HospitalInDB(HospitalBase):
         from_attributes = True
 
 class Hospital(HospitalInDB):
-    pass
\ No newline at end of file
+    pass
+class HospitalRecommendation(BaseModel):
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+    distance_km: float
+    emergency_beds: int
+    icu_beds: int
+    specialty_match: bool
+    score: float  # 0 à 1, plus élevé = plus adapté
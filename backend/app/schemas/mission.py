@@ -1,7 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 from app.models.mission import MissionPriority, MissionStatus
+from app.schemas.ambulance import Ambulance
+from app.schemas.hospital import Hospital
 
 class MissionBase(BaseModel):
     patient_name: str
@@ -20,6 +22,20 @@ class MissionBase(BaseModel):
 class MissionCreate(MissionBase):
     pass
 
+class MissionImport(MissionCreate):
+    """Mission reprise d'un autre système : statut, affectation et horodatages d'origine"""
+    status: MissionStatus = MissionStatus.EN_ATTENTE
+    ambulance_id: Optional[int] = None
+    assigned_personnel: Optional[List[int]] = []
+    created_at: Optional[datetime] = None  # maintenant si absent
+    assigned_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    actual_duration: Optional[int] = None
+
+class MissionBulkCreate(BaseModel):
+    items: List[MissionImport] = Field(..., min_length=1, max_length=10000)
+
 class MissionUpdate(BaseModel):
     patient_name: Optional[str] = None
     patient_phone: Optional[str] = None
@@ -57,4 +73,74 @@ class MissionInDB(MissionBase):
         from_attributes = True
 
 class Mission(MissionInDB):
-    pass
\ No newline at end of file
+    pass
+
+# ?expand= : un schéma par combinaison, pour ne jamais lire une relation non demandée
+class MissionWithAmbulance(Mission):
+    ambulance: Optional[Ambulance] = None
+
+class MissionWithHospital(Mission):
+    hospital: Optional[Hospital] = None
+
+class MissionExpanded(Mission):
+    ambulance: Optional[Ambulance] = None
+    hospital: Optional[Hospital] = None
+
+MISSION_EXPANSION_SCHEMAS = {
+    (): Mission,
+    ("ambulance",): MissionWithAmbulance,
+    ("hospital",): MissionWithHospital,
+    ("ambulance", "hospital"): MissionExpanded,
+}
+
+class MissionPage(BaseModel):
+    items: List[Mission]
+    next_cursor: Optional[str] = None  # None sur la dernière page
+    limit: int
+
+# Projections nommées (?fields=summary|map) : chaque champ est une colonne de la table missions
+class MissionSummary(BaseModel):
+    id: int
+    status: MissionStatus
+    priority: MissionPriority
+    patient_condition: str
+    pickup_address: str
+    hospital_id: int
+    ambulance_id: Optional[int] = None
+    created_at: datetime
+
+class MissionMapPoint(BaseModel):
+    id: int
+    status: MissionStatus
+    priority: MissionPriority
+    pickup_latitude: float
+    pickup_longitude: float
+
+class DispatchAssignment(BaseModel):
+    mission_id: int
+    ambulance_id: int
+    priority: MissionPriority
+    distance_km: float
+    weighted_cost: float  # distance pondérée par la priorité, minimisée au total
+
+    class Config:
+        from_attributes = True
+
+class DispatchResult(BaseModel):
+    applied: bool
+    pending_missions: int
+    available_ambulances: int
+    assignments: List[DispatchAssignment]
+    unassigned_mission_ids: List[int]
+    total_distance_km: float
+    solve_ms: float
+
+class MissionQueueEntry(BaseModel):
+    id: int
+    priority: MissionPriority
+    created_at: datetime
+    waiting_seconds: float
+
+class MissionQueue(BaseModel):
+    size: int  # missions en attente dans la file, au-delà des `items` renvoyés
+    items: List[MissionQueueEntry]
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class ProfilingStart(BaseModel):
+    # Motif fnmatch sur le chemin brut (ex. /api/v1/missions/active ou /api/v1/missions/*), None pour toutes les routes
+    route: Optional[str] = None
+    sample_rate: float = Field(1.0, gt=0, le=1)  # part des requêtes correspondantes profilées
+    interval_ms: float = Field(10.0, ge=1, le=1000)
+    duration_seconds: int = Field(60, ge=1)
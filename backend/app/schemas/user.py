@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from app.models.user import UserRole
 
@@ -36,6 +36,11 @@ class UserInDB(UserBase):
 class User(UserInDB):
     pass
 
+class UserPage(BaseModel):
+    items: List[User]
+    next_cursor: Optional[str] = None  # None sur la dernière page
+    limit: int
+
 class UserLogin(BaseModel):
     username: str
     password: str
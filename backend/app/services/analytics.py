@@ -0,0 +1,159 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from app.models.mission import MissionPriority, MissionStatus
+
+GRANULARITIES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Bornes supérieures des classes d'histogramme ; une dernière classe reçoit les valeurs au-delà.
+# Modifier ces bornes impose de reconstruire les agrégats (scripts/backfill_mission_rollups.py).
+METRIC_BOUNDS = {
+    "duration": [5, 10, 15, 20, 25, 30, 40, 50, 60, 75, 90, 120, 180, 240],  # minutes
+    "assignment_latency": [10, 30, 60, 120, 180, 300, 600, 900, 1200, 1800, 3600, 7200],  # secondes
+}
+METRIC_UNITS = {"duration": "minutes", "assignment_latency": "seconds"}
+
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+def truncate(value: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+def metric_bin(metric: str, value: float) -> int:
+    return bisect_left(METRIC_BOUNDS[metric], value)
+
+class MissionFacts(NamedTuple):
+    """Ce qu'une mission apporte aux agrégats ; comparé avant/après chaque écriture"""
+    created_at: datetime
+    priority: MissionPriority
+    status: MissionStatus
+    duration: Optional[float]
+    assignment_latency: Optional[float]
+
+def mission_facts(mission) -> Optional[MissionFacts]:
+    if mission is None or mission.created_at is None:
+        return None
+    created_at = mission.created_at.replace(tzinfo=None)
+    latency = None
+    if mission.assigned_at is not None:
+        latency = max(0.0, (mission.assigned_at.replace(tzinfo=None) - created_at).total_seconds())
+    return MissionFacts(
+        created_at=created_at,
+        priority=MissionPriority(mission.priority),
+        status=MissionStatus(mission.status or MissionStatus.EN_ATTENTE),
+        duration=float(mission.actual_duration) if mission.actual_duration is not None else None,
+        assignment_latency=latency,
+    )
+
+CountKey = Tuple[str, datetime, MissionPriority, MissionStatus]
+MetricKey = Tuple[str, datetime, MissionPriority, str, int]
+
+class RollupDelta:
+    """Variations à appliquer aux tables d'agrégats, cumulées sur une ou plusieurs missions"""
+
+    def __init__(self):
+        self.counts: Dict[CountKey, int] = {}
+        self.metrics: Dict[MetricKey, List[float]] = {}
+
+    def add(self, facts: Optional[MissionFacts], sign: int = 1) -> "RollupDelta":
+        if facts is None:
+            return self
+        for granularity in GRANULARITIES:
+            bucket = truncate(facts.created_at, granularity)
+            key = (granularity, bucket, facts.priority, facts.status)
+            self.counts[key] = self.counts.get(key, 0) + sign
+            for metric, value in (("duration", facts.duration), ("assignment_latency", facts.assignment_latency)):
+                if value is None:
+                    continue
+                entry = self.metrics.setdefault((granularity, bucket, facts.priority, metric, metric_bin(metric, value)), [0, 0.0])
+                entry[0] += sign
+                entry[1] += sign * value
+        return self
+
+    def count_rows(self) -> List[dict]:
+        # Ordre stable des clés : deux transactions concurrentes verrouillent les lignes dans le même ordre
+        return [
+            {"granularity": g, "bucket_start": b, "priority": p, "status": s, "missions": n}
+            for (g, b, p, s), n in sorted(self.counts.items(), key=lambda item: (item[0][0], item[0][1], item[0][2].value, item[0][3].value))
+            if n
+        ]
+
+    def metric_rows(self) -> List[dict]:
+        return [
+            {"granularity": g, "bucket_start": b, "priority": p, "metric": m, "bin": i, "samples": n, "total": total}
+            for (g, b, p, m, i), (n, total) in sorted(self.metrics.items(), key=lambda item: (item[0][0], item[0][1], item[0][2].value, item[0][3], item[0][4]))
+            if n or abs(total) > 1e-9
+        ]
+
+def mission_delta(before: Optional[MissionFacts], after: Optional[MissionFacts]) -> RollupDelta:
+    if before == after:
+        return RollupDelta()
+    return RollupDelta().add(before, -1).add(after, 1)
+
+def summarize_histogram(metric: str, bins: Dict[int, Tuple[int, float]]) -> dict:
+    """Effectif, moyenne et percentiles (interpolés dans la classe) d'un histogramme agrégé"""
+    bounds = METRIC_BOUNDS[metric]
+    samples = sum(count for count, _ in bins.values())
+    summary = {"samples": samples, "mean": None, **{name: None for name in QUANTILES}}
+    if samples <= 0:
+        return summary
+    summary["mean"] = round(sum(total for _, total in bins.values()) / samples, 3)
+    ordered = sorted(bins.items())
+    for name, quantile in QUANTILES.items():
+        target = quantile * samples
+        cumulated = 0
+        for index, (count, total) in ordered:
+            if count <= 0:
+                continue
+            if cumulated + count >= target:
+                if index >= len(bounds):
+                    # Classe ouverte : pas de borne supérieure, on retient sa moyenne
+                    value = total / count
+                else:
+                    # Interpolation sur l'intervalle de la classe resserré autour de sa moyenne observée
+                    lower, upper, mean = (bounds[index - 1] if index > 0 else 0.0), bounds[index], total / count
+                    lower, upper = max(lower, 2 * mean - upper), min(upper, 2 * mean - lower)
+                    value = lower + (upper - lower) * (target - cumulated) / count
+                summary[name] = round(value, 3)
+                break
+            cumulated += count
+    return summary
+
+def bucket_range(granularity: str, start: datetime, end: datetime) -> Iterable[datetime]:
+    step = GRANULARITIES[granularity]
+    bucket = truncate(start, granularity)
+    while bucket < end:
+        yield bucket
+        bucket += step
+
+def count_series(granularity: str, start: datetime, end: datetime, rows) -> List[dict]:
+    """Une entrée par créneau de [start, end), y compris les créneaux vides"""
+    by_bucket: Dict[datetime, Dict[str, Dict[str, int]]] = {}
+    for bucket_start, priority, status, missions in rows:
+        counts = by_bucket.setdefault(bucket_start, {})
+        counts.setdefault(MissionPriority(priority).value, {})[MissionStatus(status).value] = missions
+    return [
+        {
+            "bucket_start": bucket,
+            "total": sum(sum(statuses.values()) for statuses in by_bucket.get(bucket, {}).values()),
+            "counts": by_bucket.get(bucket, {}),
+        }
+        for bucket in bucket_range(granularity, start, end)
+    ]
+
+def metric_series(metric: str, granularity: str, start: datetime, end: datetime, rows) -> Tuple[dict, List[dict]]:
+    by_bucket: Dict[datetime, Dict[int, Tuple[int, float]]] = {}
+    overall: Dict[int, Tuple[int, float]] = {}
+    for bucket_start, index, samples, total in rows:
+        for histogram in (by_bucket.setdefault(bucket_start, {}), overall):
+            count, value = histogram.get(index, (0, 0.0))
+            histogram[index] = (count + samples, value + total)
+    buckets = [
+        {"bucket_start": bucket, **summarize_histogram(metric, by_bucket.get(bucket, {}))}
+        for bucket in bucket_range(granularity, start, end)
+    ]
+    return summarize_histogram(metric, overall), buckets
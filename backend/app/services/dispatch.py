@@ -0,0 +1,199 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from app.models.mission import MissionPriority
+from app.services.geo import EARTH_RADIUS_KM
+
+# Une mission critique "coûte" quatre fois plus par kilomètre qu'une mission normale :
+# à distance comparable, l'optimiseur lui réserve l'ambulance la plus proche
+PRIORITY_WEIGHTS = {
+    MissionPriority.CRITIQUE: 4.0,
+    MissionPriority.URGENTE: 2.0,
+    MissionPriority.NORMALE: 1.0,
+    MissionPriority.FAIBLE: 0.5,
+}
+PRIORITY_RANK = {MissionPriority.CRITIQUE: 0, MissionPriority.URGENTE: 1, MissionPriority.NORMALE: 2, MissionPriority.FAIBLE: 3}
+
+@dataclass(frozen=True)
+class PendingMission:
+    id: int
+    priority: MissionPriority
+    created_at: Optional[datetime]
+    latitude: float
+    longitude: float
+
+@dataclass(frozen=True)
+class CandidateAmbulance:
+    id: int
+    latitude: float
+    longitude: float
+
+@dataclass(frozen=True)
+class PlannedAssignment:
+    mission_id: int
+    ambulance_id: int
+    priority: MissionPriority
+    distance_km: float
+    weighted_cost: float
+
+def haversine_matrix(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Distances orthodromiques (km) entre chaque point de (lat1, lon1) et chaque point de (lat2, lon2)"""
+    lat1, lon1 = np.radians(lat1)[:, None], np.radians(lon1)[:, None]
+    lat2, lon2 = np.radians(lat2)[None, :], np.radians(lon2)[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def solve_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Affectation de coût total minimal (optimale) d'une matrice rectangulaire.
+
+    Retourne (lignes, colonnes) de min(n, m) couples. Réduction de lignes de Jonker-Volgenant
+    puis plus courts chemins augmentants (Dijkstra sur coûts réduits) pour les lignes restées
+    libres ; chaque étape est une opération vectorisée sur une ligne de la matrice.
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    # Duaux de colonnes initiaux ; en rectangulaire ils doivent rester <= 0 (colonnes non affectées)
+    v = cost.min(axis=0) if n == m else np.zeros(m)
+    row_col = np.full(n, -1)
+    col_row = np.full(m, -1)
+
+    # Réduction par augmentation : une ligne libre prend sa meilleure colonne et abaisse v de
+    # l'écart avec la deuxième ; l'ancien titulaire est relancé. v ne fait que baisser, donc
+    # chaque ligne affectée garde sa colonne de coût réduit minimal.
+    free = list(range(n))
+    for _ in range(2):
+        k = 0
+        budget = 4 * len(free) + 16
+        next_free = []
+        while k < len(free) and budget > 0:
+            budget -= 1
+            i = free[k]
+            k += 1
+            reduced = cost[i] - v
+            if m > 1:
+                j1, j2 = np.argpartition(reduced, 1)[:2]
+                if reduced[j2] < reduced[j1]:
+                    j1, j2 = j2, j1
+                u1, u2 = reduced[j1], reduced[j2]
+            else:
+                j1 = j2 = 0
+                u1, u2 = reduced[0], np.inf
+            i0 = col_row[j1]
+            if u1 < u2:
+                if np.isfinite(u2):
+                    v[j1] -= u2 - u1
+            elif i0 >= 0:
+                j1 = j2
+                i0 = col_row[j1]
+            if i0 >= 0:
+                row_col[i0] = -1
+                if u1 < u2:
+                    k -= 1
+                    free[k] = i0
+                else:
+                    next_free.append(i0)
+            row_col[i] = j1
+            col_row[j1] = i
+        free = next_free + free[k:]
+
+    u = np.empty(n)
+    assigned = row_col >= 0
+    u[assigned] = cost[assigned, row_col[assigned]] - v[row_col[assigned]]
+    if (~assigned).any():
+        u[~assigned] = (cost[~assigned] - v).min(axis=1)
+
+    reduced = np.empty(m)
+    better = np.empty(m, dtype=bool)
+    for start in free:
+        dist = np.full(m, np.inf)
+        final = np.empty(m)
+        path = np.full(m, -1)
+        # Colonnes déjà fixées : v à -inf, leur coût réduit devient +inf
+        open_v = v.copy()
+        scanned_cols, scanned_rows = [], []
+        min_val = 0.0
+        i = start
+        while True:
+            np.subtract(cost[i], open_v, out=reduced)
+            reduced += min_val - u[i]
+            np.less(reduced, dist, out=better)
+            np.copyto(path, i, where=better)
+            np.minimum(dist, reduced, out=dist)
+            j = int(dist.argmin())
+            min_val = dist[j]
+            final[j] = min_val
+            dist[j] = np.inf
+            open_v[j] = -np.inf
+            scanned_cols.append(j)
+            if col_row[j] < 0:
+                break
+            i = col_row[j]
+            scanned_rows.append(i)
+        u[start] += min_val
+        if scanned_rows:
+            rows = np.array(scanned_rows)
+            u[rows] += min_val - final[row_col[rows]]
+            cols = np.array(scanned_cols[:-1])
+            v[cols] -= min_val - final[cols]
+        while True:
+            i = path[j]
+            col_row[j] = i
+            row_col[i], j = j, row_col[i]
+            if i == start:
+                break
+
+    rows = np.arange(n)
+    if transposed:
+        order = np.argsort(row_col)
+        return row_col[order], rows[order]
+    return rows, row_col
+
+def plan_dispatch(missions: Sequence[PendingMission], ambulances: Sequence[CandidateAmbulance],
+                  max_distance_km: Optional[float] = None) -> Tuple[List[PlannedAssignment], List[int]]:
+    """Affecter les missions en attente aux ambulances disponibles (coût = distance × poids de priorité).
+
+    S'il y a plus de missions que d'ambulances, seules les plus prioritaires (puis les plus
+    anciennes) sont servies. Les couples au-delà de `max_distance_km` sont exclus.
+    Retourne les affectations et les identifiants des missions laissées en attente.
+    """
+    if not missions or not ambulances:
+        return [], [mission.id for mission in missions]
+    ordered = sorted(missions, key=lambda mission: (PRIORITY_RANK[mission.priority], mission.created_at or datetime.max, mission.id))
+    served = ordered[:len(ambulances)]
+
+    distances = haversine_matrix(
+        np.fromiter((mission.latitude for mission in served), float, len(served)),
+        np.fromiter((mission.longitude for mission in served), float, len(served)),
+        np.fromiter((ambulance.latitude for ambulance in ambulances), float, len(ambulances)),
+        np.fromiter((ambulance.longitude for ambulance in ambulances), float, len(ambulances)),
+    )
+    weights = np.fromiter((PRIORITY_WEIGHTS[mission.priority] for mission in served), float, len(served))
+    cost = distances * weights[:, None]
+    if max_distance_km is not None:
+        # Coût prohibitif plutôt qu'infini : l'optimiseur maximise d'abord le nombre de couples admissibles
+        forbidden = distances > max_distance_km
+        cost[forbidden] = (cost[~forbidden].max(initial=0.0) + 1.0) * (len(served) + 1)
+
+    rows, cols = solve_assignment(cost)
+    assignments = []
+    unassigned = {mission.id for mission in ordered}
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        if max_distance_km is not None and distances[row, col] > max_distance_km:
+            continue
+        mission = served[row]
+        assignments.append(PlannedAssignment(
+            mission_id=mission.id,
+            ambulance_id=ambulances[col].id,
+            priority=mission.priority,
+            distance_km=round(float(distances[row, col]), 3),
+            weighted_cost=round(float(cost[row, col]), 3),
+        ))
+        unassigned.discard(mission.id)
+    assignments.sort(key=lambda assignment: (PRIORITY_RANK[assignment.priority], assignment.mission_id))
+    return assignments, [mission.id for mission in ordered if mission.id in unassigned]
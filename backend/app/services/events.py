@@ -0,0 +1,267 @@
+import asyncio
+import itertools
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, Dict, FrozenSet, List, Optional, Set, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+AMBULANCE_LOCATION = "ambulance.location"
+AMBULANCE_STATUS = "ambulance.status"
+MISSION_CREATED = "mission.created"
+MISSION_ASSIGNED = "mission.assigned"
+MISSION_STATUS = "mission.status"
+RESYNC = "resync"
+
+EVENT_TYPES = frozenset({AMBULANCE_LOCATION, AMBULANCE_STATUS, MISSION_CREATED, MISSION_ASSIGNED, MISSION_STATUS})
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+@dataclass
+class FleetEvent:
+    type: str
+    data: dict
+    ambulance_id: Optional[int] = None
+    mission_id: Optional[int] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    seq: int = 0
+    # Encodages calculés une seule fois par événement, partagés par tous les abonnés
+    _json: Optional[str] = field(default=None, repr=False)
+    _sse: Optional[str] = field(default=None, repr=False)
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = json.dumps({"seq": self.seq, "type": self.type, "data": self.data}, separators=(",", ":"))
+        return self._json
+
+    def to_sse(self) -> str:
+        if self._sse is None:
+            self._sse = f"id: {self.seq}\nevent: {self.type}\ndata: {self.to_json()}\n\n"
+        return self._sse
+
+def ambulance_event(event_type: str, ambulance) -> FleetEvent:
+    return FleetEvent(
+        type=event_type,
+        data={
+            "id": ambulance.id,
+            "plate_number": ambulance.plate_number,
+            "status": getattr(ambulance.status, "value", ambulance.status),
+            "latitude": ambulance.latitude,
+            "longitude": ambulance.longitude,
+            "location_updated_at": _isoformat(ambulance.location_updated_at),
+        },
+        ambulance_id=ambulance.id,
+        latitude=ambulance.latitude,
+        longitude=ambulance.longitude,
+    )
+
+def position_event(ambulance_id: int, latitude: float, longitude: float, timestamp: datetime) -> FleetEvent:
+    return FleetEvent(
+        type=AMBULANCE_LOCATION,
+        data={
+            "id": ambulance_id,
+            "latitude": latitude,
+            "longitude": longitude,
+            "location_updated_at": _isoformat(timestamp),
+        },
+        ambulance_id=ambulance_id,
+        latitude=latitude,
+        longitude=longitude,
+    )
+
+def mission_event(event_type: str, mission) -> FleetEvent:
+    return FleetEvent(
+        type=event_type,
+        data={
+            "id": mission.id,
+            "status": getattr(mission.status, "value", mission.status),
+            "priority": getattr(mission.priority, "value", mission.priority),
+            "ambulance_id": mission.ambulance_id,
+            "hospital_id": mission.hospital_id,
+            "pickup_latitude": mission.pickup_latitude,
+            "pickup_longitude": mission.pickup_longitude,
+            "assigned_at": _isoformat(mission.assigned_at),
+            "started_at": _isoformat(mission.started_at),
+            "completed_at": _isoformat(mission.completed_at),
+        },
+        ambulance_id=mission.ambulance_id,
+        mission_id=mission.id,
+        latitude=mission.pickup_latitude,
+        longitude=mission.pickup_longitude,
+    )
+
+@dataclass
+class EventFilter:
+    """Filtre par connexion : types d'événements, zone (bbox) et identifiants suivis"""
+    types: FrozenSet[str] = EVENT_TYPES
+    bbox: Optional[Tuple[float, float, float, float]] = None  # min_lat, min_lon, max_lat, max_lon
+    mission_ids: Optional[Set[int]] = None
+    ambulance_ids: Optional[Set[int]] = None
+
+    def matches(self, event: FleetEvent) -> bool:
+        if event.type not in self.types:
+            return False
+        if self.mission_ids is not None or self.ambulance_ids is not None:
+            followed = (
+                (self.mission_ids is not None and event.mission_id in self.mission_ids)
+                or (self.ambulance_ids is not None and event.ambulance_id in self.ambulance_ids)
+            )
+            if not followed:
+                return False
+        if self.bbox is not None and event.latitude is not None and event.longitude is not None:
+            min_lat, min_lon, max_lat, max_lon = self.bbox
+            return min_lat <= event.latitude <= max_lat and min_lon <= event.longitude <= max_lon
+        return True
+
+class Subscription:
+    """Curseur d'un abonné dans le journal partagé du bus, avec son filtre"""
+
+    def __init__(self, bus: "EventBus", event_filter: EventFilter, cursor: int):
+        self.bus = bus
+        self.filter = event_filter
+        self.cursor = cursor  # numéro du prochain événement à lire
+        self.delivered = 0
+        self.conflated = 0
+        self.resyncs = 0
+
+    def drain(self) -> List[FleetEvent]:
+        return self.bus.read(self)
+
+    async def next_batch(self, timeout: float) -> List[FleetEvent]:
+        """Attendre des événements retenus par le filtre ; liste vide seulement après `timeout` secondes (heartbeat).
+
+        Les lots entièrement filtrés ne réveillent pas l'abonné : un client au filtre étroit
+        ne coûte rien au rythme des positions publiées.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            events = self.drain()
+            if events:
+                return events
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return []
+            try:
+                await asyncio.wait_for(self.bus.new_events.wait(), remaining)
+            except asyncio.TimeoutError:
+                return []
+
+class EventBus:
+    """Diffusion en mémoire (par worker) des changements d'état de la flotte.
+
+    Les événements sont ajoutés une seule fois à un journal borné partagé ; chaque abonné
+    n'y garde qu'un curseur et filtre à la lecture, dans sa propre tâche. La publication
+    coûte donc O(événements) quel que soit le nombre d'abonnés, et la mémoire ne dépend pas
+    des clients lents. `publish` peut être appelé depuis n'importe quel thread (CRUD
+    synchrones du threadpool) : la remise se fait dans la boucle asyncio, en un seul rappel
+    par lot. Les abonnés d'un autre worker ne reçoivent pas ces événements.
+
+    Contre-pression : à la lecture, seules les dernières positions de chaque ambulance sont
+    remises ; un abonné distancé de plus de `backlog` événements reçoit un unique événement
+    `resync` l'invitant à recharger l'état via l'API REST, puis reprend au présent.
+    """
+
+    def __init__(self, backlog: int = 20000, max_subscribers: int = 5000):
+        self.backlog = backlog
+        self.max_subscribers = max_subscribers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._log: Deque[FleetEvent] = deque(maxlen=backlog)
+        self._subscribers: Set[Subscription] = set()
+        self._seq = itertools.count(1)
+        self.last_seq = 0
+        self.new_events = asyncio.Event()
+        self._stats = {"published": 0, "delivered": 0, "conflated": 0, "resyncs": 0}
+
+    def bind(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        self._loop = loop
+        self.new_events = asyncio.Event()
+
+    def subscribe(self, event_filter: EventFilter) -> Optional[Subscription]:
+        if len(self._subscribers) >= self.max_subscribers:
+            return None
+        subscription = Subscription(self, event_filter, self.last_seq + 1)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self._subscribers:
+            self._subscribers.discard(subscription)
+            for key in ("delivered", "conflated", "resyncs"):
+                self._stats[key] += getattr(subscription, key)
+
+    def publish(self, *events: FleetEvent) -> None:
+        loop = self._loop
+        if loop is None or not events:
+            return
+        try:
+            loop.call_soon_threadsafe(self._append, events)
+        except RuntimeError:
+            # Boucle fermée (arrêt du worker)
+            pass
+
+    def _append(self, events) -> None:
+        for event in events:
+            event.seq = next(self._seq)
+            self._log.append(event)
+        self.last_seq = events[-1].seq
+        self._stats["published"] += len(events)
+        # Réveiller tous les abonnés en attente d'un coup, puis préparer l'attente suivante
+        self.new_events.set()
+        self.new_events = asyncio.Event()
+
+    def read(self, subscription: Subscription) -> List[FleetEvent]:
+        log = self._log
+        if not log or subscription.cursor > self.last_seq:
+            return []
+        first_seq = log[0].seq
+        if subscription.cursor < first_seq:
+            subscription.cursor = self.last_seq + 1
+            subscription.resyncs += 1
+            return [FleetEvent(type=RESYNC, data={"reason": "slow_consumer"}, seq=self.last_seq)]
+
+        pending = itertools.islice(log, subscription.cursor - first_seq, None)
+        subscription.cursor = self.last_seq + 1
+        event_filter = subscription.filter
+        events: List[Optional[FleetEvent]] = []
+        positions: Dict[int, int] = {}
+        for event in pending:
+            if not event_filter.matches(event):
+                continue
+            if event.type == MISSION_ASSIGNED and event_filter.mission_ids is not None and event.ambulance_id is not None:
+                # Suivre une mission, c'est aussi suivre l'ambulance qui lui est assignée
+                if event_filter.ambulance_ids is None:
+                    event_filter.ambulance_ids = set()
+                event_filter.ambulance_ids.add(event.ambulance_id)
+            if event.type == AMBULANCE_LOCATION:
+                previous = positions.get(event.ambulance_id)
+                if previous is not None:
+                    events[previous] = None
+                    subscription.conflated += 1
+                positions[event.ambulance_id] = len(events)
+            events.append(event)
+        delivered = [event for event in events if event is not None]
+        subscription.delivered += len(delivered)
+        return delivered
+
+    def metrics(self) -> dict:
+        stats = dict(self._stats)
+        lag = 0
+        for subscription in self._subscribers:
+            for key in ("delivered", "conflated", "resyncs"):
+                stats[key] += getattr(subscription, key)
+            lag = max(lag, self.last_seq + 1 - subscription.cursor)
+        stats["subscribers"] = len(self._subscribers)
+        stats["max_subscribers"] = self.max_subscribers
+        stats["backlog"] = len(self._log)
+        stats["max_backlog"] = self.backlog
+        stats["max_subscriber_lag"] = lag
+        return stats
+
+event_bus = EventBus(backlog=settings.EVENTS_BACKLOG, max_subscribers=settings.EVENTS_MAX_SUBSCRIBERS)
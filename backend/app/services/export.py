@@ -0,0 +1,151 @@
+import csv
+import enum
+import io
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Colonnes exportées, dans l'ordre des colonnes CSV (lues en tuples, sans objets ORM)
+MISSION_EXPORT_FIELDS = [
+    "id", "patient_name", "patient_phone", "patient_age", "patient_condition", "priority", "status",
+    "pickup_address", "pickup_latitude", "pickup_longitude", "hospital_id", "ambulance_id",
+    "assigned_personnel", "created_at", "assigned_at", "started_at", "completed_at",
+    "estimated_duration", "actual_duration", "symptoms", "notes",
+]
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Type non sérialisable : {type(value).__name__}")
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+def encode_batch(export_format: str, rows: Sequence[Sequence], header: bool = False) -> bytes:
+    """Sérialiser un lot de lignes ; seul ce lot est en mémoire"""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(MISSION_EXPORT_FIELDS)
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        return buffer.getvalue().encode()
+    return "".join(
+        json.dumps(dict(zip(MISSION_EXPORT_FIELDS, row)), default=_json_default, ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode()
+
+class ExportMetrics:
+    """Durée jusqu'au premier octet (TTFB) et débit des exports, mesurés côté serveur"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "exports": 0,
+            "failed": 0,
+            "rows": 0,
+            "bytes": 0,
+            "total_ttfb_ms": 0.0,
+            "max_ttfb_ms": 0.0,
+            "total_duration_ms": 0.0,
+            "max_duration_ms": 0.0,
+        }
+
+    def record(self, rows: int, size: int, ttfb_ms: float, duration_ms: float, failed: bool) -> None:
+        with self._lock:
+            self._stats["exports"] += 1
+            self._stats["failed"] += failed
+            self._stats["rows"] += rows
+            self._stats["bytes"] += size
+            self._stats["total_ttfb_ms"] += ttfb_ms
+            self._stats["max_ttfb_ms"] = max(self._stats["max_ttfb_ms"], ttfb_ms)
+            self._stats["total_duration_ms"] += duration_ms
+            self._stats["max_duration_ms"] = max(self._stats["max_duration_ms"], duration_ms)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        exports = stats["exports"]
+        total_ttfb_ms = stats.pop("total_ttfb_ms")
+        total_duration_ms = stats.pop("total_duration_ms")
+        return {
+            **stats,
+            "avg_ttfb_ms": round(total_ttfb_ms / exports, 3) if exports else 0.0,
+            "max_ttfb_ms": round(stats["max_ttfb_ms"], 3),
+            "avg_duration_ms": round(total_duration_ms / exports, 3) if exports else 0.0,
+            "max_duration_ms": round(stats["max_duration_ms"], 3),
+        }
+
+export_metrics = ExportMetrics()
+
+class _ExportRun:
+    """Suivi d'un export : le TTFB est pris au premier lot de données envoyé (en-tête CSV compris)"""
+
+    def __init__(self, export_format: str, started_at: float):
+        self.export_format = export_format
+        self.started_at = started_at
+        self.first_byte_at: Optional[float] = None
+        self.rows = 0
+        self.size = 0
+        self.failed = True
+
+    def chunk(self, rows: Sequence[Sequence]) -> bytes:
+        data = encode_batch(self.export_format, rows, header=self.export_format == "csv" and self.first_byte_at is None)
+        if self.first_byte_at is None:
+            self.first_byte_at = time.perf_counter()
+        self.rows += len(rows)
+        self.size += len(data)
+        return data
+
+    def finish(self) -> None:
+        now = time.perf_counter()
+        ttfb_ms = ((self.first_byte_at or now) - self.started_at) * 1000
+        duration_ms = (now - self.started_at) * 1000
+        export_metrics.record(self.rows, self.size, ttfb_ms, duration_ms, self.failed)
+        logger.info(
+            "Export %s : %d missions, %d octets, TTFB %.1f ms, durée %.1f ms%s",
+            self.export_format, self.rows, self.size, ttfb_ms, duration_ms, " (interrompu)" if self.failed else ""
+        )
+
+def stream_export(export_format: str, batches: Iterable[Sequence[Sequence]], started_at: float) -> Iterator[bytes]:
+    run = _ExportRun(export_format, started_at)
+    try:
+        for rows in batches:
+            yield run.chunk(rows)
+        if run.first_byte_at is None:
+            yield run.chunk([])
+        run.failed = False
+    finally:
+        run.finish()
+
+async def stream_export_async(export_format: str, batches: AsyncIterable[Sequence[Sequence]],
+                              started_at: float) -> AsyncIterator[bytes]:
+    run = _ExportRun(export_format, started_at)
+    try:
+        async for rows in batches:
+            yield run.chunk(rows)
+        if run.first_byte_at is None:
+            yield run.chunk([])
+        run.failed = False
+    finally:
+        run.finish()
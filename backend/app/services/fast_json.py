@@ -0,0 +1,46 @@
+import enum
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import select
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : repli sur json de la bibliothèque standard
+    orjson = None
+
+def _default(value: Any):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """JSON compact, identique à la sortie pydantic pour les types des schémas de liste"""
+    if orjson is not None:
+        # OPT_UTC_Z : un horodatage UTC s'écrit "...Z", comme pydantic
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class RowProjection:
+    """Colonnes d'un modèle ORM correspondant aux champs d'un schéma de réponse, dans le même ordre.
+
+    Les lignes lues par `select()` deviennent directement des dicts sérialisables, sans objet
+    ORM ni validation pydantic par ligne. À réserver aux schémas dont chaque champ est une
+    colonne du même nom et de même type (pas de relation ni de champ calculé).
+    """
+
+    def __init__(self, schema, model, fields: Optional[Sequence[str]] = None):
+        self.fields: List[str] = list(fields) if fields is not None else list(schema.model_fields)
+        missing = [field for field in self.fields if not hasattr(model, field)]
+        if missing:
+            raise ValueError(f"{model.__name__} n'a pas de colonne pour {', '.join(missing)}")
+        self.columns = [getattr(model, field) for field in self.fields]
+
+    def select(self):
+        return select(*self.columns)
+
+    def as_dicts(self, rows: Iterable[Sequence]) -> List[Dict[str, Any]]:
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.models.hospital import Hospital
+from app.models.mission import MissionPriority
+from app.services.geo import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+# Pondération du score (somme = 1) : proximité, lits disponibles, spécialité adaptée
+SCORE_WEIGHTS = {"distance": 0.5, "beds": 0.2, "specialty": 0.3}
+DISTANCE_SCALE_KM = 10.0  # le terme de proximité vaut 1/e à cette distance
+BED_HALF_SCORE = 5  # nombre de lits pour lequel le terme de capacité vaut 0,5
+
+# Pathologies courantes -> spécialités attendues ; une pathologie inconnue est cherchée telle quelle
+CONDITION_SPECIALTIES = {
+    "cardiaque": ["cardiologie"],
+    "infarctus": ["cardiologie"],
+    "arret cardiaque": ["cardiologie", "reanimation"],
+    "avc": ["neurologie"],
+    "neurologique": ["neurologie"],
+    "trauma": ["traumatologie", "orthopedie"],
+    "traumatisme": ["traumatologie", "orthopedie"],
+    "polytraumatisme": ["traumatologie", "reanimation"],
+    "fracture": ["orthopedie", "traumatologie"],
+    "brulure": ["brules"],
+    "accouchement": ["maternite", "obstetrique"],
+    "pediatrique": ["pediatrie"],
+    "respiratoire": ["pneumologie", "reanimation"],
+    "intoxication": ["toxicologie", "reanimation"],
+    "psychiatrique": ["psychiatrie"],
+}
+
+def normalize(label: str) -> str:
+    """Minuscules sans accents : « Cardiologie », « cardiologie » et « CARDIOLOGIE » se valent"""
+    decomposed = unicodedata.normalize("NFKD", label.strip().lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+@dataclass(frozen=True)
+class HospitalEntry:
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+    emergency_beds: int
+    icu_beds: int
+
+@dataclass(frozen=True)
+class _Arrays:
+    """Colonnes de la table hospitals (hôpitaux actifs), précalculées pour le calcul vectoriel"""
+    entries: Tuple[HospitalEntry, ...]
+    lat_rad: np.ndarray
+    lon_rad: np.ndarray
+    cos_lat: np.ndarray
+    emergency_beds: np.ndarray
+    icu_beds: np.ndarray
+    specialties: np.ndarray  # booléens hôpital x spécialité
+    vocabulary: Dict[str, int]
+
+def _build(rows) -> _Arrays:
+    vocabulary: Dict[str, int] = {}
+    entries, memberships = [], []
+    for hospital_id, name, latitude, longitude, emergency_beds, icu_beds, specialties in rows:
+        entries.append(HospitalEntry(hospital_id, name, latitude, longitude, emergency_beds or 0, icu_beds or 0))
+        memberships.append([vocabulary.setdefault(normalize(s), len(vocabulary)) for s in specialties or [] if s])
+    matrix = np.zeros((len(entries), len(vocabulary)), dtype=bool)
+    for row, columns in enumerate(memberships):
+        matrix[row, columns] = True
+    lat_rad = np.radians(np.array([e.latitude for e in entries], dtype=float))
+    return _Arrays(
+        entries=tuple(entries),
+        lat_rad=lat_rad,
+        lon_rad=np.radians(np.array([e.longitude for e in entries], dtype=float)),
+        cos_lat=np.cos(lat_rad),
+        emergency_beds=np.array([e.emergency_beds for e in entries], dtype=float),
+        icu_beds=np.array([e.icu_beds for e in entries], dtype=float),
+        specialties=matrix,
+        vocabulary=vocabulary,
+    )
+
+class HospitalSnapshot:
+    """Instantané en tableaux des hôpitaux actifs, remplacé d'un bloc à chaque reconstruction.
+
+    Les écritures de ce worker le marquent périmé ; celles des autres workers sont prises en
+    compte au plus tard après `max_age_seconds`. Une recommandation ne fait aucune requête
+    tant que l'instantané est frais.
+    """
+
+    def __init__(self, max_age_seconds: float = 60.0):
+        self.max_age_seconds = max_age_seconds
+        self._arrays: Optional[_Arrays] = None
+        self._built_at = 0.0
+        self._dirty = True
+        self._refresh_lock = threading.Lock()
+        self._stats = {"rebuilds": 0, "recommendations": 0, "last_rebuild_ms": 0.0}
+
+    @property
+    def stale(self) -> bool:
+        return self._dirty or time.monotonic() - self._built_at > self.max_age_seconds
+
+    def invalidate(self) -> None:
+        self._dirty = True
+
+    def rebuild(self, rows) -> None:
+        """Reconstruire à partir de tuples (id, name, latitude, longitude, emergency_beds, icu_beds, specialties)"""
+        start = time.perf_counter()
+        self._arrays = _build(rows)
+        self._built_at = time.monotonic()
+        self._stats["rebuilds"] += 1
+        self._stats["last_rebuild_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    def refresh_if_stale(self, load_rows) -> None:
+        if not self.stale:
+            return
+        with self._refresh_lock:
+            # Un autre thread a pu reconstruire pendant l'attente du verrou
+            if self.stale:
+                # Marqué propre avant la lecture : une écriture pendant le rechargement le repérime
+                self._dirty = False
+                self.rebuild(load_rows())
+
+    def recommend(self, latitude: float, longitude: float, condition: Optional[str] = None,
+                  priority: Optional[MissionPriority] = None, k: int = 5,
+                  max_distance_km: Optional[float] = None) -> List[Tuple[HospitalEntry, float, bool, float]]:
+        """Les k meilleurs hôpitaux : (hôpital, distance km, spécialité adaptée, score dans [0, 1])"""
+        arrays = self._arrays
+        self._stats["recommendations"] += 1
+        if arrays is None or not arrays.entries:
+            return []
+        lat0, lon0 = np.radians(latitude), np.radians(longitude)
+        a = np.sin((arrays.lat_rad - lat0) / 2) ** 2 + np.cos(lat0) * arrays.cos_lat * np.sin((arrays.lon_rad - lon0) / 2) ** 2
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+        beds = arrays.emergency_beds
+        if priority == MissionPriority.CRITIQUE:
+            # Patient critique : les lits de réanimation comptent autant que les lits d'urgence
+            beds = beds + arrays.icu_beds
+        beds = np.maximum(beds, 0.0)
+
+        match = self._specialty_match(arrays, condition)
+        score = (
+            SCORE_WEIGHTS["distance"] * np.exp(-distances / DISTANCE_SCALE_KM)
+            + SCORE_WEIGHTS["beds"] * beds / (beds + BED_HALF_SCORE)
+            + SCORE_WEIGHTS["specialty"] * match
+        )
+        if max_distance_km is not None:
+            score = np.where(distances <= max_distance_km, score, -np.inf)
+
+        count = min(k, len(arrays.entries))
+        top = np.argpartition(-score, count - 1)[:count]
+        top = top[np.argsort(-score[top], kind="stable")]
+        return [
+            (arrays.entries[i], float(distances[i]), bool(match[i]), float(score[i]))
+            for i in top.tolist() if np.isfinite(score[i])
+        ]
+
+    @staticmethod
+    def _specialty_match(arrays: _Arrays, condition: Optional[str]) -> np.ndarray:
+        if not condition:
+            return np.zeros(len(arrays.entries))
+        key = normalize(condition)
+        wanted = [arrays.vocabulary[s] for s in CONDITION_SPECIALTIES.get(key, [key]) if s in arrays.vocabulary]
+        if not wanted:
+            return np.zeros(len(arrays.entries))
+        return arrays.specialties[:, wanted].any(axis=1).astype(float)
+
+    def metrics(self) -> dict:
+        arrays = self._arrays
+        return {
+            "hospitals": len(arrays.entries) if arrays is not None else 0,
+            "specialties": len(arrays.vocabulary) if arrays is not None else 0,
+            "age_seconds": round(time.monotonic() - self._built_at, 3) if arrays is not None else None,
+            "stale": self.stale,
+            "max_age_seconds": self.max_age_seconds,
+            **self._stats,
+        }
+
+hospital_snapshot = HospitalSnapshot(max_age_seconds=settings.HOSPITAL_SNAPSHOT_MAX_AGE_SECONDS)
+
+def load_hospital_rows() -> Sequence[tuple]:
+    db = SessionLocal()
+    try:
+        return db.query(
+            Hospital.id, Hospital.name, Hospital.latitude, Hospital.longitude,
+            Hospital.emergency_beds, Hospital.icu_beds, Hospital.specialties
+        ).filter(Hospital.is_active.is_(True)).all()
+    finally:
+        db.close()
+
+def refresh_hospital_snapshot() -> None:
+    """Recharger l'instantané s'il est périmé (démarrage, écriture locale ou âge maximal atteint)"""
+    hospital_snapshot.refresh_if_stale(load_hospital_rows)
+    logger.debug("Instantané des hôpitaux : %d hôpitaux", hospital_snapshot.metrics()["hospitals"])
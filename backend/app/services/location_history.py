@@ -0,0 +1,61 @@
+import logging
+from datetime import date
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.models.location import AmbulanceLocationHistory
+
+logger = logging.getLogger(__name__)
+
+TABLE = AmbulanceLocationHistory.__tablename__
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def _partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+def _existing_partitions(connection) -> List[str]:
+    rows = connection.execute(text(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+    ), {"table": TABLE})
+    return [row[0] for row in rows]
+
+def ensure_monthly_partitions(engine: Engine, months_ahead: int = 3) -> List[str]:
+    """Créer les partitions mensuelles manquantes jusqu'à `months_ahead` mois (MySQL uniquement)"""
+    if engine.dialect.name != "mysql":
+        return []
+    created = []
+    with engine.begin() as connection:
+        existing = set(_existing_partitions(connection))
+        current = date.today().replace(day=1)
+        for offset in range(months_ahead + 1):
+            month = _add_months(current, offset)
+            name = _partition_name(month)
+            if name in existing:
+                continue
+            # Découper p_future : les partitions restent ordonnées par borne croissante
+            connection.execute(text(
+                f"ALTER TABLE {TABLE} REORGANIZE PARTITION p_future INTO ("
+                f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{_add_months(month, 1):%Y-%m-%d}')), "
+                f"PARTITION p_future VALUES LESS THAN MAXVALUE)"
+            ))
+            created.append(name)
+            logger.info("Partition %s créée sur %s", name, TABLE)
+    return created
+
+def drop_expired_partitions(engine: Engine, retention_months: int) -> List[str]:
+    """Supprimer les partitions entièrement antérieures à la fenêtre de rétention (MySQL uniquement)"""
+    if engine.dialect.name != "mysql":
+        return []
+    cutoff = _partition_name(_add_months(date.today().replace(day=1), -retention_months))
+    dropped = []
+    with engine.begin() as connection:
+        for name in sorted(_existing_partitions(connection)):
+            if name != "p_future" and name < cutoff:
+                connection.execute(text(f"ALTER TABLE {TABLE} DROP PARTITION {name}"))
+                dropped.append(name)
+                logger.info("Partition %s supprimée de %s", name, TABLE)
+    return dropped
@@ -0,0 +1,290 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import anyio
+from sqlalchemy import event
+from app.core.config import settings
+from app.services.sql_profiler import fingerprint, log_slow_query, sql_profiler, timing_headers
+
+# Bornes (secondes) des histogrammes de latence : de la lecture en cache au timeout du pool
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, labels: tuple = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in values]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, labels: tuple = ()) -> None:
+        self.inc(-amount, labels)
+
+class Histogram(_Metric):
+    """Histogramme cumulatif à bornes fixes : une recherche dichotomique et trois additions par mesure"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [comptes par borne (+Inf en dernier), somme, nombre]
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((labels, (list(series[0]), series[1], series[2])) for labels, series in self._series.items())
+        lines = self.header()
+        for labels, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(round(total, 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+# (nom, type, aide, [(étiquettes, valeur)]) : valeurs lues au moment de la collecte
+Sample = Tuple[str, str, str, Iterable[Tuple[Dict[str, str], float]]]
+
+class MetricsRegistry:
+    """Métriques du processus au format d'exposition texte de Prometheus.
+
+    Les compteurs et histogrammes sont mis à jour en ligne ; les jauges des autres services
+    (pool de connexions, threadpool, bcrypt, cache) sont lues par des collecteurs au moment
+    de l'export seulement. Chaque worker expose ses propres valeurs : Prometheus agrège.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collect)
+
+    def render(self, extra: Iterable[Sample] = ()) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(render_samples(collect()))
+        lines.extend(render_samples(extra))
+        return "\n".join(lines) + "\n"
+
+def render_samples(samples: Iterable[Sample]) -> List[str]:
+    lines = []
+    for name, kind, documentation, values in samples:
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+        for labels, value in values:
+            lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+    return lines
+
+@dataclass
+class RequestStats:
+    """Activité SQL de la requête HTTP en cours (partagée avec le threadpool via le contexte)"""
+    queries: int = 0
+    db_seconds: float = 0.0
+    scope: Optional[dict] = None
+    # Avec SQL_PROFILING : requêtes regroupées par forme (sql_profiler.fingerprint) -> [nombre, secondes]
+    shapes: Optional[Dict[str, list]] = None
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route") if self.scope is not None else None
+        return route.path if route is not None else "unmatched"
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """Formes de SELECT exécutées au moins `threshold` fois, de la plus répétée à la moins répétée"""
+        return sorted(((shape, count, seconds) for shape, (count, seconds) in (self.shapes or {}).items()
+                       if count >= threshold and shape[:6].upper() == "SELECT"), key=lambda item: -item[1])
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter("http_requests_total", "Requêtes HTTP traitées", ("method", "route", "status"))
+http_duration = registry.histogram("http_request_duration_seconds", "Durée des requêtes HTTP", ("method", "route"))
+http_in_flight = registry.gauge("http_requests_in_flight", "Requêtes HTTP en cours de traitement")
+http_db_queries = registry.histogram("http_request_db_queries", "Requêtes SQL émises par requête HTTP",
+                                     ("method", "route"), buckets=QUERY_COUNT_BUCKETS)
+db_queries = registry.counter("db_queries_total", "Requêtes SQL exécutées", ("engine",))
+db_query_duration = registry.counter("db_query_seconds_total", "Temps cumulé d'exécution SQL", ("engine",))
+pool_checkout_wait = registry.histogram("db_pool_checkout_wait_seconds", "Attente d'une connexion du pool", ("pool",),
+                                        buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+pool_timeouts = registry.counter("db_pool_timeouts_total", "Attentes de connexion abandonnées (pool_timeout)", ("pool",))
+n_plus_one_requests = registry.counter("db_n_plus_one_requests_total",
+                                       "Requêtes HTTP ayant répété une même forme de SELECT", ("route",))
+
+missions_created = registry.counter("missions_created_total", "Missions créées", ("source",))
+missions_assigned = registry.counter("missions_assigned_total", "Missions affectées à une ambulance", ("source",))
+missions_completed = registry.counter("missions_completed_total", "Missions passées au statut terminée")
+location_fixes = registry.counter("location_fixes_total", "Positions GPS reçues, par issue", ("outcome",))
+
+def count_location_fixes(stats: dict) -> None:
+    for outcome in ("ingested", "superseded", "out_of_order", "rejected"):
+        if stats[outcome]:
+            location_fixes.inc(stats[outcome], (outcome,))
+
+def threadpool_samples() -> List[Sample]:
+    """Occupation du threadpool des routes synchrones (à appeler depuis la boucle asyncio)"""
+    statistics = anyio.to_thread.current_default_thread_limiter().statistics()
+    return [
+        ("threadpool_threads_busy", "gauge", "Threads du threadpool occupés", [({}, statistics.borrowed_tokens)]),
+        ("threadpool_threads_max", "gauge", "Taille du threadpool", [({}, statistics.total_tokens)]),
+        ("threadpool_queue_depth", "gauge", "Appels en attente d'un thread libre", [({}, statistics.tasks_waiting)]),
+    ]
+
+def instrument_engine(label: str, engine) -> None:
+    """Compter les requêtes SQL et leur durée, globalement et pour la requête HTTP en cours.
+
+    Avec SQL_PROFILING, chaque requête est aussi rattachée à sa forme et les plus lentes
+    sont journalisées ; sans METRICS_ENABLED, les compteurs Prometheus ne sont pas tenus.
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    labels = (label,)
+    export, profiling = settings.METRICS_ENABLED, settings.SQL_PROFILING
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        if export:
+            db_queries.inc(1, labels)
+            db_query_duration.inc(elapsed, labels)
+        stats = request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            if stats.shapes is not None:
+                shape = fingerprint(statement)
+                entry = stats.shapes.get(shape)
+                if entry is None:
+                    stats.shapes[shape] = [1, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+        if profiling:
+            log_slow_query(label, statement, parameters, elapsed, stats.route if stats is not None else None)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+class MetricsMiddleware:
+    """Middleware ASGI : latence, statut, requêtes SQL et requêtes en cours, par route.
+
+    La route est le gabarit résolu par FastAPI (/api/v1/missions/{mission_id}), jamais le
+    chemin brut : le nombre de séries reste borné. Les chemins sans route sont regroupés.
+    Avec SQL_PROFILING, le profil SQL de la requête alimente sql_profiler (agrégats, alerte
+    N+1) et, sur option, les en-têtes Server-Timing : ceux-ci ne reflètent que les requêtes
+    émises avant le début de la réponse.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.export = settings.METRICS_ENABLED
+        self.profiling = settings.SQL_PROFILING
+        self.timing_headers = settings.SQL_PROFILING and settings.SQL_PROFILE_HEADERS
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope=scope, shapes={} if self.profiling else None)
+        token = request_stats.set(stats)
+        status = [500]
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if self.timing_headers:
+                    headers = list(message.get("headers", [])) + timing_headers(stats, time.perf_counter() - started)
+                    message = dict(message, headers=headers)
+            await send(message)
+
+        if self.export:
+            http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_stats.reset(token)
+            route = stats.route
+            if self.export:
+                http_in_flight.dec()
+                labels = (scope["method"], route)
+                http_requests.inc(1, labels + (str(status[0]),))
+                http_duration.observe(elapsed, labels)
+                http_db_queries.observe(stats.queries, labels)
+            if self.profiling and sql_profiler.record(scope["method"], route, stats):
+                n_plus_one_requests.inc(1, (route,))
@@ -0,0 +1,147 @@
+import heapq
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.database.base import SessionLocal
+from app.models.mission import Mission, MissionPriority, MissionStatus
+from app.services.dispatch import PRIORITY_RANK
+
+logger = logging.getLogger(__name__)
+
+QueueKey = Tuple[int, datetime, int]  # (rang de priorité, création, id)
+
+@dataclass(frozen=True)
+class QueuedMission:
+    id: int
+    priority: MissionPriority
+    created_at: datetime
+
+    @property
+    def key(self) -> QueueKey:
+        return (PRIORITY_RANK[self.priority], self.created_at, self.id)
+
+class MissionQueue:
+    """File de priorité (tas) des missions en attente : priorité, puis ancienneté.
+
+    Les retraits sont paresseux : une entrée du tas n'est valide que si elle correspond encore
+    à `_entries`. Le tas est compacté quand les entrées mortes deviennent majoritaires.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap: List[QueueKey] = []
+        self._entries: Dict[int, QueuedMission] = {}
+        # Opérations reçues pendant un rechargement, rejouées sur le nouveau tas
+        self._journal: Optional[List[Tuple[str, object]]] = None
+        self._stats = {"pushed": 0, "removed": 0, "rebuilds": 0}
+
+    def _push(self, entry: QueuedMission) -> None:
+        previous = self._entries.get(entry.id)
+        if previous == entry:
+            return
+        self._entries[entry.id] = entry
+        heapq.heappush(self._heap, entry.key)
+        self._stats["pushed"] += 1
+
+    def _remove(self, mission_id: int) -> Optional[QueuedMission]:
+        entry = self._entries.pop(mission_id, None)
+        if entry is not None:
+            self._stats["removed"] += 1
+            if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+                self._heap = [e.key for e in self._entries.values()]
+                heapq.heapify(self._heap)
+        return entry
+
+    def _valid(self, key: QueueKey) -> bool:
+        entry = self._entries.get(key[2])
+        return entry is not None and entry.key == key
+
+    def track(self, mission) -> None:
+        """Refléter l'état d'une mission après écriture : en file si en attente, retirée sinon"""
+        if MissionStatus(mission.status) == MissionStatus.EN_ATTENTE:
+            self.requeue(QueuedMission(mission.id, MissionPriority(mission.priority), (mission.created_at or datetime.max).replace(tzinfo=None)))
+        else:
+            self.discard(mission.id)
+
+    def requeue(self, entry: QueuedMission) -> None:
+        """Ajouter ou mettre à jour une mission en file"""
+        with self._lock:
+            self._push(entry)
+            if self._journal is not None:
+                self._journal.append(("push", entry))
+
+    def discard(self, mission_id: int) -> None:
+        with self._lock:
+            self._remove(mission_id)
+            if self._journal is not None:
+                self._journal.append(("discard", mission_id))
+
+    def peek(self, limit: int = 10) -> List[QueuedMission]:
+        """Les `limit` premières missions, sans les retirer : parcours du tas par ordre croissant"""
+        with self._lock:
+            result: List[QueuedMission] = []
+            # Une mission retirée puis remise à l'identique a deux clés valides dans le tas
+            seen = set()
+            frontier = [(self._heap[0], 0)] if self._heap else []
+            while frontier and len(result) < limit:
+                key, index = heapq.heappop(frontier)
+                if key[2] not in seen and self._valid(key):
+                    seen.add(key[2])
+                    result.append(self._entries[key[2]])
+                for child in (2 * index + 1, 2 * index + 2):
+                    if child < len(self._heap):
+                        heapq.heappush(frontier, (self._heap[child], child))
+            return result
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rebuild(self, load_rows: Callable[[], Sequence[tuple]]) -> None:
+        """Recharger depuis des tuples (id, priority, created_at) des missions en attente"""
+        with self._lock:
+            journal: List[Tuple[str, object]] = []
+            self._journal = journal
+        try:
+            rows = load_rows()
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+        entries = {
+            mission_id: QueuedMission(mission_id, MissionPriority(priority), (created_at or datetime.max).replace(tzinfo=None))
+            for mission_id, priority, created_at in rows
+        }
+        with self._lock:
+            # Les écritures locales faites pendant la lecture sont plus récentes que les lignes lues
+            for operation, value in journal:
+                if operation == "push":
+                    entries[value.id] = value
+                else:
+                    entries.pop(value, None)
+            self._entries = entries
+            self._heap = [entry.key for entry in entries.values()]
+            heapq.heapify(self._heap)
+            self._journal = None
+            self._stats["rebuilds"] += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "heap_entries": len(self._heap), **self._stats}
+
+mission_queue = MissionQueue()
+
+def load_pending_missions() -> Sequence[tuple]:
+    db = SessionLocal()
+    try:
+        return db.query(Mission.id, Mission.priority, Mission.created_at).filter(
+            Mission.status == MissionStatus.EN_ATTENTE
+        ).all()
+    finally:
+        db.close()
+
+def refresh_mission_queue() -> None:
+    """Recharger la file depuis la base (démarrage et resynchronisation entre workers)"""
+    mission_queue.rebuild(load_pending_missions)
+    logger.debug("File des missions en attente rechargée : %d missions", len(mission_queue))
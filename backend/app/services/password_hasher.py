@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+class PasswordPoolBusy(Exception):
+    """Trop de hachages en attente : la requête est refusée plutôt que mise en file"""
+
+class PasswordHasher:
+    """Pool dédié (processus par défaut) pour le hachage bcrypt.
+
+    bcrypt est volontairement coûteux en CPU : exécuté dans le threadpool des requêtes,
+    un afflux de connexions (relève de garde) retarde toutes les autres routes. Ici le
+    calcul tourne dans `workers` processus séparés, le nombre de tâches acceptées est borné
+    par `max_pending` (au-delà : PasswordPoolBusy, HTTP 503) et les variantes async
+    n'occupent aucun thread pendant l'attente. Tant que le pool n'est pas démarré (scripts,
+    tests sans lifespan), le hachage s'exécute directement dans le thread appelant.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 256, use_processes: bool = True):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "max_queue_depth": 0,
+            "total_duration_ms": 0.0,
+            "max_duration_ms": 0.0,
+        }
+
+    def _create_executor(self) -> Executor:
+        if self.use_processes:
+            # spawn : pas de fork d'un worker uvicorn qui a déjà des threads (pool SQLAlchemy, flush)
+            return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+
+    def start(self) -> None:
+        """Démarrer les processus à l'avance pour que la première connexion ne paie pas leur lancement"""
+        if self.workers <= 0:
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            executor = self._executor
+        for future in [executor.submit(get_password_hash, "") for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _run_inline(fn, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def _submit(self, fn, *args) -> Future:
+        if self._executor is None:
+            return self._run_inline(fn, *args)
+        with self._lock:
+            if self._executor is None:
+                future = None
+            elif self._in_flight >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise PasswordPoolBusy()
+            else:
+                try:
+                    future = self._executor.submit(fn, *args)
+                except BrokenProcessPool:
+                    # Un processus du pool est mort : le recréer une fois
+                    logger.warning("Pool de hachage cassé, recréation")
+                    self._executor = self._create_executor()
+                    future = self._executor.submit(fn, *args)
+                self._in_flight += 1
+                self._stats["submitted"] += 1
+                self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._in_flight - self.workers)
+        if future is None:
+            # Pool arrêté entre-temps
+            return self._run_inline(fn, *args)
+        submitted_at = time.perf_counter()
+        future.add_done_callback(lambda done: self._done(done, submitted_at))
+        return future
+
+    def _done(self, future: Future, submitted_at: float) -> None:
+        duration_ms = (time.perf_counter() - submitted_at) * 1000
+        with self._lock:
+            self._in_flight -= 1
+            self._stats["completed" if future.exception() is None else "failed"] += 1
+            self._stats["total_duration_ms"] += duration_ms
+            self._stats["max_duration_ms"] = max(self._stats["max_duration_ms"], duration_ms)
+
+    def hash(self, password: str) -> str:
+        return self._submit(get_password_hash, password).result()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._submit(verify_password, password, hashed_password).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(get_password_hash, password))
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(verify_password, password, hashed_password))
+
+    def metrics(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            stats = dict(self._stats)
+        finished = stats["completed"] + stats["failed"]
+        total_duration_ms = stats.pop("total_duration_ms")
+        return {
+            "workers": self.workers,
+            "executor": "process" if self.use_processes else "thread",
+            "max_pending": self.max_pending,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self.workers),
+            "avg_duration_ms": round(total_duration_ms / finished, 3) if finished else 0.0,
+            **stats,
+            "max_duration_ms": round(stats["max_duration_ms"], 3),
+        }
+
+    def samples(self):
+        metrics = self.metrics()
+        return [
+            ("password_hash_in_flight", "gauge", "Hachages bcrypt en cours ou en attente", [({}, metrics["in_flight"])]),
+            ("password_hash_queue_depth", "gauge", "Hachages bcrypt en attente d'un worker", [({}, metrics["queue_depth"])]),
+            ("password_hash_rejected_total", "counter", "Connexions refusées (pool bcrypt saturé)", [({}, metrics["rejected"])]),
+        ]
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    use_processes=settings.PASSWORD_HASH_USE_PROCESSES
+)
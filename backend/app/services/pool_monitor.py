@@ -0,0 +1,124 @@
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.services.metrics import pool_checkout_wait, pool_timeouts
+
+class PoolMonitor:
+    """Occupation des pools de connexions SQLAlchemy, suivie par les événements checkout / checkin.
+
+    Un checkout « saturé » a trouvé toutes les connexions déjà prêtées (taille + débordement) :
+    les suivants attendront jusqu'à `pool_timeout`. L'attente elle-même est mesurée autour de
+    `pool.connect()`. Les compteurs sont propres au processus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: Dict[str, object] = {}
+        self._stats: Dict[str, dict] = {}
+        self._checkout_started: Dict[int, float] = {}
+
+    def attach(self, label: str, engine) -> None:
+        """Suivre le pool d'un moteur (pour un moteur async, celui de `engine.sync_engine`)"""
+        engine = getattr(engine, "sync_engine", engine)
+        with self._lock:
+            if label in self._engines:
+                return
+            self._engines[label] = engine
+            self._stats[label] = {"checkouts": 0, "saturated_checkouts": 0, "timeouts": 0, "in_use": 0, "max_in_use": 0,
+                                  "total_held_ms": 0.0, "max_held_ms": 0.0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+        stats = self._stats[label]
+        capacity = self._capacity(engine.pool)
+        labels = (label,)
+        connect = engine.pool.connect
+
+        def timed_connect():
+            started = time.perf_counter()
+            try:
+                return connect()
+            except PoolTimeoutError:
+                with self._lock:
+                    stats["timeouts"] += 1
+                pool_timeouts.inc(1, labels)
+                raise
+            finally:
+                waited = time.perf_counter() - started
+                pool_checkout_wait.observe(waited, labels)
+                with self._lock:
+                    stats["total_wait_ms"] += waited * 1000
+                    stats["max_wait_ms"] = max(stats["max_wait_ms"], waited * 1000)
+
+        # Engine.connect() passe par pool.connect() : l'attente d'une connexion libre y est incluse
+        engine.pool.connect = timed_connect
+
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                stats["checkouts"] += 1
+                stats["in_use"] += 1
+                stats["max_in_use"] = max(stats["max_in_use"], stats["in_use"])
+                if capacity and stats["in_use"] >= capacity:
+                    stats["saturated_checkouts"] += 1
+                self._checkout_started[id(connection_record)] = time.perf_counter()
+
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                started = self._checkout_started.pop(id(connection_record), None)
+                if started is None:
+                    return
+                stats["in_use"] -= 1
+                held_ms = (time.perf_counter() - started) * 1000
+                stats["total_held_ms"] += held_ms
+                stats["max_held_ms"] = max(stats["max_held_ms"], held_ms)
+
+        event.listen(engine, "checkout", on_checkout)
+        event.listen(engine, "checkin", on_checkin)
+
+    @staticmethod
+    def _capacity(pool) -> int:
+        # QueuePool : taille + débordement ; 0 pour les pools sans limite (NullPool, StaticPool)
+        if not hasattr(pool, "size"):
+            return 0
+        return max(0, pool.size() + max(0, getattr(pool, "_max_overflow", 0)))
+
+    def metrics(self) -> dict:
+        result = {}
+        with self._lock:
+            snapshot = {label: dict(stats) for label, stats in self._stats.items()}
+        for label, stats in snapshot.items():
+            pool = self._engines[label].pool
+            capacity = self._capacity(pool)
+            total_held_ms = stats.pop("total_held_ms")
+            total_wait_ms = stats.pop("total_wait_ms")
+            result[label] = {
+                "pool": type(pool).__name__,
+                "capacity": capacity,
+                "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else stats["in_use"],
+                "overflow": max(0, pool.overflow()) if hasattr(pool, "overflow") else 0,
+                "saturation": round(stats["in_use"] / capacity, 4) if capacity else 0.0,
+                "avg_held_ms": round(total_held_ms / stats["checkouts"], 3) if stats["checkouts"] else 0.0,
+                "avg_wait_ms": round(total_wait_ms / stats["checkouts"], 3) if stats["checkouts"] else 0.0,
+                **stats,
+                "max_held_ms": round(stats["max_held_ms"], 3),
+                "max_wait_ms": round(stats["max_wait_ms"], 3),
+            }
+        return result
+
+    def samples(self):
+        """Jauges et compteurs au format de MetricsRegistry (lus à chaque export /metrics)"""
+        metrics = self.metrics()
+
+        def per_pool(key):
+            return [({"pool": label}, stats[key]) for label, stats in metrics.items()]
+
+        return [
+            ("db_pool_capacity", "gauge", "Connexions maximales du pool (taille + débordement)", per_pool("capacity")),
+            ("db_pool_checked_out", "gauge", "Connexions actuellement prêtées", per_pool("checked_out")),
+            ("db_pool_overflow", "gauge", "Connexions ouvertes au-delà de la taille du pool", per_pool("overflow")),
+            ("db_pool_max_in_use", "gauge", "Pic de connexions prêtées simultanément", per_pool("max_in_use")),
+            ("db_pool_checkouts_total", "counter", "Connexions prêtées", per_pool("checkouts")),
+            ("db_pool_saturated_checkouts_total", "counter", "Checkouts ayant épuisé le pool", per_pool("saturated_checkouts")),
+        ]
+
+pool_monitor = PoolMonitor()
@@ -0,0 +1,228 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import case, or_, update
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core.config import settings
+from app.crud.location import location_history_insert
+from app.database.base import SessionLocal
+from app.models.ambulance import Ambulance
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class LivePosition:
+    latitude: float
+    longitude: float
+    timestamp: datetime  # UTC naïf, comme location_updated_at
+    received_at: float  # time.monotonic() à la réception
+
+def positions_update(positions: Dict[int, LivePosition]):
+    """Un seul UPDATE ensembliste (CASE id ...) gardé par l'horodatage déjà stocké"""
+    new_timestamp = case({ambulance_id: p.timestamp for ambulance_id, p in positions.items()}, value=Ambulance.id)
+    return (
+        update(Ambulance)
+        .where(Ambulance.id.in_(list(positions)))
+        .where(or_(Ambulance.location_updated_at.is_(None), Ambulance.location_updated_at < new_timestamp))
+        .values(
+            latitude=case({ambulance_id: p.latitude for ambulance_id, p in positions.items()}, value=Ambulance.id),
+            longitude=case({ambulance_id: p.longitude for ambulance_id, p in positions.items()}, value=Ambulance.id),
+            location_updated_at=new_timestamp
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+class PositionStore:
+    """Dernière position connue de chaque ambulance, écrite en différé (write-behind).
+
+    Les positions reçues sont visibles immédiatement en lecture ; seules les plus récentes
+    sont écrites dans `ambulances`, par lot, toutes les `flush_interval` secondes ou dès que
+    `max_pending` ambulances sont en attente. Les lignes d'historique (`ambulance_locations`)
+    sont insérées dans la même transaction. En cas d'arrêt brutal, la perte est bornée aux
+    positions reçues depuis le dernier flush réussi (au plus un intervalle ou `max_pending`
+    ambulances) ; la position précédente reste en base.
+    """
+
+    def __init__(self, flush_interval: float = 2.0, max_pending: int = 500, max_history_backlog: int = 100000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_history_backlog = max_history_backlog
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[int, LivePosition] = {}
+        self._history: List[dict] = []
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "recorded": 0,
+            "coalesced": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "flush_failures": 0,
+            "history_flushed": 0,
+            "history_dropped": 0,
+            "last_flush_at": None,
+            "last_flush_rows": 0,
+            "last_flush_duration_ms": 0.0,
+            "last_flush_lag_ms": 0.0,
+            "max_flush_lag_ms": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def record(self, ambulance_id: int, latitude: float, longitude: float, timestamp: datetime) -> bool:
+        """Enregistrer une position ; retourne False si une position plus récente est déjà en attente"""
+        position = LivePosition(latitude, longitude, timestamp, time.monotonic())
+        with self._lock:
+            current = self._pending.get(ambulance_id)
+            if current is not None:
+                if current.timestamp >= timestamp:
+                    return False
+                # Conserver l'heure de réception de la plus ancienne position non écrite (mesure du retard)
+                position = LivePosition(latitude, longitude, timestamp, current.received_at)
+                self._stats["coalesced"] += 1
+            self._pending[ambulance_id] = position
+            self._stats["recorded"] += 1
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+        return True
+
+    def append_history(self, rows: List[dict]) -> None:
+        """Mettre en attente des lignes d'historique, écrites au prochain flush"""
+        with self._lock:
+            self._history.extend(rows)
+            # Base indisponible trop longtemps : abandonner les lignes les plus anciennes
+            overflow = len(self._history) - self.max_history_backlog
+            if overflow > 0:
+                del self._history[:overflow]
+                self._stats["history_dropped"] += overflow
+
+    def get(self, ambulance_id: int) -> Optional[LivePosition]:
+        return self._pending.get(ambulance_id)
+
+    def discard(self, ambulance_id: int) -> None:
+        with self._lock:
+            self._pending.pop(ambulance_id, None)
+
+    def pending(self) -> Dict[int, LivePosition]:
+        with self._lock:
+            return dict(self._pending)
+
+    def overlay(self, ambulance: Optional[Ambulance]) -> Optional[Ambulance]:
+        """Appliquer la position en attente sur l'objet ORM sans le marquer comme modifié"""
+        if ambulance is None:
+            return None
+        position = self._pending.get(ambulance.id)
+        if position is not None:
+            set_committed_value(ambulance, "latitude", position.latitude)
+            set_committed_value(ambulance, "longitude", position.longitude)
+            set_committed_value(ambulance, "location_updated_at", position.timestamp)
+        return ambulance
+
+    def overlay_rows(self, items: List[dict]) -> List[dict]:
+        """Même chose que `overlay` pour des lignes projetées (dicts avec id) : seules les clés présentes sont recalées"""
+        pending = self.pending()
+        if pending and items:
+            keys = [key for key in ("latitude", "longitude", "location_updated_at") if key in items[0]]
+            if keys:
+                for item in items:
+                    position = pending.get(item["id"])
+                    if position is not None:
+                        values = {"latitude": position.latitude, "longitude": position.longitude, "location_updated_at": position.timestamp}
+                        item.update((key, values[key]) for key in keys)
+        return items
+
+    def flush(self) -> int:
+        """Écrire les positions en attente en un seul UPDATE ; retourne le nombre de lignes écrites"""
+        with self._flush_lock:
+            # Les positions restent lisibles pendant l'écriture : on ne les retire qu'après le commit
+            with self._lock:
+                batch = dict(self._pending)
+                history, self._history = self._history, []
+            if not batch and not history:
+                return 0
+
+            started = time.monotonic()
+            lag_ms = (started - min(p.received_at for p in batch.values())) * 1000 if batch else 0.0
+            rowcount = 0
+            db = SessionLocal()
+            try:
+                if batch:
+                    rowcount = db.execute(positions_update(batch)).rowcount
+                if history:
+                    db.execute(location_history_insert(), history)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    self._history[:0] = history
+                self._stats["flush_failures"] += 1
+                logger.exception("Échec de l'écriture différée de %d positions", len(batch))
+                return 0
+            finally:
+                db.close()
+
+            with self._lock:
+                for ambulance_id, position in batch.items():
+                    # Une position plus récente reçue pendant l'écriture reste en attente
+                    if self._pending.get(ambulance_id) is position:
+                        del self._pending[ambulance_id]
+
+            stats = self._stats
+            stats["flushes"] += 1
+            stats["flushed"] += rowcount
+            stats["history_flushed"] += len(history)
+            stats["last_flush_at"] = datetime.utcnow()
+            stats["last_flush_rows"] = rowcount
+            stats["last_flush_duration_ms"] = round((time.monotonic() - started) * 1000, 3)
+            stats["last_flush_lag_ms"] = round(lag_ms, 3)
+            stats["max_flush_lag_ms"] = max(stats["max_flush_lag_ms"], round(lag_ms, 3))
+            return rowcount
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="position-store-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Arrêter le thread d'écriture et vider les positions restantes"""
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+            history_pending = len(self._history)
+            oldest = min((p.received_at for p in self._pending.values()), default=None)
+        return {
+            "enabled": self.running,
+            "pending": pending,
+            "history_pending": history_pending,
+            "oldest_pending_age_ms": round((time.monotonic() - oldest) * 1000, 3) if oldest is not None else 0.0,
+            "flush_interval_seconds": self.flush_interval,
+            "max_pending": self.max_pending,
+            **self._stats,
+        }
+
+position_store = PositionStore(
+    flush_interval=settings.POSITION_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.POSITION_FLUSH_MAX_PENDING
+)
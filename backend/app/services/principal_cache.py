@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+from app.core.config import settings
+from app.models.user import UserRole
+from app.services.read_cache import read_cache
+
+# Version partagée (resource_versions) incrémentée à chaque invalidation, sur n'importe quel worker
+PRINCIPALS = "principals"
+
+@dataclass(frozen=True)
+class Principal:
+    """Instantané immuable de l'utilisateur authentifié, partagé entre requêtes.
+
+    Un objet ORM ne peut pas être mis en cache : il serait expiré par le commit de la
+    session de la requête qui l'a chargé. Les champs de profil valent None quand le
+    principal est construit à partir des claims du token (voir `complete`).
+    """
+    id: int
+    username: str
+    role: UserRole
+    is_active: bool
+    email: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    phone: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    last_login: Optional[datetime] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.email is not None
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=UserRole(user.role),
+            is_active=bool(user.is_active),
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            phone=user.phone,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            last_login=user.last_login,
+        )
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> Optional["Principal"]:
+        try:
+            return cls(
+                id=int(payload["uid"]),
+                username=payload["sub"],
+                role=UserRole(payload["role"]),
+                is_active=bool(payload["active"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+class PrincipalCache:
+    """Cache TTL + LRU des principaux, indexé par sujet du token (username).
+
+    Invalidé aussitôt localement par les écritures de crud.user ; chaque invalidation
+    incrémente aussi une version partagée en base (read_cache.touch), et un worker qui la
+    voit changer vide son cache : un utilisateur désactivé ou rétrogradé sur un autre
+    worker l'est ici après au plus deux READ_CACHE_VERSION_REFRESH_SECONDS. Un compteur de
+    génération empêche une lecture commencée avant une invalidation de réinsérer une
+    valeur périmée.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._generation = 0
+        self._shared_version: Optional[int] = None
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0, "remote_invalidations": 0}
+
+    def _sync(self) -> None:
+        # Invalidation sur un autre worker (ou reportée depuis celui-ci) : tout vider
+        shared = read_cache.version(PRINCIPALS)
+        if shared != self._shared_version:
+            if self._shared_version is not None:
+                self._stats["remote_invalidations"] += 1
+            self._shared_version = shared
+            self._generation += 1
+            self._entries.clear()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, username: str) -> Optional[Principal]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(username)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[username]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(username)
+            self._stats["hits"] += 1
+            return principal
+
+    def put(self, principal: Principal, generation: int) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[principal.username] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, *usernames: Optional[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for username in usernames:
+                if username is not None and self._entries.pop(username, None) is not None:
+                    self._stats["invalidations"] += 1
+        read_cache.touch(PRINCIPALS)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
+
+principal_cache = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
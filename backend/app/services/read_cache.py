@@ -0,0 +1,209 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Set, Tuple
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.models.cache import ResourceVersion
+
+JSON_MEDIA_TYPE = "application/json"
+
+@dataclass(frozen=True)
+class CachedRead:
+    key: tuple
+    etag: str
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    # Comparaison faible (RFC 9110) : W/"x" et "x" désignent la même représentation
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+def persist_versions(changed: Set[str]) -> Dict[str, int]:
+    """Incrémenter une fois en base chaque ressource modifiée, puis relire toutes les versions"""
+    db = SessionLocal()
+    try:
+        for attempt in range(2):
+            try:
+                # Ordre fixe : deux workers qui reportent les mêmes ressources ne s'interbloquent pas
+                for resource in sorted(changed):
+                    result = db.execute(update(ResourceVersion).where(ResourceVersion.resource == resource).values(
+                        version=ResourceVersion.version + 1
+                    ))
+                    if result.rowcount == 0:
+                        db.execute(insert(ResourceVersion).values(resource=resource, version=1))
+                versions = dict(db.execute(select(ResourceVersion.resource, ResourceVersion.version)).all())
+                db.commit()
+                return versions
+            except IntegrityError:
+                # Ligne créée au même instant par un autre worker : la mise à jour suffit au second essai
+                db.rollback()
+                if attempt:
+                    raise
+    finally:
+        db.close()
+
+class ReadCache:
+    """Réponses JSON sérialisées des listes très sollicitées, indexées par (chemin, paramètres, versions).
+
+    Chaque ressource a une version partagée en base (resource_versions). Les écritures ne font
+    que marquer la ressource en mémoire ; `refresh_versions`, lancé périodiquement, reporte en
+    base un seul incrément par ressource modifiée et relit les versions des autres workers.
+    L'ETag ne dépend que du chemin, des paramètres et de ces versions : il est identique d'un
+    worker à l'autre et survit aux redémarrages. Après une écriture CRUD locale, la ressource
+    est servie sans cache jusqu'au report ; les positions (`touch`) ne le sont pas et restent
+    en cache jusqu'au report suivant. `ttl` borne seulement la conservation d'un corps en mémoire.
+
+    Fraîcheur entre workers : une écriture faite ailleurs n'est vue ici qu'après son report
+    puis notre relecture, soit au plus deux intervalles de rafraîchissement. D'ici là, ce
+    worker répond encore 304 ou son corps en cache pour cette ressource, et un client
+    réparti entre workers peut voir alterner deux ETag pour les mêmes données. Les versions
+    ne sont pas relues à chaque requête : `lookup` est appelé depuis la boucle par les routes
+    async, qu'une lecture en base bloquerait.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        # Ressources modifiées, pas encore reportées en base ; `_dirty` : servies sans cache d'ici là
+        self._changed: Set[str] = set()
+        self._dirty: Set[str] = set()
+        self._entries: "OrderedDict[tuple, Tuple[bytes, float]]" = OrderedDict()
+        self._adapters: Dict[object, TypeAdapter] = {}
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "bytes_saved": 0, "evictions": 0, "expired": 0}
+
+    def bump(self, *resources: str) -> None:
+        """Ressources modifiées par une écriture CRUD, à appeler après le commit"""
+        with self._lock:
+            self._changed.update(resources)
+            self._dirty.update(resources)
+
+    def touch(self, *resources: str) -> None:
+        """Modification à haute fréquence (positions) : reportée au prochain rafraîchissement, sans contourner le cache"""
+        with self._lock:
+            self._changed.update(resources)
+
+    def refresh_versions(self) -> None:
+        """Reporter les modifications locales et relire les versions partagées (écritures des autres workers).
+
+        Actif même cache désactivé : les versions servent aussi à principal_cache.
+        """
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        try:
+            versions = persist_versions(changed)
+        except Exception:
+            with self._lock:
+                self._changed.update(changed)
+            raise
+        with self._lock:
+            # Les versions en base ne font que croître : une lecture plus ancienne ne fait pas reculer
+            for resource, version in versions.items():
+                if version > self._versions.get(resource, 0):
+                    self._versions[resource] = version
+            # Une ressource modifiée de nouveau pendant le report reste servie sans cache
+            self._dirty -= changed - self._changed
+
+    def version(self, resource: str) -> int:
+        """Dernière version partagée connue (sans verrou : lecture d'un entier)"""
+        return self._versions.get(resource, 0)
+
+    @staticmethod
+    def _etag(key: tuple) -> str:
+        return '"' + hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest() + '"'
+
+    def lookup(self, request: Request, resources: Sequence[str]) -> Tuple[Optional[CachedRead], Optional[Response]]:
+        """Réponse prête (304 ou corps en cache) ou, à défaut, la clé sous laquelle stocker le résultat"""
+        if self.ttl <= 0:
+            return None, None
+        with self._lock:
+            if not self._dirty.isdisjoint(resources):
+                self._stats["misses"] += 1
+                return None, None
+            versions = tuple(self._versions.get(resource, 0) for resource in resources)
+            key = (request.url.path, tuple(sorted(request.query_params.multi_items())), versions)
+            read = CachedRead(key, self._etag(key))
+            body = None
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    body = entry[0]
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    self._stats["expired"] += 1
+            if etag_matches(request.headers.get("if-none-match"), read.etag):
+                # L'ETag ne dépend que de la clé : 304 sans lecture ni sérialisation, même si le corps a expiré
+                self._stats["not_modified"] += 1
+                if body is not None:
+                    self._stats["bytes_saved"] += len(body)
+                return read, Response(status_code=304, headers=self._headers(read))
+            if body is None:
+                self._stats["misses"] += 1
+                return read, None
+            self._stats["hits"] += 1
+        return read, Response(body, media_type=JSON_MEDIA_TYPE, headers=self._headers(read))
+
+    def store(self, read: Optional[CachedRead], response_model, data) -> Response:
+        """Sérialiser `data` selon `response_model` (comme FastAPI) et le mettre en cache"""
+        adapter = self._adapters.get(response_model)
+        if adapter is None:
+            adapter = self._adapters.setdefault(response_model, TypeAdapter(response_model))
+        return self.store_json(read, adapter.dump_json(adapter.validate_python(data, from_attributes=True)))
+
+    def store_json(self, read: Optional[CachedRead], body: bytes) -> Response:
+        """Mettre en cache un corps JSON déjà sérialisé"""
+        if read is None:
+            return Response(body, media_type=JSON_MEDIA_TYPE)
+        with self._lock:
+            self._entries[read.key] = (body, time.monotonic() + self.ttl)
+            self._entries.move_to_end(read.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return Response(body, media_type=JSON_MEDIA_TYPE, headers=self._headers(read))
+
+    @staticmethod
+    def _headers(read: CachedRead) -> dict:
+        # no-cache : le client peut garder la réponse mais doit la revalider (If-None-Match)
+        return {"ETag": read.etag, "Cache-Control": "no-cache"}
+
+    def metrics(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+            cached_bytes = sum(len(body) for body, _ in self._entries.values())
+            versions = dict(self._versions)
+            changed = sorted(self._changed)
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["not_modified"]
+        return {
+            "size": size,
+            "cached_bytes": cached_bytes,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hit_ratio": round((self._stats["hits"] + self._stats["not_modified"]) / lookups, 4) if lookups else 0.0,
+            "versions": versions,
+            "unpersisted_changes": changed,
+            **self._stats,
+        }
+
+    def samples(self):
+        with self._lock:
+            stats = dict(self._stats)
+            size = len(self._entries)
+        return [
+            ("read_cache_entries", "gauge", "Réponses en cache", [({}, size)]),
+            ("read_cache_lookups_total", "counter", "Consultations du cache de lecture, par issue",
+             [({"outcome": "hit"}, stats["hits"]), ({"outcome": "miss"}, stats["misses"]),
+              ({"outcome": "not_modified"}, stats["not_modified"])]),
+        ]
+
+read_cache = ReadCache(ttl=settings.READ_CACHE_TTL_SECONDS, max_entries=settings.READ_CACHE_MAX_ENTRIES)
@@ -0,0 +1,251 @@
+import asyncio
+import os
+import queue
+import random
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from typing import Dict, Optional
+
+try:
+    from anyio._backends._asyncio import WorkerThread
+    _WORKER_ROOT = WorkerThread.run.__code__
+except (ImportError, AttributeError):  # autre version d'anyio : seules les routes async sont échantillonnées
+    _WORKER_ROOT = None
+_LOOP_ROOT = asyncio.events.Handle._run.__code__
+# Appels du worker anyio hors de context.run : sa variable `context` est alors celle de la tâche précédente
+_WORKER_IDLE = {queue.Queue.get.__code__, queue.Queue.task_done.__code__, asyncio.BaseEventLoop.call_soon_threadsafe.__code__}
+MAX_DEPTH = 128
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PREFIXES = sorted({sysconfig.get_paths()["purelib"], sysconfig.get_paths()["stdlib"], _BACKEND_DIR}, key=len, reverse=True)
+
+@lru_cache(maxsize=16384)
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    for prefix in _PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):].lstrip(os.sep)
+            break
+    # Une entrée par fonction (et non par ligne) : les piles se regroupent dans le flame graph
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+class ProfilingSession:
+    """Une session d'échantillonnage : filtre des requêtes, piles agrégées au format « folded »"""
+
+    def __init__(self, route: Optional[str], sample_rate: float, interval_ms: float, duration_seconds: float,
+                 max_stacks: int):
+        self.route = route
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.started_at = time.time()
+        self.expires_at = time.monotonic() + duration_seconds
+        self.max_stacks = max_stacks
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.requests = 0
+        # Requêtes profilées en cours sur la boucle asyncio : tâche -> scope
+        self.tasks: Dict[asyncio.Task, dict] = {}
+        self.loop = None
+        self.loop_thread = None
+
+    def selects(self, path: str) -> bool:
+        if self.route is not None and not fnmatchcase(path, self.route):
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def add(self, stack: str) -> None:
+        with self.lock:
+            self.samples += 1
+            if stack not in self.stacks and len(self.stacks) >= self.max_stacks:
+                stack = "[piles tronquées]"
+            self.stacks[stack] += 1
+
+    def status(self) -> dict:
+        with self.lock:
+            samples, distinct = self.samples, len(self.stacks)
+        return {
+            "active": not self.stopped.is_set(),
+            "route": self.route,
+            "sample_rate": self.sample_rate,
+            "interval_ms": self.interval * 1000,
+            "started_at": self.started_at,
+            "remaining_seconds": round(max(0.0, self.expires_at - time.monotonic()), 1) if not self.stopped.is_set() else 0.0,
+            "requests_profiled": self.requests,
+            "samples": samples,
+            "distinct_stacks": distinct,
+        }
+
+# (session, scope) de la requête profilée, propagé aux threads du threadpool avec le contexte
+profiled_request: ContextVar[Optional[tuple]] = ContextVar("profiled_request", default=None)
+
+def _route(scope: dict) -> str:
+    route = scope.get("route")
+    return f'{scope["method"]} {route.path if route is not None else scope["path"]}'
+
+class SamplingProfiler:
+    """Profileur statistique à la demande pour les requêtes en production.
+
+    Un thread relève à intervalle fixe les piles (sys._current_frames) des threads qui
+    traitent une requête profilée : la boucle asyncio quand la tâche courante en est une, et
+    les threads du threadpool dont le contexte porte la requête (routes synchrones, validation
+    pydantic, hydratation ORM). Une requête suspendue sur un await (base async, pool bcrypt)
+    est relevée par sa chaîne de coroutines : les échantillons sont en temps écoulé. Sans
+    session, le coût se limite à une lecture d'attribut par requête. La session est propre
+    au worker qui la reçoit.
+    """
+
+    def __init__(self):
+        self.session: Optional[ProfilingSession] = None
+        self.last: Optional[ProfilingSession] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, route: Optional[str], sample_rate: float, interval_ms: float, duration_seconds: float,
+              max_stacks: int) -> ProfilingSession:
+        self.stop()
+        session = ProfilingSession(route, sample_rate, interval_ms, duration_seconds, max_stacks)
+        self.session = self.last = session
+        self._thread = threading.Thread(target=self._run, args=(session,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return session
+
+    def stop(self) -> Optional[ProfilingSession]:
+        session, self.session = self.session, None
+        if session is not None:
+            session.stopped.set()
+            self._thread.join()
+        return session
+
+    def _run(self, session: ProfilingSession) -> None:
+        own = threading.get_ident()
+        # Sans préemption plus fréquente, le thread d'échantillonnage n'obtient le GIL qu'aux
+        # entrées-sorties des autres threads et ne verrait jamais le code Python en plein calcul
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, session.interval))
+        try:
+            while not session.stopped.wait(session.interval):
+                if time.monotonic() >= session.expires_at:
+                    break
+                self._sample(session, own)
+        finally:
+            sys.setswitchinterval(switch_interval)
+            session.stopped.set()
+            if self.session is session:
+                self.session = None
+
+    def _sample(self, session: ProfilingSession, own: int) -> None:
+        running = asyncio.current_task(session.loop) if session.loop is not None else None
+        busy = set()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            if thread_id == session.loop_thread:
+                scope = session.tasks.get(running)
+                if scope is None:
+                    continue
+                codes, root = self._thread_codes(frame, _LOOP_ROOT)
+                session.add(self._fold(scope, "[boucle asyncio]", reversed(codes)))
+            else:
+                codes, root = self._thread_codes(frame, _WORKER_ROOT)
+                # Thread du threadpool : la requête est dans le contexte confié au worker anyio
+                if root is None or not codes or codes[-1] in _WORKER_IDLE:
+                    continue
+                context = root.f_locals.get("context")
+                request = context.get(profiled_request) if context is not None else None
+                if request is None or request[0] is not session:
+                    continue
+                scope = request[1]
+                session.add(self._fold(scope, "[threadpool]", reversed(codes)))
+            busy.add(id(scope))
+        # Requêtes suspendues sur un await (base async, bcrypt, E/S) : pile des coroutines en attente
+        for task, scope in list(session.tasks.items()):
+            if task is running or id(scope) in busy:
+                continue
+            codes, awaited = self._await_codes(task.get_coro())
+            leaf = f"[attente] {type(awaited).__name__}" if awaited is not None else None
+            session.add(self._fold(scope, "[attente asyncio]", codes, leaf))
+
+    @staticmethod
+    def _thread_codes(frame, root) -> tuple:
+        """Cadres du sommet de pile jusqu'au cadre racine exclu (celui-ci est renvoyé s'il est trouvé)"""
+        codes = []
+        while frame is not None and frame.f_code is not root:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        return codes, frame
+
+    @staticmethod
+    def _await_codes(coro) -> tuple:
+        """Chaîne des coroutines d'une tâche suspendue, de la plus externe à l'objet attendu"""
+        codes = []
+        while coro is not None and len(codes) < MAX_DEPTH:
+            frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+            if frame is None:
+                break
+            codes.append(frame.f_code)
+            coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+        return codes, coro
+
+    @staticmethod
+    def _fold(scope: dict, kind: str, codes, leaf: Optional[str] = None) -> str:
+        labels = [_route(scope), kind]
+        labels.extend(_frame_label(code) for code in codes)
+        if leaf is not None:
+            labels.append(leaf)
+        return ";".join(labels[:MAX_DEPTH])
+
+    def folded(self, session: ProfilingSession) -> str:
+        """Piles au format « folded » (une ligne « cadre;cadre;... nombre ») : flamegraph.pl, inferno, speedscope"""
+        with session.lock:
+            stacks = sorted(session.stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def summary(self, session: ProfilingSession, limit: int) -> dict:
+        """Fonctions les plus présentes dans les échantillons : temps propre (sommet de pile) et inclusif"""
+        with session.lock:
+            stacks = list(session.stacks.items())
+        own, inclusive = Counter(), Counter()
+        for stack, count in stacks:
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for label in set(frames[1:]):
+                inclusive[label] += count
+        total = sum(count for _, count in stacks) or 1
+        return {
+            **session.status(),
+            "functions": [{"function": label, "self": own[label], "total": count,
+                           "self_percent": round(own[label] * 100 / total, 1), "total_percent": round(count * 100 / total, 1)}
+                          for label, count in sorted(inclusive.items(), key=lambda item: (-own[item[0]], -item[1]))[:limit]],
+        }
+
+sampling_profiler = SamplingProfiler()
+
+class SamplingProfilerMiddleware:
+    """Middleware ASGI : désigne les requêtes à profiler (motif de chemin, pourcentage)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        session = sampling_profiler.session
+        if session is None or scope["type"] != "http" or not session.selects(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        if session.loop is None:
+            session.loop, session.loop_thread = asyncio.get_running_loop(), threading.get_ident()
+        session.requests += 1
+        task = asyncio.current_task()
+        session.tasks[task] = scope
+        token = profiled_request.set((session, scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiled_request.reset(token)
+            session.tasks.pop(task, None)
@@ -0,0 +1,196 @@
+import heapq
+import logging
+import threading
+from dataclasses import dataclass
+from math import asin, cos, floor, radians, sin
+from typing import Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.models.ambulance import Ambulance, AmbulanceStatus
+from app.services.geo import EARTH_RADIUS_KM, KM_PER_DEGREE, haversine_km
+from app.services.position_store import position_store
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[int, int]
+
+@dataclass(frozen=True)
+class IndexedAmbulance:
+    id: int
+    plate_number: str
+    status: AmbulanceStatus
+    latitude: Optional[float]
+    longitude: Optional[float]
+
+    @property
+    def located(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
+
+class AmbulanceSpatialIndex:
+    """Grille régulière (lat/lon) des ambulances, partitionnée par statut.
+
+    La recherche des k plus proches parcourt les anneaux de cellules autour du point
+    et s'arrête dès que la borne inférieure de distance de l'anneau suivant dépasse
+    le k-ième candidat : le coût dépend de la densité locale, pas de la taille de la flotte.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.02):
+        self.cell_size_deg = cell_size_deg
+        self._lock = threading.Lock()
+        self._entries: Dict[int, IndexedAmbulance] = {}
+        self._cells: Dict[AmbulanceStatus, Dict[Cell, Set[int]]] = {}
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        return (floor(latitude / self.cell_size_deg), floor(longitude / self.cell_size_deg))
+
+    def _unlink(self, entry: IndexedAmbulance) -> None:
+        if not entry.located:
+            return
+        cells = self._cells.get(entry.status, {})
+        cell = self._cell(entry.latitude, entry.longitude)
+        members = cells.get(cell)
+        if members is not None:
+            members.discard(entry.id)
+            if not members:
+                del cells[cell]
+
+    def _link(self, entry: IndexedAmbulance) -> None:
+        if not entry.located:
+            return
+        cells = self._cells.setdefault(entry.status, {})
+        cells.setdefault(self._cell(entry.latitude, entry.longitude), set()).add(entry.id)
+
+    def upsert(self, ambulance_id: int, plate_number: str, status: AmbulanceStatus,
+               latitude: Optional[float], longitude: Optional[float]) -> None:
+        entry = IndexedAmbulance(ambulance_id, plate_number, AmbulanceStatus(status), latitude, longitude)
+        with self._lock:
+            previous = self._entries.get(ambulance_id)
+            if previous is not None:
+                self._unlink(previous)
+            self._entries[ambulance_id] = entry
+            self._link(entry)
+
+    def upsert_ambulance(self, ambulance: Ambulance) -> None:
+        self.upsert(ambulance.id, ambulance.plate_number, ambulance.status,
+                    ambulance.latitude, ambulance.longitude)
+
+    def update_position(self, ambulance_id: int, latitude: float, longitude: float) -> None:
+        """Déplacer une ambulance déjà indexée (sans relire son statut)"""
+        with self._lock:
+            previous = self._entries.get(ambulance_id)
+            if previous is None:
+                return
+            self._unlink(previous)
+            entry = IndexedAmbulance(previous.id, previous.plate_number, previous.status, latitude, longitude)
+            self._entries[ambulance_id] = entry
+            self._link(entry)
+
+    def remove(self, ambulance_id: int) -> None:
+        with self._lock:
+            previous = self._entries.pop(ambulance_id, None)
+            if previous is not None:
+                self._unlink(previous)
+
+    def rebuild(self, rows) -> None:
+        """Reconstruire l'index à partir de tuples (id, plate_number, status, latitude, longitude)"""
+        entries: Dict[int, IndexedAmbulance] = {}
+        for row in rows:
+            entry = IndexedAmbulance(row[0], row[1], AmbulanceStatus(row[2]), row[3], row[4])
+            entries[entry.id] = entry
+        with self._lock:
+            self._entries = entries
+            self._cells = {}
+            for entry in entries.values():
+                self._link(entry)
+
+    def get(self, ambulance_id: int) -> Optional[IndexedAmbulance]:
+        return self._entries.get(ambulance_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _ring_lower_bound_km(self, latitude: float, ring: int) -> float:
+        """Distance minimale d'un point situé au-delà de l'anneau `ring`"""
+        span_deg = ring * self.cell_size_deg
+        max_lat = min(90.0, abs(latitude) + span_deg)
+        lat_bound = span_deg * KM_PER_DEGREE
+        lon_bound = 2 * EARTH_RADIUS_KM * asin(cos(radians(max_lat)) * sin(radians(min(span_deg, 180.0)) / 2))
+        return min(lat_bound, lon_bound)
+
+    def nearest(self, latitude: float, longitude: float, k: int = 5,
+                status: AmbulanceStatus = AmbulanceStatus.DISPONIBLE,
+                max_distance_km: Optional[float] = None) -> List[Tuple[IndexedAmbulance, float]]:
+        with self._lock:
+            cells = self._cells.get(status, {})
+            total = sum(len(members) for members in cells.values())
+            if total == 0 or k <= 0:
+                return []
+
+            ci, cj = self._cell(latitude, longitude)
+            best: List[Tuple[float, int]] = []  # tas max (distances négatives) des k meilleurs
+            seen = 0
+            ring = 0
+            while seen < total:
+                # Anneau plus large que la grille occupée : balayer directement les cellules restantes
+                if 8 * ring > len(cells):
+                    candidates = (
+                        ambulance_id
+                        for (i, j), members in cells.items()
+                        if max(abs(i - ci), abs(j - cj)) >= ring
+                        for ambulance_id in members
+                    )
+                    ring_cells = None
+                else:
+                    ring_cells = self._ring_cells(ci, cj, ring)
+                    candidates = (
+                        ambulance_id
+                        for cell in ring_cells if cell in cells
+                        for ambulance_id in cells[cell]
+                    )
+
+                for ambulance_id in candidates:
+                    seen += 1
+                    entry = self._entries[ambulance_id]
+                    distance = haversine_km(latitude, longitude, entry.latitude, entry.longitude)
+                    if max_distance_km is not None and distance > max_distance_km:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, ambulance_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, ambulance_id))
+
+                if ring_cells is None:
+                    break
+                bound = self._ring_lower_bound_km(latitude, ring)
+                if len(best) == k and bound >= -best[0][0]:
+                    break
+                if max_distance_km is not None and bound > max_distance_km:
+                    break
+                ring += 1
+
+            return [(self._entries[ambulance_id], -distance) for distance, ambulance_id in sorted(best, reverse=True)]
+
+    @staticmethod
+    def _ring_cells(ci: int, cj: int, ring: int) -> List[Cell]:
+        if ring == 0:
+            return [(ci, cj)]
+        cells = [(ci + di, cj + dj) for di in (-ring, ring) for dj in range(-ring, ring + 1)]
+        cells.extend((ci + di, cj + dj) for dj in (-ring, ring) for di in range(-ring + 1, ring))
+        return cells
+
+ambulance_index = AmbulanceSpatialIndex(cell_size_deg=settings.SPATIAL_INDEX_CELL_DEG)
+
+def refresh_ambulance_index() -> None:
+    """Recharger l'index depuis la base (démarrage et resynchronisation entre workers)"""
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            Ambulance.id, Ambulance.plate_number, Ambulance.status, Ambulance.latitude, Ambulance.longitude
+        ).all()
+    finally:
+        db.close()
+    ambulance_index.rebuild(rows)
+    # Les positions pas encore écrites en base (write-behind) sont plus récentes que la base
+    for ambulance_id, position in position_store.pending().items():
+        ambulance_index.update_position(ambulance_id, position.latitude, position.longitude)
+    logger.debug("Index spatial rechargé : %d ambulances", len(rows))
@@ -0,0 +1,123 @@
+import logging
+import random
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+# Journal séparé pour pouvoir le router vers son propre fichier
+slow_logger = logging.getLogger(__name__ + ".slow")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"(\(\?\+?\))(?:\s*,\s*\(\?\+?\))+")
+_SPACES = re.compile(r"\s+")
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Forme d'une requête : littéraux et paramètres remplacés par ?, listes IN et VALUES repliées.
+
+    Deux requêtes de même forme ne diffèrent que par leurs valeurs : la même forme répétée
+    dans une requête HTTP signale un chargement ligne à ligne (N+1).
+    """
+    shape = _STRING.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _LIST.sub("(?+)", shape)
+    shape = _ROWS.sub(r"\1+", shape)
+    return _SPACES.sub(" ", shape).strip()
+
+def redact(parameters) -> object:
+    """Paramètres liés sans leurs valeurs : seuls les noms et les types sont journalisés"""
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany : une entrée par ligne
+            return f"<{len(parameters)} lignes>"
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+def log_slow_query(label: str, statement: str, parameters, elapsed: float, route: Optional[str]) -> None:
+    """Journal échantillonné des requêtes d'au moins SLOW_QUERY_MS, sans les valeurs des paramètres"""
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS and random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+        slow_logger.warning("Requête lente (%s, %.1f ms) sur %s : %s ; paramètres %s", label, elapsed * 1000,
+                            route or "-", fingerprint(statement), redact(parameters))
+
+def timing_headers(stats, total_seconds: float) -> List[tuple]:
+    """En-têtes Server-Timing et X-DB-* d'une réponse, d'après les requêtes émises jusque-là"""
+    headers = [
+        (b"server-timing", (f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                            f'total;dur={total_seconds * 1000:.2f}').encode("latin-1")),
+        (b"x-db-queries", str(stats.queries).encode("latin-1")),
+    ]
+    repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+    if repeated:
+        headers.append((b"x-db-n-plus-one", f"{len(repeated)};max={repeated[0][1]}".encode("latin-1")))
+    return headers
+
+class SQLProfiler:
+    """Agrégats par route des profils de requêtes : où partent les allers-retours vers la base.
+
+    Les routes sont les gabarits FastAPI (nombre borné) ; pour chacune, seules les formes
+    répétées les plus coûteuses sont conservées. Les compteurs sont propres au processus.
+    """
+
+    TOP_SHAPES = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, dict] = {}
+
+    def record(self, method: str, route: str, stats) -> List[tuple]:
+        """Ajouter le profil d'une requête HTTP terminée (metrics.RequestStats) ; alerte si N+1"""
+        repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+        key = f"{method} {route}"
+        with self._lock:
+            entry = self._routes.get(key)
+            if entry is None:
+                entry = self._routes[key] = {"requests": 0, "queries": 0, "max_queries": 0, "db_ms": 0.0,
+                                             "n_plus_one_requests": 0, "repeated_shapes": {}}
+            entry["requests"] += 1
+            entry["queries"] += stats.queries
+            entry["max_queries"] = max(entry["max_queries"], stats.queries)
+            entry["db_ms"] += stats.db_seconds * 1000
+            if repeated:
+                entry["n_plus_one_requests"] += 1
+                shapes = entry["repeated_shapes"]
+                for shape, count, seconds in repeated:
+                    shapes[shape] = max(shapes.get(shape, 0), count)
+                if len(shapes) > self.TOP_SHAPES:
+                    entry["repeated_shapes"] = dict(sorted(shapes.items(), key=lambda item: -item[1])[:self.TOP_SHAPES])
+        if repeated:
+            shape, count, seconds = repeated[0]
+            logger.warning("N+1 probable sur %s %s : %d × %s (%.1f ms, %d requêtes au total)",
+                           method, route, count, shape, seconds * 1000, stats.queries)
+        return repeated
+
+    def metrics(self) -> dict:
+        with self._lock:
+            snapshot = {key: dict(stats, repeated_shapes=dict(stats["repeated_shapes"])) for key, stats in self._routes.items()}
+        result = {}
+        # Les routes les plus bavardes en premier
+        for key, stats in sorted(snapshot.items(), key=lambda item: -item[1]["queries"] / item[1]["requests"]):
+            result[key] = {
+                "requests": stats["requests"],
+                "avg_queries": round(stats["queries"] / stats["requests"], 2),
+                "max_queries": stats["max_queries"],
+                "avg_db_ms": round(stats["db_ms"] / stats["requests"], 3),
+                "n_plus_one_requests": stats["n_plus_one_requests"],
+                "repeated_shapes": [{"shape": shape, "max_count": count} for shape, count in stats["repeated_shapes"].items()],
+            }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+sql_profiler = SQLProfiler()
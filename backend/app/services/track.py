@@ -0,0 +1,74 @@
+from datetime import datetime
+from math import ceil, cos, radians
+from typing import List, Optional, Sequence, Tuple
+from app.services.geo import KM_PER_DEGREE
+
+TrackPoint = Tuple[datetime, float, float]  # (recorded_at, latitude, longitude)
+
+def bucket_by_time(points: Sequence[TrackPoint], resolution_seconds: int) -> List[TrackPoint]:
+    """Garder un point par intervalle de `resolution_seconds` (le dernier), plus le premier point du tracé"""
+    if len(points) <= 2:
+        return list(points)
+    origin = points[0][0]
+    result = [points[0]]
+    current_bucket = 0
+    last = None
+    for point in points[1:]:
+        bucket = int((point[0] - origin).total_seconds() // resolution_seconds)
+        if bucket != current_bucket and last is not None:
+            result.append(last)
+        current_bucket = bucket
+        last = point
+    result.append(last)
+    return result
+
+def douglas_peucker(points: Sequence[TrackPoint], tolerance_m: float) -> List[TrackPoint]:
+    """Simplification Douglas–Peucker (itérative) avec une tolérance en mètres"""
+    if len(points) <= 2:
+        return list(points)
+
+    # Projection équirectangulaire locale, suffisante à l'échelle d'un trajet
+    scale_x = cos(radians(points[0][1])) * KM_PER_DEGREE * 1000
+    scale_y = KM_PER_DEGREE * 1000
+    xy = [(p[2] * scale_x, p[1] * scale_y) for p in points]
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = xy[first]
+        bx, by = xy[last]
+        dx, dy = bx - ax, by - ay
+        norm = dx * dx + dy * dy
+        max_distance, index = 0.0, None
+        for i in range(first + 1, last):
+            px, py = xy[i]
+            if norm == 0:
+                distance = ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+            else:
+                t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / norm))
+                distance = ((px - ax - t * dx) ** 2 + (py - ay - t * dy) ** 2) ** 0.5
+            if distance > max_distance:
+                max_distance, index = distance, i
+        if index is not None and max_distance > tolerance_m:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+def downsample_track(points: Sequence[TrackPoint], resolution_seconds: Optional[int] = None,
+                     tolerance_m: Optional[float] = None, max_points: int = 1000) -> Tuple[List[TrackPoint], Optional[int]]:
+    """Réduire un tracé ; sans paramètre explicite, le pas de temps est choisi pour tenir dans `max_points`.
+
+    Retourne les points conservés et le pas de temps effectivement appliqué.
+    """
+    result = list(points)
+    if resolution_seconds is None and tolerance_m is None and len(result) > max_points:
+        span = (result[-1][0] - result[0][0]).total_seconds()
+        resolution_seconds = max(1, ceil(span / max(1, max_points - 2)))
+    if resolution_seconds:
+        result = bucket_by_time(result, resolution_seconds)
+    if tolerance_m:
+        result = douglas_peucker(result, tolerance_m)
+    return result, resolution_seconds
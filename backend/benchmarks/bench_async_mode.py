@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrence : mode synchrone (threadpool) vs mode async (AsyncSession)
+
+Lance un serveur uvicorn par mode sur la même base, puis mesure les requêtes/seconde
+et la latence p50/p99 sur une route authentifiée pour 50 à 500 clients concurrents.
+
+Dépendances supplémentaires : httpx, aiosqlite (pour la base SQLite par défaut)
+
+Exemple :
+    python benchmarks/bench_async_mode.py --concurrency 50 100 250 500 --duration 10
+    python benchmarks/bench_async_mode.py --database-url mysql+pymysql://root:@localhost:3306/ambulance_bench
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def async_url_for(database_url: str) -> str:
+    """Déduire l'URL du driver async correspondant à l'URL synchrone"""
+    if database_url.startswith("sqlite://"):
+        return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if database_url.startswith("mysql+pymysql://"):
+        return database_url.replace("mysql+pymysql://", "mysql+aiomysql://", 1)
+    raise ValueError(f"Impossible de déduire l'URL async pour {database_url}, utilisez --async-database-url")
+
+def seed_database(env: dict, ambulances: int) -> str:
+    """Créer le schéma, un admin et une flotte, et retourner un token d'accès"""
+    script = f"""
+import sys
+sys.path.insert(0, {BACKEND_DIR!r})
+from app.database.base import SessionLocal, engine, Base
+from app.models import user, ambulance, hospital, personnel, mission, maintenance, location
+from app.models.user import User, UserRole
+from app.models.ambulance import Ambulance
+from app.core.security import create_access_token, get_password_hash
+Base.metadata.drop_all(bind=engine)
+Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+db.add(User(username="bench", email="bench@ambulance.com", hashed_password=get_password_hash("bench"),
+            first_name="Bench", last_name="Mark", role=UserRole.ADMIN, is_active=True))
+db.add_all([Ambulance(plate_number=f"BENCH-{{i:05d}}", model="Bench", capacity=2,
+                      latitude=48.85 + i * 1e-4, longitude=2.35 + i * 1e-4) for i in range({ambulances})])
+db.commit()
+db.close()
+print(create_access_token(subject="bench"))
+"""
+    output = subprocess.run([sys.executable, "-c", script], env=env, check=True, capture_output=True, text=True)
+    return output.stdout.strip().splitlines()[-1]
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Le serveur n'a pas démarré à temps")
+
+async def run_load(url: str, token: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(limits=limits, headers=headers, timeout=60.0) as client:
+        deadline = time.monotonic() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    }
+
+def benchmark_mode(mode: str, args, env: dict, token: str, port: int) -> list:
+    server_env = dict(env, DB_ASYNC_MODE="true" if mode == "async" else "false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=server_env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        url = f"{base_url}{args.path}"
+        results = []
+        for concurrency in args.concurrency:
+            stats = asyncio.run(run_load(url, token, concurrency, args.duration))
+            stats.update(mode=mode, concurrency=concurrency)
+            results.append(stats)
+            print(f"{mode:>5} c={concurrency:<4} {stats['rps']:9.1f} req/s  "
+                  f"p50={stats['p50_ms']:8.1f} ms  p99={stats['p99_ms']:8.1f} ms  erreurs={stats['errors']}")
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="URL synchrone (défaut : SQLite temporaire)")
+    parser.add_argument("--async-database-url", default=None)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 100, 250, 500])
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée de chaque palier (secondes)")
+    parser.add_argument("--path", default="/api/v1/ambulances/?limit=20")
+    parser.add_argument("--ambulances", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        ASYNC_DATABASE_URL=args.async_database_url or async_url_for(database_url),
+        DEBUG="false",
+    )
+    token = seed_database(env, args.ambulances)
+
+    results = []
+    for mode in ("sync", "async"):
+        results.extend(benchmark_mode(mode, args, env, token, args.port))
+
+    print("\nconcurrence   sync req/s   async req/s   gain")
+    for concurrency in args.concurrency:
+        sync_rps = next(r["rps"] for r in results if r["mode"] == "sync" and r["concurrency"] == concurrency)
+        async_rps = next(r["rps"] for r in results if r["mode"] == "async" and r["concurrency"] == concurrency)
+        print(f"{concurrency:>11}   {sync_rps:10.1f}   {async_rps:11.1f}   x{async_rps / sync_rps:.2f}")
+
+if __name__ == "__main__":
+    main()
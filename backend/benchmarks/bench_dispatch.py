@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark du dispatch groupé : matrice de coûts + affectation optimale
+
+Pour chaque taille (missions x ambulances), tire des positions sur une agglomération et des
+priorités réalistes, puis mesure la construction de la matrice (haversine vectorisé) et la
+résolution. Le coût total est comparé à l'heuristique gloutonne (chaque mission, par ordre de
+priorité, prend l'ambulance libre la plus proche). Avec --end-to-end, mesure aussi
+crud.mission.dispatch_pending_missions sur une base SQLite temporaire (lecture, calcul,
+écritures et agrégats dans une transaction).
+
+Exemple :
+    python benchmarks/bench_dispatch.py --sizes 100x100 1000x1000 1000x1500 --end-to-end
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.models.mission import MissionPriority
+from app.services.dispatch import (
+    PRIORITY_RANK, PRIORITY_WEIGHTS, CandidateAmbulance, PendingMission, haversine_matrix, plan_dispatch, solve_assignment
+)
+
+CENTER = (48.8566, 2.3522)
+SPREAD_DEG = 0.15
+PRIORITY_MIX = [(MissionPriority.CRITIQUE, 0.1), (MissionPriority.URGENTE, 0.25), (MissionPriority.NORMALE, 0.5), (MissionPriority.FAIBLE, 0.15)]
+NOW = datetime(2026, 3, 1)
+
+def random_point(rng: random.Random) -> tuple:
+    return CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG), CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG)
+
+def scenario(missions: int, ambulances: int, rng: random.Random) -> tuple:
+    priorities, weights = zip(*PRIORITY_MIX)
+    pending = [
+        PendingMission(i, rng.choices(priorities, weights)[0], NOW - timedelta(seconds=rng.randint(0, 3600)), *random_point(rng))
+        for i in range(1, missions + 1)
+    ]
+    candidates = [CandidateAmbulance(i, *random_point(rng)) for i in range(1, ambulances + 1)]
+    return pending, candidates
+
+def greedy_cost(missions, ambulances) -> float:
+    ordered = sorted(missions, key=lambda m: (PRIORITY_RANK[m.priority], m.created_at))[:len(ambulances)]
+    distances = haversine_matrix(
+        np.array([m.latitude for m in ordered]), np.array([m.longitude for m in ordered]),
+        np.array([a.latitude for a in ambulances]), np.array([a.longitude for a in ambulances]),
+    )
+    taken = np.zeros(len(ambulances), dtype=bool)
+    total = 0.0
+    for row, mission in enumerate(ordered):
+        column = int(np.where(taken, np.inf, distances[row]).argmin())
+        taken[column] = True
+        total += distances[row, column] * PRIORITY_WEIGHTS[mission.priority]
+    return total
+
+def bench_planner(missions: int, ambulances: int, rng: random.Random, repeat: int) -> None:
+    pending, candidates = scenario(missions, ambulances, rng)
+    served = sorted(pending, key=lambda m: (PRIORITY_RANK[m.priority], m.created_at))[:len(candidates)]
+    matrix_ms = solve_ms = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cost = haversine_matrix(
+            np.array([m.latitude for m in served]), np.array([m.longitude for m in served]),
+            np.array([a.latitude for a in candidates]), np.array([a.longitude for a in candidates]),
+        ) * np.array([PRIORITY_WEIGHTS[m.priority] for m in served])[:, None]
+        built = time.perf_counter()
+        solve_assignment(cost)
+        matrix_ms += (built - start) * 1000
+        solve_ms += (time.perf_counter() - built) * 1000
+    start = time.perf_counter()
+    assignments, _ = plan_dispatch(pending, candidates)
+    plan_ms = (time.perf_counter() - start) * 1000
+    optimal = sum(a.weighted_cost for a in assignments)
+    greedy = greedy_cost(pending, candidates)
+    print(f"{missions:>5} x {ambulances:<5} matrice={matrix_ms / repeat:7.1f} ms  affectation={solve_ms / repeat:7.1f} ms  "
+          f"plan_dispatch={plan_ms:7.1f} ms  coût optimal={optimal:9.1f}  glouton={greedy:9.1f} (+{(greedy / optimal - 1) * 100:.1f} %)")
+
+def bench_end_to_end(missions: int, ambulances: int, rng: random.Random) -> None:
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import sessionmaker
+    from app.database.base import Base
+    from app.crud import mission as crud_mission
+    from app.models import analytics, hospital, maintenance, personnel, user, location  # noqa: F401
+    from app.models.ambulance import Ambulance
+    from app.models.mission import Mission
+
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    pending, candidates = scenario(missions, ambulances, rng)
+    with session_factory() as db:
+        db.execute(insert(Ambulance), [
+            dict(plate_number=f"AMB-{a.id}", model="-", latitude=a.latitude, longitude=a.longitude) for a in candidates
+        ])
+        db.execute(insert(Mission), [
+            dict(patient_name="-", patient_phone="-", patient_condition="-", priority=m.priority, pickup_address="-",
+                 pickup_latitude=m.latitude, pickup_longitude=m.longitude, hospital_id=1, created_at=m.created_at)
+            for m in pending
+        ])
+        db.commit()
+    with session_factory() as db:
+        start = time.perf_counter()
+        result = crud_mission.dispatch_pending_missions(db)
+        total_ms = (time.perf_counter() - start) * 1000
+    print(f"{missions:>5} x {ambulances:<5} dispatch_pending_missions (SQLite) = {total_ms:7.1f} ms  "
+          f"dont calcul {result['solve_ms']:.1f} ms, {len(result['assignments'])} missions affectées")
+    engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["100x100", "500x500", "1000x1000", "1000x1500", "1500x1000", "200x1000"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-to-end", action="store_true")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(value) for value in size.lower().split("x")) for size in args.sizes]
+    for missions, ambulances in sizes:
+        bench_planner(missions, ambulances, random.Random(args.seed), args.repeat)
+    if args.end_to_end:
+        for missions, ambulances in sizes:
+            bench_end_to_end(missions, ambulances, random.Random(args.seed))
+
+if __name__ == "__main__":
+    main()
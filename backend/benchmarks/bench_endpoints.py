@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks des routes de l'API (app/api/v1/endpoints) sur une base SQLite jetable
+
+Démarre `app.main.app` en processus (TestClient, lifespan compris) avec `get_db` surchargé vers
+une base SQLite temporaire, la peuple pour chaque volume demandé, puis mesure pour chaque route
+(connexion, listes, détails, position, affectation, changement de statut...) :
+- la latence p50 / p90 / p99 / moyenne et le débit en série ;
+- les allocations Python par requête (tracemalloc : pic et mémoire retenue), dans une passe séparée.
+
+Les résultats peuvent être écrits dans un fichier JSON de référence (--output) puis comparés à
+une exécution ultérieure (--compare) : une route est en régression si sa p50, sa p99 ou son pic
+d'allocation dépasse la référence de plus de --threshold (code de sortie 1).
+
+Exemples :
+    python benchmarks/bench_endpoints.py --sizes 1000 10000 --output benchmarks/baseline.json
+    python benchmarks/bench_endpoints.py --sizes 1000 10000 --compare benchmarks/baseline.json --threshold 0.15
+    python benchmarks/bench_endpoints.py --cases missions --requests 500
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+# La base doit être choisie avant l'import de l'application (moteur, services du lifespan)
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ.setdefault("DB_ASYNC_MODE", "false")
+os.environ.setdefault("DEBUG", "false")
+
+import sqlalchemy
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.security import create_access_token, get_password_hash, principal_claims
+from app.database.base import Base, get_db
+from app.main import app
+from app.models.ambulance import Ambulance, AmbulanceStatus
+from app.models.hospital import Hospital
+from app.models.mission import Mission, MissionPriority, MissionStatus
+from app.models.user import User, UserRole
+from app.services.read_cache import read_cache
+
+PASSWORD = "bench"
+NOW = datetime.utcnow().replace(microsecond=0)
+
+# (nom, méthode, chemin, corps ou paramètres, facteur de répétitions) ; {ambulance} et {mission} sont
+# tirés au hasard à chaque appel. La connexion (bcrypt) est répétée moins souvent.
+CASES = [
+    ("auth.login", "POST", "/auth/login", "login", 0.1),
+    ("users.me", "GET", "/users/me", None, 1.0),
+    ("ambulances.list", "GET", "/ambulances/?limit=100", None, 1.0),
+    ("ambulances.page", "GET", "/ambulances/page?limit=100", None, 1.0),
+    ("ambulances.available", "GET", "/ambulances/available", None, 0.5),
+    ("ambulances.nearest", "GET", "/ambulances/nearest?lat=48.85&lon=2.35&k=10", None, 1.0),
+    ("ambulances.detail", "GET", "/ambulances/{ambulance}", None, 1.0),
+    ("ambulances.location", "PUT", "/ambulances/{ambulance}/location", "location", 1.0),
+    ("hospitals.list", "GET", "/hospitals/", None, 1.0),
+    ("hospitals.recommend", "GET", "/hospitals/recommend?lat=48.85&lon=2.35&condition=cardiaque", None, 1.0),
+    ("missions.list", "GET", "/missions/?limit=100", None, 1.0),
+    ("missions.list_summary", "GET", "/missions/?limit=100&fields=summary", None, 1.0),
+    ("missions.page", "GET", "/missions/page?limit=100", None, 1.0),
+    ("missions.active", "GET", "/missions/active?limit=100", None, 0.5),
+    ("missions.detail", "GET", "/missions/{mission}", None, 1.0),
+    ("missions.detail_expanded", "GET", "/missions/{mission}?expand=ambulance,hospital", None, 1.0),
+    ("missions.assign", "POST", "/missions/{mission}/assign", "assignment", 1.0),
+    ("missions.status", "PUT", "/missions/{mission}/status", "status", 1.0),
+    ("analytics.counts", "GET", "/analytics/missions/counts", None, 1.0),
+]
+
+def seed(engine, size: int, rng: random.Random) -> dict:
+    """`size` missions, size/10 ambulances (au moins 50), 20 hôpitaux et un administrateur"""
+    ambulances = max(50, size // 10)
+    priorities, statuses = list(MissionPriority), list(MissionStatus)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [dict(
+            id=1, username="bench", email="bench@ambulance.com", hashed_password=get_password_hash(PASSWORD),
+            first_name="Bench", last_name="Mark", role=UserRole.ADMIN, is_active=True
+        )])
+        conn.execute(insert(Hospital), [
+            dict(id=i, name=f"Hôpital {i}", address="-", phone="-", latitude=48.85 + rng.uniform(-0.1, 0.1),
+                 longitude=2.35 + rng.uniform(-0.1, 0.1), emergency_beds=rng.randint(0, 30), icu_beds=rng.randint(0, 10),
+                 general_beds=rng.randint(50, 400), specialties=["Cardiologie", "Traumatologie"], is_active=True)
+            for i in range(1, 21)
+        ])
+        conn.execute(insert(Ambulance), [
+            dict(id=i, plate_number=f"BENCH-{i:06d}", model="Bench", capacity=2, status=rng.choice(list(AmbulanceStatus)),
+                 latitude=48.85 + rng.uniform(-0.1, 0.1), longitude=2.35 + rng.uniform(-0.1, 0.1),
+                 equipment=["Défibrillateur"], location_updated_at=NOW)
+            for i in range(1, ambulances + 1)
+        ])
+        conn.execute(insert(Mission), [
+            dict(id=i, patient_name=f"Patient {i}", patient_phone="+33100000000", patient_age=rng.randint(1, 95),
+                 patient_condition="Douleur thoracique", symptoms=["douleur thoracique"], priority=rng.choice(priorities),
+                 status=rng.choice(statuses), pickup_address=f"{i} rue de la Paix, Paris",
+                 pickup_latitude=48.85 + rng.uniform(-0.1, 0.1), pickup_longitude=2.35 + rng.uniform(-0.1, 0.1),
+                 hospital_id=rng.randint(1, 20), ambulance_id=rng.randint(1, ambulances), assigned_personnel=[],
+                 created_at=NOW - timedelta(minutes=size - i))
+            for i in range(1, size + 1)
+        ])
+    return {"missions": size, "ambulances": ambulances}
+
+def request_kwargs(kind, rng: random.Random, counts: dict):
+    if kind == "login":
+        return {"data": {"username": "bench", "password": PASSWORD}}
+    if kind == "location":
+        return {"json": {"latitude": 48.85 + rng.uniform(-0.1, 0.1), "longitude": 2.35 + rng.uniform(-0.1, 0.1)}}
+    if kind == "assignment":
+        return {"json": {"ambulance_id": rng.randint(1, counts["ambulances"]), "personnel_ids": []}}
+    if kind == "status":
+        return {"params": {"status": rng.choice([MissionStatus.ASSIGNEE.value, MissionStatus.EN_COURS.value])}}
+    return {}
+
+def percentile(sorted_values, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def measure(client: TestClient, case, counts: dict, args, rng: random.Random) -> dict:
+    name, method, path, kind, factor = case
+    requests = max(10, int(args.requests * factor))
+
+    def call():
+        url = settings.API_V1_STR + path.format(ambulance=rng.randint(1, counts["ambulances"]),
+                                                  mission=rng.randint(1, counts["missions"]))
+        response = client.request(method, url, **request_kwargs(kind, rng, counts))
+        if response.status_code != 200:
+            raise SystemExit(f"{name} : HTTP {response.status_code} {response.text[:200]}")
+
+    for _ in range(max(1, int(args.warmup * factor))):
+        call()
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # Passe séparée : tracemalloc ralentit fortement l'exécution
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(max(3, requests // 10)):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            call()
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p90_ms": round(percentile(latencies, 0.90), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "rps": round(1000 / statistics.fmean(latencies), 1),
+        "alloc_peak_kib": round(statistics.median(peaks) / 1024, 1),
+        "alloc_retained_kib": round(statistics.median(retained) / 1024, 1),
+    }
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnue"
+
+def run(args) -> dict:
+    engine = create_engine(os.environ["DATABASE_URL"], connect_args={"check_same_thread": False})
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    if not args.read_cache:
+        # Sans cache de lecture, chaque appel mesure la lecture et la sérialisation
+        read_cache.ttl = 0
+    cases = [case for case in CASES if not args.cases or any(pattern in case[0] for pattern in args.cases)]
+    results = {}
+    try:
+        for size in args.sizes:
+            rng = random.Random(args.seed)
+            counts = seed(engine, size, rng)
+            admin = User(id=1, username="bench", role=UserRole.ADMIN, is_active=True)
+            token = create_access_token(subject="bench", claims=principal_claims(admin))
+            # Le lifespan (index spatial, file des missions, pool bcrypt) repart de la base fraîchement peuplée
+            with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as client:
+                for case in cases:
+                    stats = measure(client, case, counts, args, rng)
+                    results[f"{size}/{case[0]}"] = stats
+                    print(f"missions={size:<7} {case[0]:<26} p50={stats['p50_ms']:8.2f} ms  p99={stats['p99_ms']:8.2f} ms  "
+                          f"{stats['rps']:8.1f} req/s  alloc={stats['alloc_peak_kib']:8.1f} KiB")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> int:
+    """Afficher les écarts à la référence et retourner le nombre de régressions"""
+    regressions = 0
+    print(f"\nComparaison avec la référence {baseline['meta'].get('revision')} (seuil +{threshold:.0%})")
+    for key, stats in results.items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            print(f"  [nouveau] {key}")
+            continue
+        flagged = []
+        for metric, floor in (("p50_ms", min_delta_ms), ("p99_ms", min_delta_ms), ("alloc_peak_kib", 1.0)):
+            before, after = reference[metric], stats[metric]
+            # Un écart absolu minimal évite de signaler la gigue des routes de quelques dixièmes de ms
+            if after > before * (1 + threshold) and after - before > floor:
+                flagged.append(f"{metric} {before} -> {after} (+{(after / before - 1) if before else 1:.0%})")
+        regressions += bool(flagged)
+        ratio = stats["p50_ms"] / reference["p50_ms"] if reference["p50_ms"] else 1.0
+        label = "RÉGRESSION" if flagged else "ok"
+        print(f"  [{label:>10}] {key:<36} p50 x{ratio:4.2f}  " + "; ".join(flagged))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Nombre de missions en base")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes mesurées par route")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--cases", nargs="*", help="Ne mesurer que les routes dont le nom contient l'un de ces motifs")
+    parser.add_argument("--read-cache", action="store_true", help="Laisser le cache de lecture actif")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Écrire les résultats (JSON) dans ce fichier")
+    parser.add_argument("--compare", help="Fichier de référence produit par --output")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Dégradation relative tolérée (0.15 = 15 %%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.2, help="Écart absolu minimal pour signaler une latence")
+    args = parser.parse_args()
+
+    results = run(args)
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "date": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "machine": platform.machine(),
+            "sizes": args.sizes,
+            "requests": args.requests,
+            "read_cache": args.read_cache,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+        print(f"\nRésultats écrits dans {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{regressions} route(s) en régression")
+            sys.exit(1)
+        print("\nAucune régression au-delà du seuil")
+
+if __name__ == "__main__":
+    main()
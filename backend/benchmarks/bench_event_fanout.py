@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la diffusion des événements temps réel (/events/stream, /events/ws)
+
+Mesure le coût de publication d'un lot de positions (indépendant du nombre d'abonnés) puis
+le coût de lecture filtrée par abonné (sans filtre ou avec filtre bbox), qui s'exécute dans
+la tâche de chaque connexion, ainsi que la fusion des positions d'une même ambulance.
+
+Exemple :
+    python benchmarks/bench_event_fanout.py --subscribers 1000 5000 --events 1000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.events import EventBus, EventFilter, position_event
+
+async def run(subscribers: int, events: int, fleet: int, rng: random.Random) -> None:
+    bus = EventBus(backlog=20000, max_subscribers=subscribers)
+    bus.bind(asyncio.get_running_loop())
+    subs = []
+    for i in range(subscribers):
+        # Un abonné sur deux ne suit qu'une zone d'environ 10 km autour d'un point de Paris
+        if i % 2:
+            lat, lon = rng.gauss(48.8566, 0.2), rng.gauss(2.3522, 0.3)
+            subs.append(bus.subscribe(EventFilter(bbox=(lat - 0.05, lon - 0.07, lat + 0.05, lon + 0.07))))
+        else:
+            subs.append(bus.subscribe(EventFilter()))
+
+    now = datetime.utcnow()
+    batch = [
+        position_event(rng.randrange(fleet), rng.gauss(48.8566, 0.2), rng.gauss(2.3522, 0.3), now)
+        for _ in range(events)
+    ]
+    start = time.perf_counter()
+    bus.publish(*batch)
+    await asyncio.sleep(0)
+    dispatch_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    delivered = 0
+    slowest = 0.0
+    for subscription in subs:
+        started = time.perf_counter()
+        delivered += len(subscription.drain())
+        slowest = max(slowest, time.perf_counter() - started)
+    drain_ms = (time.perf_counter() - start) * 1000
+
+    stats = bus.metrics()
+    print(f"abonnés={subscribers:>5}  événements={events:>5}  publication={dispatch_ms:6.2f} ms  "
+          f"lecture totale={drain_ms:8.1f} ms  lecture max/abonné={slowest * 1000:6.3f} ms  "
+          f"remis={delivered}  fusionnés={stats['conflated']}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--fleet", type=int, default=300, help="Nombre d'ambulances distinctes dans le lot")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for subscribers in args.subscribers:
+        asyncio.run(run(subscribers, args.events, args.fleet, rng))
+
+if __name__ == "__main__":
+    main()
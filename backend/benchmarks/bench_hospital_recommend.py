@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la recommandation d'hôpital : instantané en mémoire vs requête par appel
+
+Pour chaque taille de référentiel (SQLite temporaire), compare HospitalSnapshot.recommend
+(calcul vectoriel sur l'instantané) avec le même classement obtenu en relisant la table
+hospitals à chaque appel. Le coût de reconstruction de l'instantané est aussi mesuré.
+
+Exemple :
+    python benchmarks/bench_hospital_recommend.py --hospitals 50 500 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from app.database.base import Base
+from app.models import analytics, ambulance, maintenance, mission, personnel, user, location  # noqa: F401
+from app.models.hospital import Hospital
+from app.services.hospital_snapshot import HospitalSnapshot
+
+SPECIALTIES = ["Cardiologie", "Neurologie", "Pédiatrie", "Traumatologie", "Orthopédie", "Réanimation", "Maternité", "Brûlés"]
+CENTER = (46.6, 2.4)
+
+def seed(session_factory, hospitals: int, rng: random.Random) -> None:
+    with session_factory() as db:
+        db.execute(insert(Hospital), [
+            dict(name=f"CH {i}", address="-", phone="-", latitude=CENTER[0] + rng.uniform(-4, 4),
+                 longitude=CENTER[1] + rng.uniform(-4, 4), emergency_beds=rng.randint(0, 40), icu_beds=rng.randint(0, 15),
+                 specialties=rng.sample(SPECIALTIES, rng.randint(1, 4)), is_active=rng.random() > 0.05)
+            for i in range(hospitals)
+        ])
+        db.commit()
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hospitals", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for hospitals in args.hospitals:
+        engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        rng = random.Random(args.seed)
+        seed(session_factory, hospitals, rng)
+        query = select(
+            Hospital.id, Hospital.name, Hospital.latitude, Hospital.longitude,
+            Hospital.emergency_beds, Hospital.icu_beds, Hospital.specialties
+        ).filter(Hospital.is_active.is_(True))
+        points = [(CENTER[0] + rng.uniform(-3, 3), CENTER[1] + rng.uniform(-3, 3)) for _ in range(64)]
+
+        with session_factory() as db:
+            snapshot = HospitalSnapshot()
+            rebuild_us = timed(lambda: snapshot.rebuild(db.execute(query).all()), max(1, args.repeat // 50))
+            cached_us = timed(lambda: snapshot.recommend(*rng.choice(points), "cardiaque", None, 5), args.repeat)
+
+            def per_call():
+                # Sans cache : relecture de la table puis classement sur un instantané jetable
+                fresh = HospitalSnapshot()
+                fresh.rebuild(db.execute(query).all())
+                fresh.recommend(*rng.choice(points), "cardiaque", None, 5)
+            uncached_us = timed(per_call, max(1, args.repeat // 10))
+        print(f"hôpitaux={hospitals:>6}  instantané={cached_us:9.1f} µs  requête par appel={uncached_us:10.1f} µs  "
+              f"reconstruction={rebuild_us:10.1f} µs")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la sérialisation des listes de missions : chemin FastAPI vs chemin rapide
+
+Pour chaque volume (SQLite temporaire), mesure la lecture + sérialisation de N missions :
+- fastapi : objets ORM validés par `response_model` (serialize_response) puis JSONResponse ;
+- adaptateur : objets ORM validés par un TypeAdapter précompilé puis dump_json (ReadCache.store) ;
+- rapide : colonnes projetées (MISSION_ROWS) encodées par fast_json.dumps (FAST_JSON_LISTS) ;
+- summary / map : projections nommées de `?fields=`, avec la taille de réponse obtenue.
+Vérifie aussi que les chemins adaptateur et rapide produisent exactement les mêmes octets.
+
+Exemple :
+    python benchmarks/bench_list_serialization.py --rows 100 1000 10000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.database.base import Base
+from app.models import analytics, ambulance, hospital, maintenance, personnel, user, location  # noqa: F401
+from app.models.mission import Mission, MissionPriority, MissionStatus
+from app.schemas.mission import Mission as MissionSchema
+from app.crud.mission import MISSION_FIELDSETS, MISSION_ROWS
+from app.services import fast_json
+
+SYMPTOMS = ["douleur thoracique", "dyspnée", "malaise", "fièvre", "chute", "céphalées"]
+
+def seed(session_factory, rows: int, rng: random.Random) -> None:
+    priorities, statuses = list(MissionPriority), list(MissionStatus)
+    start = datetime(2026, 1, 1)
+    with session_factory() as db:
+        db.execute(insert(Mission), [
+            dict(patient_name=f"Patient {i}", patient_phone="+33100000000", patient_age=rng.randint(1, 95),
+                 patient_condition="Douleur thoracique", priority=rng.choice(priorities), status=rng.choice(statuses),
+                 pickup_address=f"{i} rue de la Paix, Paris", pickup_latitude=48.85 + rng.uniform(-0.1, 0.1),
+                 pickup_longitude=2.35 + rng.uniform(-0.1, 0.1), hospital_id=1, ambulance_id=rng.randint(1, 50),
+                 assigned_personnel=rng.sample(range(1, 200), 2), symptoms=rng.sample(SYMPTOMS, 2),
+                 created_at=start + timedelta(minutes=i), assigned_at=start + timedelta(minutes=i, seconds=90))
+            for i in range(rows)
+        ])
+        db.commit()
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    field = create_response_field(name="Response", type_=List[MissionSchema])
+    adapter = TypeAdapter(List[MissionSchema])
+    print(f"encodeur rapide : {'orjson' if fast_json.orjson is not None else 'json (bibliothèque standard)'}")
+
+    for rows in args.rows:
+        engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        seed(session_factory, rows, random.Random(args.seed))
+        repeat = max(1, args.repeat * 1000 // max(rows, 1000))
+
+        with session_factory() as db:
+            def via_fastapi():
+                missions = db.query(Mission).limit(rows).all()
+                content = asyncio.run(serialize_response(field=field, response_content=missions, is_coroutine=False))
+                body = JSONResponse(content).body
+                db.expunge_all()
+                return body
+
+            def via_adapter():
+                missions = db.query(Mission).limit(rows).all()
+                body = adapter.dump_json(adapter.validate_python(missions, from_attributes=True))
+                db.expunge_all()
+                return body
+
+            def via_rows(projection=MISSION_ROWS):
+                return fast_json.dumps(projection.as_dicts(db.execute(projection.select().limit(rows))))
+
+            identical = via_adapter() == via_rows()
+            fastapi_ms = timed(via_fastapi, repeat)
+            adapter_ms = timed(via_adapter, repeat)
+            rows_ms = timed(via_rows, repeat)
+            sizes = {name: len(via_rows(MISSION_FIELDSETS.resolve(name))) for name in ("", "summary", "map")}
+            summary_ms = timed(lambda: via_rows(MISSION_FIELDSETS.resolve("summary")), repeat)
+            map_ms = timed(lambda: via_rows(MISSION_FIELDSETS.resolve("map")), repeat)
+        print(f"lignes={rows:>6}  fastapi={fastapi_ms:9.2f} ms  adaptateur={adapter_ms:9.2f} ms  "
+              f"rapide={rows_ms:9.2f} ms  gain={fastapi_ms / rows_ms:5.1f}x  octets identiques={identical}")
+        print(f"{'':13}summary={summary_ms:9.2f} ms  map={map_ms:9.2f} ms  "
+              f"taille complet/summary/map={sizes['']}/{sizes['summary']}/{sizes['map']} octets")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark des connexions (POST /auth/login) selon la taille du pool de hachage bcrypt
+
+Pour chaque valeur de PASSWORD_HASH_WORKERS, lance un serveur uvicorn, envoie une rafale
+de connexions concurrentes (relève de garde) et mesure en parallèle la latence d'une route
+de dispatch (GET /ambulances/) pour vérifier qu'elle n'est pas affectée par bcrypt.
+
+Exemple :
+    python benchmarks/bench_login_throughput.py --workers 1 2 4 --logins 200 --concurrency 50
+    python benchmarks/bench_login_throughput.py --workers 4 --executor thread
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_async_mode import BACKEND_DIR, async_url_for, seed_database, wait_until_ready
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+async def login_storm(base_url: str, token: str, logins: int, concurrency: int) -> dict:
+    login_latencies, dispatch_latencies = [], []
+    errors = 0
+    remaining = logins
+    limits = httpx.Limits(max_connections=concurrency + 5)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        async def login_worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                response = await client.post("/api/v1/auth/login", data={"username": "bench", "password": "bench"})
+                login_latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        async def dispatch_probe():
+            headers = {"Authorization": f"Bearer {token}"}
+            while remaining > 0:
+                start = time.perf_counter()
+                await client.get("/api/v1/ambulances/?limit=20", headers=headers)
+                dispatch_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        await asyncio.gather(dispatch_probe(), *(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stats = (await client.get("/api/v1/auth/password-pool/stats", headers={"Authorization": f"Bearer {token}"})).json()
+
+    return {
+        "logins_per_second": len(login_latencies) / elapsed,
+        "login_p50_ms": percentile(login_latencies, 0.5),
+        "login_p99_ms": percentile(login_latencies, 0.99),
+        "dispatch_p50_ms": percentile(dispatch_latencies, 0.5),
+        "dispatch_p99_ms": percentile(dispatch_latencies, 0.99),
+        "errors": errors,
+        "max_queue_depth": stats.get("max_queue_depth", 0),
+        "rejected": stats.get("rejected", 0),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--executor", choices=["process", "thread"], default="process")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--database-url", default=None, help="URL synchrone (défaut : SQLite temporaire)")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    env = dict(os.environ, DATABASE_URL=database_url, ASYNC_DATABASE_URL=async_url_for(database_url), DEBUG="false")
+    token = seed_database(env, 200)
+
+    print(f"cœurs disponibles : {os.cpu_count()}  exécuteur : {args.executor}")
+    print("workers  connexions/s  login p50    login p99   dispatch p50  dispatch p99  file max  refus")
+    for workers in args.workers:
+        server_env = dict(
+            env,
+            PASSWORD_HASH_WORKERS=str(workers),
+            PASSWORD_HASH_USE_PROCESSES="true" if args.executor == "process" else "false",
+            PASSWORD_HASH_MAX_PENDING=str(max(args.concurrency, 1) * 2),
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=server_env
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            asyncio.run(wait_until_ready(base_url))
+            r = asyncio.run(login_storm(base_url, token, args.logins, args.concurrency))
+            print(f"{workers:>7}  {r['logins_per_second']:12.1f}  {r['login_p50_ms']:8.1f} ms  {r['login_p99_ms']:8.1f} ms  "
+                  f"{r['dispatch_p50_ms']:9.1f} ms  {r['dispatch_p99_ms']:9.1f} ms  {r['max_queue_depth']:8}  {r['rejected']:5}")
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark du coût de l'instrumentation (METRICS_ENABLED et SQL_PROFILING, qui partagent écouteur et middleware)
+
+1. Micro : coût par requête du MetricsMiddleware autour d'une application ASGI vide, et coût
+   par requête SQL des écouteurs d'instrument_engine (SELECT 1 sur SQLite en mémoire).
+2. Bout en bout : l'application complète (TestClient, base SQLite temporaire) est lancée dans
+   un processus avec l'instrumentation et dans un autre sans ; les mêmes routes y sont appelées
+   en série et l'écart de latence médiane est rapporté, ainsi que la durée d'un export /metrics.
+
+Exemple :
+    python benchmarks/bench_metrics_overhead.py --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+ROUTES = ["/api/v1/users/me", "/api/v1/ambulances/1", "/api/v1/ambulances/?limit=50", "/api/v1/missions/?limit=50"]
+
+def micro(iterations: int) -> None:
+    from sqlalchemy import create_engine, text
+    from app.services.metrics import MetricsMiddleware, instrument_engine
+
+    async def empty_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def run(app) -> float:
+        scope = {"type": "http", "method": "GET", "path": "/"}
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await app(dict(scope), receive, send)
+        return (time.perf_counter() - started) / iterations * 1e6
+
+    bare = asyncio.run(run(empty_app))
+    instrumented = asyncio.run(run(MetricsMiddleware(empty_app)))
+    print(f"middleware : {bare:6.2f} µs -> {instrumented:6.2f} µs par requête (+{instrumented - bare:.2f} µs)")
+
+    def queries(engine) -> float:
+        with engine.connect() as conn:
+            statement = text("SELECT 1")
+            started = time.perf_counter()
+            for _ in range(iterations):
+                conn.execute(statement).scalar()
+            return (time.perf_counter() - started) / iterations * 1e6
+
+    plain = queries(create_engine("sqlite://"))
+    engine = create_engine("sqlite://")
+    instrument_engine("bench", engine)
+    counted = queries(engine)
+    print(f"requête SQL : {plain:6.2f} µs -> {counted:6.2f} µs par requête (+{counted - plain:.2f} µs)")
+
+def child(requests: int) -> None:
+    """Processus mesuré : la configuration (METRICS_ENABLED) est lue à l'import de l'application"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.database.base import engine
+    from app.main import app
+    from app.models.ambulance import Ambulance
+    from app.models.hospital import Hospital
+    from app.models.mission import Mission, MissionPriority, MissionStatus
+    from app.models.user import User, UserRole
+    from app.services.read_cache import read_cache
+
+    read_cache.ttl = 0
+    with engine.begin() as conn:
+        conn.execute(insert(User), [dict(id=1, username="bench", email="bench@example.com", hashed_password="-",
+                                         first_name="B", last_name="M", role=UserRole.ADMIN, is_active=True)])
+        conn.execute(insert(Hospital), [dict(id=1, name="H", address="-", phone="-", latitude=48.85, longitude=2.35)])
+        conn.execute(insert(Ambulance), [dict(id=i, plate_number=f"B-{i}", model="M", capacity=2, latitude=48.85, longitude=2.35)
+                                         for i in range(1, 101)])
+        conn.execute(insert(Mission), [dict(patient_name="P", patient_phone="-", patient_condition="-", priority=MissionPriority.NORMALE,
+                                            status=MissionStatus.EN_COURS, pickup_address="-", pickup_latitude=48.85,
+                                            pickup_longitude=2.35, hospital_id=1, ambulance_id=i % 100 + 1) for i in range(500)])
+    headers = {"Authorization": f"Bearer {create_access_token(subject='bench')}"}
+    results = {}
+    with TestClient(app, headers=headers) as client:
+        for route in ROUTES:
+            for _ in range(50):
+                client.get(route)
+            latencies = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                client.get(route)
+                latencies.append((time.perf_counter() - started) * 1000)
+            results[route] = statistics.median(latencies)
+        if settings.METRICS_ENABLED:
+            started = time.perf_counter()
+            body = client.get("/metrics").text
+            results["/metrics"] = (time.perf_counter() - started) * 1000
+            results["/metrics bytes"] = len(body)
+    print(json.dumps(results))
+
+def end_to_end(requests: int) -> None:
+    runs = {}
+    for enabled in ("false", "true"):
+        env = dict(os.environ, METRICS_ENABLED=enabled, SQL_PROFILING=enabled, DEBUG="false", DB_ASYNC_MODE="false",
+                   DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", "--requests", str(requests)],
+                                env=env, check=True, capture_output=True, text=True)
+        runs[enabled] = json.loads(output.stdout.strip().splitlines()[-1])
+    print(f"\n{'route':<32} {'sans':>9} {'avec':>9}   écart (médianes)")
+    for route in ROUTES:
+        off, on = runs["false"][route], runs["true"][route]
+        print(f"{route:<32} {off:7.3f} ms {on:7.3f} ms   {on - off:+.3f} ms ({(on / off - 1):+.1%})")
+    print(f"\nexport /metrics : {runs['true']['/metrics']:.2f} ms pour {runs['true']['/metrics bytes']} octets")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Requêtes mesurées par route")
+    parser.add_argument("--iterations", type=int, default=50000, help="Itérations des micro-benchmarks")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.requests)
+        return
+    micro(args.iterations)
+    end_to_end(args.requests)
+
+if __name__ == "__main__":
+    main()
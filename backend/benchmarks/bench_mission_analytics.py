@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark des agrégats de missions : lecture dans les rollups vs calcul à la volée
+
+Pour chaque volume d'historique (SQLite temporaire), reconstruit les agrégats puis compare
+la réponse "missions par heure sur 24 h + percentiles du délai d'assignation sur 30 jours"
+lue dans les rollups avec le même calcul fait sur la table missions. Mesure aussi le
+surcoût par écriture (create_mission avec et sans maintenance des agrégats).
+
+Exemple :
+    python benchmarks/bench_mission_analytics.py --missions 10000 100000 500000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.database.base import Base
+from app.crud import analytics as crud_analytics, mission as crud_mission
+from app.models import analytics, hospital, maintenance, personnel, user, location  # noqa: F401
+from app.models.mission import Mission, MissionPriority, MissionStatus
+from app.schemas.mission import MissionCreate
+from app.services.analytics import count_series, metric_series
+
+NOW = datetime(2026, 3, 1)
+
+def seed(session_factory, missions: int, rng: random.Random) -> None:
+    priorities, statuses = list(MissionPriority), list(MissionStatus)
+    step = timedelta(days=365) / missions
+    with session_factory() as db:
+        for offset in range(0, missions, 20000):
+            rows = []
+            for i in range(offset, min(offset + 20000, missions)):
+                created_at = NOW - timedelta(days=365) + step * i
+                rows.append(dict(
+                    patient_name="-", patient_phone="-", patient_condition="-", priority=rng.choice(priorities),
+                    status=rng.choice(statuses), pickup_address="-", pickup_latitude=48.85, pickup_longitude=2.35,
+                    hospital_id=1, created_at=created_at,
+                    assigned_at=created_at + timedelta(seconds=rng.expovariate(1 / 240)),
+                    actual_duration=int(rng.gauss(35, 10)),
+                ))
+            db.execute(insert(Mission), rows)
+        db.commit()
+
+def from_rollups(db) -> None:
+    end = NOW
+    count_series("hour", end - timedelta(hours=24), end,
+                 crud_analytics.get_count_rollups(db, "hour", end - timedelta(hours=24), end))
+    metric_series("assignment_latency", "day", end - timedelta(days=30), end,
+                  crud_analytics.get_metric_rollups(db, "assignment_latency", "day", end - timedelta(days=30), end))
+
+def from_missions(db) -> None:
+    end = NOW
+    hour = func.strftime("%Y-%m-%d %H:00:00", Mission.created_at)
+    db.execute(
+        select(hour, Mission.priority, Mission.status, func.count())
+        .filter(Mission.created_at >= end - timedelta(hours=24), Mission.created_at < end)
+        .group_by(hour, Mission.priority, Mission.status)
+    ).all()
+    # Percentiles exacts : toutes les valeurs de la période doivent être lues et triées
+    latencies = sorted(
+        (assigned_at - created_at).total_seconds()
+        for created_at, assigned_at in db.execute(
+            select(Mission.created_at, Mission.assigned_at)
+            .filter(Mission.created_at >= end - timedelta(days=30), Mission.created_at < end)
+        )
+    )
+    if latencies:
+        [latencies[int(len(latencies) * q) - 1] for q in (0.5, 0.9, 0.99)]
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def write_overhead(session_factory, writes: int) -> tuple:
+    payload = MissionCreate(patient_name="-", patient_phone="-", patient_condition="-", priority=MissionPriority.URGENTE,
+                            pickup_address="-", pickup_latitude=48.85, pickup_longitude=2.35, hospital_id=1)
+    results = []
+    for enabled in (False, True):
+        settings.ANALYTICS_ROLLUPS_ENABLED = enabled
+        with session_factory() as db:
+            results.append(timed(lambda: crud_mission.create_mission(db, payload), writes))
+    settings.ANALYTICS_ROLLUPS_ENABLED = True
+    return tuple(results)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--missions", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for missions in args.missions:
+        engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        seed(session_factory, missions, random.Random(args.seed))
+
+        with session_factory() as db:
+            start = time.perf_counter()
+            crud_analytics.rebuild_mission_rollups(db)
+            backfill_s = time.perf_counter() - start
+            rollup_ms = timed(lambda: from_rollups(db), args.repeat)
+            raw_ms = timed(lambda: from_missions(db), max(1, args.repeat // 4))
+        plain_ms, rollup_write_ms = write_overhead(session_factory, args.writes)
+        print(f"missions={missions:>7}  rollups={rollup_ms:7.2f} ms  table missions={raw_ms:8.2f} ms  "
+              f"backfill={backfill_s:6.1f} s  create_mission {plain_ms:.2f} -> {rollup_write_ms:.2f} ms")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'export des missions : GET /missions/export (flux) vs GET /missions/?limit=N (liste)
+
+Pour chaque volume, démarre un serveur uvicorn neuf par scénario, télécharge toutes les
+missions et mesure le temps jusqu'au premier octet (TTFB), la durée totale et la mémoire
+résidente maximale du serveur (VmHWM, Linux) au-delà de celle mesurée au repos.
+
+Dépendances supplémentaires : httpx
+
+Exemple :
+    python benchmarks/bench_mission_export.py --missions 10000 100000
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_async_mode import BACKEND_DIR, async_url_for, wait_until_ready
+
+SCENARIOS = [
+    ("liste", "/api/v1/missions/?limit={missions}"),
+    ("export ndjson", "/api/v1/missions/export?format=ndjson"),
+    ("export csv", "/api/v1/missions/export?format=csv"),
+]
+
+def seed_missions(env: dict, missions: int) -> str:
+    """Créer le schéma, un admin et `missions` missions, et retourner un token d'accès"""
+    script = f"""
+import sys
+sys.path.insert(0, {BACKEND_DIR!r})
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.database.base import SessionLocal, engine, Base
+from app.models import user, ambulance, hospital, personnel, mission, maintenance, location
+from app.models.user import User, UserRole
+from app.models.hospital import Hospital
+from app.models.mission import Mission, MissionPriority, MissionStatus
+from app.core.security import create_access_token, get_password_hash
+Base.metadata.drop_all(bind=engine)
+Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+db.add(User(username="bench", email="bench@ambulance.com", hashed_password=get_password_hash("bench"),
+            first_name="Bench", last_name="Mark", role=UserRole.ADMIN, is_active=True))
+db.add(Hospital(id=1, name="Bench", address="-", phone="-", latitude=48.85, longitude=2.35))
+db.commit()
+priorities = list(MissionPriority)
+start = datetime(2026, 1, 1)
+for offset in range(0, {missions}, 10000):
+    db.execute(insert(Mission), [
+        dict(patient_name=f"Patient {{i}}", patient_phone="+33100000000", patient_age=40 + i % 50,
+             patient_condition="Douleur thoracique", priority=priorities[i % 4], status=MissionStatus.TERMINEE,
+             pickup_address=f"{{i}} rue de Rivoli, Paris", pickup_latitude=48.85, pickup_longitude=2.35,
+             hospital_id=1, ambulance_id=None, assigned_personnel=[1, 2], created_at=start + timedelta(minutes=i),
+             estimated_duration=30, actual_duration=28, symptoms=["douleur", "dyspnée"], notes="RAS")
+        for i in range(offset, min(offset + 10000, {missions}))
+    ])
+    db.commit()
+db.close()
+print(create_access_token(subject="bench"))
+"""
+    output = subprocess.run([sys.executable, "-c", script], env=env, check=True, capture_output=True, text=True)
+    return output.stdout.strip().splitlines()[-1]
+
+def memory_kb(pid: int, field: str) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+async def download(url: str, token: str) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(timeout=600.0) as client:
+        start = time.perf_counter()
+        ttfb = None
+        size = 0
+        async with client.stream("GET", url, headers=headers) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_raw():
+                if ttfb is None:
+                    ttfb = time.perf_counter() - start
+                size += len(chunk)
+        return {"ttfb_ms": (ttfb or 0.0) * 1000, "total_ms": (time.perf_counter() - start) * 1000, "bytes": size}
+
+def run_scenario(env: dict, token: str, port: int, path: str) -> dict:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        baseline_kb = memory_kb(server.pid, "VmRSS")
+        stats = asyncio.run(download(base_url + path, token))
+        stats["peak_mb"] = max(0, memory_kb(server.pid, "VmHWM") - baseline_kb) / 1024
+        return stats
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="URL synchrone (défaut : SQLite temporaire)")
+    parser.add_argument("--missions", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--async-mode", action="store_true", help="Servir les routes async (DB_ASYNC_MODE)")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        ASYNC_DATABASE_URL=async_url_for(database_url),
+        DB_ASYNC_MODE="true" if args.async_mode else "false",
+        DEBUG="false",
+    )
+    for missions in args.missions:
+        token = seed_missions(env, missions)
+        for name, path in SCENARIOS:
+            stats = run_scenario(env, token, args.port, path.format(missions=missions))
+            print(f"missions={missions:>7}  {name:<14} TTFB={stats['ttfb_ms']:9.1f} ms  "
+                  f"total={stats['total_ms']:9.1f} ms  {stats['bytes'] / 1e6:7.1f} Mo  "
+                  f"mémoire serveur +{stats['peak_mb']:6.1f} Mo")
+
+if __name__ == "__main__":
+    main()
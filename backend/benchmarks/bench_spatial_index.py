@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'index spatial des ambulances (GET /ambulances/nearest)
+
+Construit une flotte synthétique autour de Paris, vérifie les résultats contre un
+parcours exhaustif puis mesure la latence des requêtes k plus proches.
+
+Exemple :
+    python benchmarks/bench_spatial_index.py --fleet 10000 50000 --k 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.ambulance import AmbulanceStatus
+from app.services.geo import haversine_km
+from app.services.spatial_index import AmbulanceSpatialIndex
+
+STATUSES = [AmbulanceStatus.DISPONIBLE, AmbulanceStatus.EN_MISSION, AmbulanceStatus.MAINTENANCE]
+
+def build_fleet(size: int, rng: random.Random):
+    return [
+        (i, f"AMB-{i:05d}", rng.choice(STATUSES), rng.gauss(48.8566, 0.35), rng.gauss(2.3522, 0.5))
+        for i in range(size)
+    ]
+
+def brute_force(fleet, latitude, longitude, k):
+    distances = sorted(
+        (haversine_km(latitude, longitude, lat, lon), ambulance_id)
+        for ambulance_id, _, status, lat, lon in fleet if status == AmbulanceStatus.DISPONIBLE
+    )
+    return [ambulance_id for _, ambulance_id in distances[:k]]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fleet", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--cell", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for size in args.fleet:
+        fleet = build_fleet(size, rng)
+        index = AmbulanceSpatialIndex(cell_size_deg=args.cell)
+        index.rebuild(fleet)
+        points = [(rng.gauss(48.8566, 0.35), rng.gauss(2.3522, 0.5)) for _ in range(args.queries)]
+
+        for latitude, longitude in points[:50]:
+            expected = brute_force(fleet, latitude, longitude, args.k)
+            found = [entry.id for entry, _ in index.nearest(latitude, longitude, k=args.k)]
+            assert found == expected, (latitude, longitude, found, expected)
+
+        timings = []
+        for latitude, longitude in points:
+            start = time.perf_counter()
+            index.nearest(latitude, longitude, k=args.k)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+
+        start = time.perf_counter()
+        for latitude, longitude in points[:50]:
+            brute_force(fleet, latitude, longitude, args.k)
+        brute_ms = (time.perf_counter() - start) / 50 * 1000
+
+        start = time.perf_counter()
+        for ambulance_id, _, _, lat, lon in fleet[:1000]:
+            index.update_position(ambulance_id, lat + 0.001, lon + 0.001)
+        update_us = (time.perf_counter() - start) / min(size, 1000) * 1e6
+
+        print(f"flotte={size:>6}  nearest p50={timings[len(timings) // 2] * 1000:.3f} ms  "
+              f"p99={timings[int(len(timings) * 0.99) - 1] * 1000:.3f} ms  "
+              f"exhaustif={brute_ms:.2f} ms  mise à jour={update_us:.1f} µs")
+
+if __name__ == "__main__":
+    main()
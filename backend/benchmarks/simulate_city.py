@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Simulateur de trafic à l'échelle d'une ville : charge de bout en bout et tests d'endurance
+
+Rejoue une journée d'exploitation contre l'API réelle, en HTTP :
+- N ambulances envoient leur position GPS (PUT /ambulances/{id}/location) à intervalle régulier ;
+- les régulateurs créent des missions (POST /missions/) selon un profil horaire, puis les
+  affectent (POST /missions/{id}/assign) après un délai dépendant de la priorité ;
+- les équipages font avancer les missions (PUT /missions/{id}/status : en cours puis terminée) ;
+- des tableaux de bord interrogent en boucle les missions actives, la carte, la file et les agrégats.
+
+Le scénario est déterministe : à graine égale, mêmes événements, mêmes corps et mêmes instants
+(en temps simulé). --speed compresse le temps (60 : une heure simulée par minute réelle).
+Toutes les --report-interval secondes : p50 / p99 et erreurs par route, retard de l'injecteur et
+occupation du pool de connexions (GET /database/pool/stats). Les latences sont agrégées dans des
+histogrammes de taille fixe : la mémoire reste constante sur plusieurs heures.
+
+Sans --base-url, un serveur uvicorn est lancé sur une base SQLite temporaire peuplée par
+scripts/generate_data.py. Dépendances supplémentaires : httpx (aiosqlite pour --async-mode).
+
+Exemples :
+    python benchmarks/simulate_city.py --ambulances 300 --hours 0.5 --speed 6
+    python benchmarks/simulate_city.py --hours 8 --output soak.json --database-url mysql+pymysql://root:@localhost:3306/ambulance_soak
+    python benchmarks/simulate_city.py --base-url http://staging:8000 --username admin --password '***' --hours 4
+"""
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API = "/api/v1"
+SIM_PASSWORD = "simulation"
+
+PRIORITIES = ["critique", "urgente", "normale", "faible"]
+PRIORITY_WEIGHTS = [0.08, 0.27, 0.45, 0.20]
+# Délai médian (secondes simulées) avant affectation, par priorité
+ASSIGNMENT_MEDIAN_S = {"critique": 45, "urgente": 150, "normale": 480, "faible": 1200}
+# Activité relative par heure de la journée simulée
+HOURLY_ACTIVITY = [0.45, 0.38, 0.33, 0.30, 0.30, 0.35, 0.50, 0.75, 0.95, 1.0, 1.0, 1.0,
+                   0.98, 0.95, 0.92, 0.90, 0.90, 0.92, 0.95, 0.90, 0.80, 0.70, 0.60, 0.52]
+CONDITIONS = ["Douleur thoracique", "Suspicion d'AVC", "Traumatisme", "Fracture", "Détresse respiratoire", "Malaise"]
+DASHBOARD_ROUTES = [
+    ("GET /missions/active", "/missions/active?fields=summary"),
+    ("GET /ambulances/?fields=map", "/ambulances/?limit=1000&fields=map"),
+    ("GET /missions/queue", "/missions/queue?limit=50"),
+    ("GET /analytics/missions/counts", "/analytics/missions/counts"),
+]
+
+class LatencyHistogram:
+    """Histogramme à seaux logarithmiques (pas de 5 %) de 0,1 ms à ~2 min : percentiles à 5 % près"""
+
+    RATIO = 1.05
+    MIN_MS = 0.1
+    BUCKETS = 300
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.total = 0
+
+    def add(self, ms: float) -> None:
+        index = 0 if ms <= self.MIN_MS else int(math.log(ms / self.MIN_MS, self.RATIO)) + 1
+        self.counts[min(index, self.BUCKETS - 1)] += 1
+        self.total += 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+
+    def percentile(self, fraction: float) -> float:
+        if not self.total:
+            return 0.0
+        rank, seen = fraction * self.total, 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return round(self.MIN_MS * self.RATIO ** index, 2)
+        return round(self.MIN_MS * self.RATIO ** (self.BUCKETS - 1), 2)
+
+class RouteStats:
+    def __init__(self):
+        self.window = LatencyHistogram()
+        self.overall = LatencyHistogram()
+        self.window_errors = 0
+        self.errors = defaultdict(int)
+        self.dropped = 0
+
+    def record(self, ms: float, status) -> None:
+        self.window.add(ms)
+        if status != 200:
+            self.window_errors += 1
+            self.errors[str(status)] += 1
+
+    def drop(self) -> None:
+        # Requête non envoyée : file du client pleine (compte comme erreur, sans latence)
+        self.window_errors += 1
+        self.errors["abandon"] += 1
+        self.dropped += 1
+
+    def roll(self) -> None:
+        self.overall.merge(self.window)
+        self.window = LatencyHistogram()
+        self.window_errors = 0
+
+    def summary(self, histogram: LatencyHistogram) -> dict:
+        errors, attempts = sum(self.errors.values()), histogram.total + self.dropped
+        return {"requests": histogram.total, "dropped": self.dropped, "p50_ms": histogram.percentile(0.50),
+                "p99_ms": histogram.percentile(0.99), "errors": errors,
+                "error_rate": round(errors / attempts, 5) if attempts else 0.0, "errors_by_status": dict(self.errors)}
+
+class Scenario:
+    """Événements simulés ordonnés par instant (secondes simulées depuis le début)"""
+
+    def __init__(self, args, fleet, hospitals):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.fleet = fleet
+        self.hospitals = hospitals
+        self.positions = {ambulance_id: (lat, lon) for ambulance_id, lat, lon in fleet}
+        self.sequence = itertools.count()
+        self.missions = itertools.count(1)
+        self.events = []
+        for ambulance_id, _, _ in fleet:
+            self.push(self.rng.uniform(0, args.gps_interval), "gps", ambulance_id)
+        for dashboard in range(args.dashboards):
+            self.push(self.rng.uniform(0, args.poll_interval), "poll", (dashboard, 0))
+        self.push(self.next_arrival(0.0), "create", None)
+
+    def push(self, at: float, kind: str, payload) -> None:
+        if at < self.args.hours * 3600:
+            heapq.heappush(self.events, (at, next(self.sequence), kind, payload))
+
+    def next_arrival(self, now: float) -> float:
+        # Processus de Poisson non homogène (amincissement) sur le profil horaire
+        peak_rate = self.args.missions_per_hour / 3600
+        while True:
+            now += self.rng.expovariate(peak_rate)
+            hour = int((self.args.start_hour * 3600 + now) // 3600) % 24
+            if self.rng.random() < HOURLY_ACTIVITY[hour] / max(HOURLY_ACTIVITY):
+                return now
+
+    def gps_fix(self, ambulance_id: int, now: float) -> dict:
+        # Marche aléatoire (~10 m/s) autour de la dernière position envoyée
+        lat, lon = self.positions[ambulance_id]
+        lat = min(90.0, max(-90.0, lat + self.rng.gauss(0, 9e-5 * self.args.gps_interval / 10)))
+        lon = min(180.0, max(-180.0, lon + self.rng.gauss(0, 1.3e-4 * self.args.gps_interval / 10)))
+        self.positions[ambulance_id] = (lat, lon)
+        self.push(now + self.args.gps_interval * self.rng.uniform(0.9, 1.1), "gps", ambulance_id)
+        return {"latitude": round(lat, 6), "longitude": round(lon, 6)}
+
+    def new_mission(self, now: float):
+        """Corps de la mission et plan de son cycle de vie (délais relatifs), tirés d'un générateur propre"""
+        number = next(self.missions)
+        rng = random.Random(f"{self.args.seed}-mission-{number}")
+        _, lat, lon = self.fleet[rng.randrange(len(self.fleet))]
+        priority = rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0]
+        body = {
+            "patient_name": f"Patient simulé {number}", "patient_phone": f"+336{number:08d}",
+            "patient_age": rng.randint(0, 99), "patient_condition": rng.choice(CONDITIONS), "priority": priority,
+            "pickup_address": f"{rng.randint(1, 200)} rue de la Simulation",
+            "pickup_latitude": round(lat + rng.gauss(0, 0.02), 6), "pickup_longitude": round(lon + rng.gauss(0, 0.02), 6),
+            "hospital_id": rng.choice(self.hospitals), "symptoms": [],
+        }
+        assign_after = rng.lognormvariate(math.log(ASSIGNMENT_MEDIAN_S[priority]), 0.6)
+        plan = [
+            (assign_after, "assign", {"ambulance_id": self.fleet[rng.randrange(len(self.fleet))][0], "personnel_ids": []}),
+            (assign_after + rng.lognormvariate(math.log(540), 0.5), "status", "en_cours"),
+            (assign_after + 540 + rng.lognormvariate(math.log(35 * 60), 0.45), "status", "terminee"),
+        ]
+        self.push(self.next_arrival(now), "create", None)
+        return body, plan
+
+    def schedule_lifecycle(self, mission_id: int, created: float, plan) -> None:
+        for delay, kind, payload in plan:
+            self.push(created + delay, kind, (mission_id, payload))
+
+class Simulation:
+    def __init__(self, args, client: httpx.AsyncClient, tokens: dict, scenario: Scenario):
+        self.args = args
+        self.client = client
+        self.tokens = tokens
+        self.scenario = scenario
+        self.routes = defaultdict(RouteStats)
+        self.lag = RouteStats()
+        self.in_flight = set()
+        self.semaphore = asyncio.Semaphore(args.max_in_flight)
+        self.pool_samples = []
+        self.started = 0.0
+
+    def virtual_now(self) -> float:
+        return (time.monotonic() - self.started) * self.args.speed
+
+    async def call(self, route: str, role: str, method: str, path: str, **kwargs):
+        async with self.semaphore:
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, API + path, headers=self.tokens[role], **kwargs)
+                status = response.status_code
+            except httpx.HTTPError as exc:
+                response, status = None, type(exc).__name__
+            self.routes[route].record((time.perf_counter() - start) * 1000, status)
+            return response if status == 200 else None
+
+    async def create_mission(self, at: float, body: dict, plan) -> None:
+        response = await self.call("POST /missions/", "regulateur", "POST", "/missions/", json=body)
+        if response is not None:
+            self.scenario.schedule_lifecycle(response.json()["id"], at, plan)
+
+    def dispatch(self, at: float, kind: str, payload) -> None:
+        scenario = self.scenario
+        if kind == "gps":
+            route = "PUT /ambulances/{id}/location"
+            job = self.call(route, "ambulancier", "PUT", f"/ambulances/{payload}/location", json=scenario.gps_fix(payload, at))
+        elif kind == "poll":
+            dashboard, step = payload
+            route, path = DASHBOARD_ROUTES[step % len(DASHBOARD_ROUTES)]
+            scenario.push(at + self.args.poll_interval / len(DASHBOARD_ROUTES), "poll", (dashboard, step + 1))
+            job = self.call(route, "regulateur", "GET", path)
+        elif kind == "create":
+            route = "POST /missions/"
+            job = self.create_mission(at, *scenario.new_mission(at))
+        elif kind == "assign":
+            mission_id, body = payload
+            route = "POST /missions/{id}/assign"
+            job = self.call(route, "regulateur", "POST", f"/missions/{mission_id}/assign", json=body)
+        else:
+            mission_id, status = payload
+            route = "PUT /missions/{id}/status"
+            job = self.call(route, "ambulancier", "PUT", f"/missions/{mission_id}/status", params={"status": status})
+        if len(self.in_flight) >= self.args.max_backlog:
+            # API saturée : abandonner plutôt que laisser la file du client grossir sans limite
+            job.close()
+            self.routes[route].drop()
+            return
+        task = asyncio.create_task(job)
+        self.in_flight.add(task)
+        task.add_done_callback(self.in_flight.discard)
+
+    async def sample_pool(self) -> dict:
+        try:
+            response = await self.client.get(API + "/database/pool/stats", headers=self.tokens["admin"])
+        except httpx.HTTPError:
+            return {}
+        return response.json() if response.status_code == 200 else {}
+
+    async def report(self) -> None:
+        pool = await self.sample_pool()
+        elapsed = time.monotonic() - self.started
+        previous = self.pool_samples[-1]["pools"] if self.pool_samples else {}
+        self.pool_samples.append({"elapsed_s": round(elapsed, 1), "pools": pool})
+        print(f"\n[{elapsed / 60:7.1f} min réelles | {self.virtual_now() / 3600:5.2f} h simulées | "
+              f"en vol {len(self.in_flight)} | retard p99 {self.lag.window.percentile(0.99):.0f} ms]")
+        for route in sorted(self.routes):
+            stats = self.routes[route]
+            window = stats.window
+            if window.total:
+                print(f"  {route:<36} {window.total:>7} req  p50={window.percentile(0.5):8.1f} ms  "
+                      f"p99={window.percentile(0.99):8.1f} ms  erreurs={stats.window_errors}")
+            stats.roll()
+        self.lag.roll()
+        for label, stats in pool.items():
+            before = previous.get(label, {})
+            checkouts = stats["checkouts"] - before.get("checkouts", 0)
+            saturated = stats["saturated_checkouts"] - before.get("saturated_checkouts", 0)
+            print(f"  pool {label:<6} {stats['checked_out']}/{stats['capacity']} prêtées  pic={stats['max_in_use']}  "
+                  f"checkouts saturés={saturated}/{checkouts}  détention moy.={stats['avg_held_ms']} ms")
+
+    async def run(self) -> None:
+        self.started = time.monotonic()
+        next_report = self.args.report_interval
+        events = self.scenario.events
+        while events or self.in_flight:
+            if not events:
+                # Les réponses en vol peuvent encore planifier le cycle de vie de missions créées
+                await asyncio.wait(set(self.in_flight), timeout=1.0)
+            else:
+                at, _, kind, payload = events[0]
+                wait = at / self.args.speed - (time.monotonic() - self.started)
+                if wait > 0:
+                    await asyncio.sleep(min(wait, 0.5))
+                else:
+                    heapq.heappop(events)
+                    # Retard de l'injecteur : s'il grandit, c'est le client qui sature, pas l'API
+                    self.lag.record(-wait * 1000, 200)
+                    self.dispatch(at, kind, payload)
+            if time.monotonic() - self.started >= next_report:
+                next_report += self.args.report_interval
+                await self.report()
+        await self.report()
+
+    def summary(self) -> dict:
+        routes = {}
+        for route, stats in sorted(self.routes.items()):
+            stats.roll()
+            routes[route] = stats.summary(stats.overall)
+        total = sum(route["requests"] for route in routes.values())
+        dropped = sum(route["dropped"] for route in routes.values())
+        errors = sum(route["errors"] for route in routes.values())
+        return {
+            "seed": self.args.seed,
+            "simulated_hours": self.args.hours,
+            "speed": self.args.speed,
+            "ambulances": len(self.scenario.fleet),
+            "requests": total,
+            "dropped": dropped,
+            "error_rate": round(errors / (total + dropped), 5) if total + dropped else 0.0,
+            "injector_lag_p99_ms": self.lag.overall.percentile(0.99),
+            "routes": routes,
+            "pool_samples": self.pool_samples,
+        }
+
+def seed_database(env: dict, args) -> None:
+    """Peupler la base (hôpitaux, flotte, historique) et créer les comptes de la simulation"""
+    subprocess.run([sys.executable, os.path.join(BACKEND_DIR, "scripts", "generate_data.py"), "--url", env["DATABASE_URL"],
+                    "--ambulances", str(args.ambulances), "--hospitals", str(args.hospitals), "--users", "0",
+                    "--missions", str(args.history), "--days", "30", "--seed", str(args.seed)],
+                   env=env, check=True, stdout=subprocess.DEVNULL)
+    script = f"""
+import sys
+sys.path.insert(0, {BACKEND_DIR!r})
+from app.database.base import SessionLocal
+from app.models import ambulance, analytics, hospital, location, maintenance, mission, personnel  # noqa: F401
+from app.models.user import User, UserRole
+from app.core.security import get_password_hash
+hashed = get_password_hash({SIM_PASSWORD!r})
+db = SessionLocal()
+for role in (UserRole.ADMIN, UserRole.REGULATEUR, UserRole.AMBULANCIER):
+    db.add(User(username=f"sim-{{role.value}}", email=f"sim-{{role.value}}@example.com", hashed_password=hashed,
+                first_name="Simulation", last_name=role.value, role=role, is_active=True))
+db.commit()
+db.close()
+"""
+    subprocess.run([sys.executable, "-c", script], env=env, check=True)
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Le serveur n'a pas démarré à temps")
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> dict:
+    response = await client.post(API + "/auth/login", data={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def simulate(args) -> dict:
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        await wait_until_ready(client)
+        if args.username:
+            token = await login(client, args.username, args.password)
+            tokens = {"admin": token, "regulateur": token, "ambulancier": token}
+        else:
+            tokens = {role: await login(client, f"sim-{role}", SIM_PASSWORD) for role in ("admin", "regulateur", "ambulancier")}
+        fleet_response = await client.get(API + "/ambulances/", headers=tokens["admin"],
+                                          params={"limit": args.ambulances, "fields": "id,latitude,longitude"})
+        fleet = [(row["id"], row["latitude"], row["longitude"]) for row in fleet_response.json()]
+        hospitals_response = await client.get(API + "/hospitals/", headers=tokens["admin"], params={"limit": 10000})
+        hospitals = [row["id"] for row in hospitals_response.json()]
+        if not fleet or not hospitals:
+            raise SystemExit("La simulation demande au moins une ambulance et un hôpital")
+
+        scenario = Scenario(args, fleet, hospitals)
+        print(f"{len(fleet)} ambulances, {len(hospitals)} hôpitaux, {args.hours} h simulées x{args.speed} "
+              f"(~{args.hours * 3600 / args.speed / 60:.1f} min réelles), graine {args.seed}")
+        simulation = Simulation(args, client, tokens, scenario)
+        await simulation.run()
+        return simulation.summary()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="API déjà déployée (sinon : serveur local sur une base temporaire)")
+    parser.add_argument("--username", help="Compte (administrateur) utilisé pour tous les rôles avec --base-url")
+    parser.add_argument("--password")
+    parser.add_argument("--database-url", help="Base du serveur local (défaut : SQLite temporaire)")
+    parser.add_argument("--async-mode", action="store_true", help="Serveur local en DB_ASYNC_MODE")
+    parser.add_argument("--workers", type=int, default=1, help="Workers uvicorn du serveur local")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--ambulances", type=int, default=200)
+    parser.add_argument("--hospitals", type=int, default=30)
+    parser.add_argument("--history", type=int, default=20000, help="Missions historiques générées avant la simulation")
+    parser.add_argument("--hours", type=float, default=1.0, help="Durée simulée")
+    parser.add_argument("--speed", type=float, default=1.0, help="Secondes simulées par seconde réelle")
+    parser.add_argument("--start-hour", type=int, default=8, help="Heure de la journée au début de la simulation")
+    parser.add_argument("--gps-interval", type=float, default=10.0, help="Secondes simulées entre deux positions")
+    parser.add_argument("--missions-per-hour", type=float, default=120.0, help="Missions créées par heure au pic")
+    parser.add_argument("--dashboards", type=int, default=5)
+    parser.add_argument("--poll-interval", type=float, default=15.0, help="Cycle complet d'un tableau de bord (s simulées)")
+    parser.add_argument("--max-in-flight", type=int, default=200, help="Requêtes simultanées maximales côté client")
+    parser.add_argument("--max-backlog", type=int, default=1000, help="Requêtes en attente au-delà desquelles le client abandonne")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--report-interval", type=float, default=60.0, help="Secondes réelles entre deux rapports")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Écrire le résumé (JSON) dans ce fichier")
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url is None:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'simulation.db')}"
+        env = dict(os.environ, DATABASE_URL=database_url, DEBUG="false",
+                   DB_ASYNC_MODE="true" if args.async_mode else "false")
+        if args.async_mode:
+            env["ASYNC_DATABASE_URL"] = database_url.replace("sqlite://", "sqlite+aiosqlite://", 1).replace(
+                "mysql+pymysql://", "mysql+aiomysql://", 1)
+        print("Préparation de la base...")
+        seed_database(env, args)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning",
+             "--workers", str(args.workers)],
+            cwd=BACKEND_DIR, env=env
+        )
+        args.base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        summary = asyncio.run(simulate(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    print(f"\nTotal : {summary['requests']} requêtes ({summary['dropped']} abandonnées), taux d'erreur {summary['error_rate']:.3%}, "
+          f"retard p99 de l'injecteur {summary['injector_lag_p99_ms']} ms")
+    for route, stats in summary["routes"].items():
+        print(f"  {route:<36} {stats['requests']:>8} req  p50={stats['p50_ms']:8.1f} ms  p99={stats['p99_ms']:8.1f} ms  "
+              f"erreurs={stats['errors']} {stats['errors_by_status'] or ''}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(summary, output, indent=2)
+        print(f"Résumé écrit dans {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Reconstruction des agrégats de missions (mission_count_rollups, mission_metric_rollups)
+
+À lancer une fois après la migration qui crée les tables, puis après toute période où
+ANALYTICS_ROLLUPS_ENABLED était désactivé ou après un changement des bornes d'histogramme.
+Les agrégats de la période sont remplacés : préférer une période close (jours passés) ou
+un moment calme, les écritures concurrentes sur la période pouvant sinon être comptées
+deux fois ou pas du tout.
+"""
+import argparse
+import sys
+import os
+from datetime import datetime
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.database.base import SessionLocal
+from app.crud.analytics import rebuild_mission_rollups
+
+def parse_day(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d")
+
+def backfill():
+    parser = argparse.ArgumentParser(description="Reconstruction des agrégats de missions")
+    parser.add_argument("--from", dest="start", type=parse_day, default=None, help="Premier jour (AAAA-MM-JJ, UTC)")
+    parser.add_argument("--to", dest="end", type=parse_day, default=None, help="Jour de fin exclu (AAAA-MM-JJ, UTC)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = rebuild_mission_rollups(db, start=args.start, end=args.end, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"{result['missions']} missions agrégées : {result['count_rows']} lignes de comptage, "
+          f"{result['metric_rows']} classes d'histogramme")
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Contrôle de l'optimiseur d'affectation (services/dispatch.solve_assignment)
+
+1. Petites matrices (jusqu'à --max-size lignes ou colonnes), carrées et rectangulaires, à
+   coûts réels ou entiers avec beaucoup d'égalités : le résultat doit être une affectation
+   valide (min(n, m) couples, lignes et colonnes distinctes) de coût égal à l'optimum trouvé
+   par énumération exhaustive.
+2. Grandes matrices : aucun échange de colonnes entre deux couples, ni vers une colonne libre,
+   ne doit réduire le coût ; si scipy est installé, le coût est comparé à linear_sum_assignment.
+3. plan_dispatch avec distance maximale : aucun couple au-delà de la limite, et autant de
+   couples admissibles que le permet l'énumération exhaustive.
+
+Sort en erreur (code 1) en cas d'écart, en affichant les matrices fautives : à lancer en CI après toute
+modification de l'optimiseur.
+
+Exemple :
+    python scripts/check_assignment.py --trials 3000 --max-size 7
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.models.mission import MissionPriority
+from app.services.dispatch import (PRIORITY_RANK, CandidateAmbulance, PendingMission, haversine_matrix, plan_dispatch,
+                                  solve_assignment)
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # contrôle de référence facultatif
+    linear_sum_assignment = None
+
+def brute_force(cost: np.ndarray) -> float:
+    n, m = cost.shape
+    if n > m:
+        return brute_force(cost.T)
+    return min(sum(cost[i, j] for i, j in enumerate(cols)) for cols in itertools.permutations(range(m), n))
+
+def check_valid(cost: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> str:
+    n, m = cost.shape
+    if len(rows) != min(n, m) or len(cols) != len(rows):
+        return f"{len(rows)} couples au lieu de {min(n, m)}"
+    if len(set(rows.tolist())) != len(rows) or len(set(cols.tolist())) != len(cols):
+        return "ligne ou colonne affectée deux fois"
+    if len(rows) and (rows.min() < 0 or rows.max() >= n or cols.min() < 0 or cols.max() >= m):
+        return "indice hors de la matrice"
+    return ""
+
+def check_swaps(cost: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> str:
+    """Optimalité locale : aucun échange entre deux couples ni vers une colonne libre n'améliore"""
+    if cost.shape[0] > cost.shape[1]:
+        cost, rows, cols = cost.T, cols, rows
+    current = cost[rows, cols]
+    swapped = cost[rows[:, None], cols[None, :]] + cost[rows[None, :], cols[:, None]]
+    gain = current[:, None] + current[None, :] - swapped
+    if gain.max(initial=0.0) > 1e-9:
+        return f"échange de colonnes favorable ({gain.max():.6f})"
+    free = np.setdiff1d(np.arange(cost.shape[1]), cols)
+    if len(free) and (current[:, None] - cost[rows[:, None], free[None, :]]).max() > 1e-9:
+        return "colonne libre moins coûteuse"
+    return ""
+
+def random_matrix(rng: random.Random, n: int, m: int) -> np.ndarray:
+    kind = rng.choice(("real", "ties", "constant", "prohibitive"))
+    if kind == "real":
+        return np.array([[rng.uniform(0, 100) for _ in range(m)] for _ in range(n)])
+    if kind == "ties":
+        return np.array([[float(rng.randint(0, 3)) for _ in range(m)] for _ in range(n)])
+    if kind == "constant":
+        return np.full((n, m), 7.0)
+    # Même forme que plan_dispatch : couples interdits à coût prohibitif commun
+    cost = np.array([[rng.uniform(0, 10) for _ in range(m)] for _ in range(n)])
+    forbidden = np.array([[rng.random() < 0.4 for _ in range(m)] for _ in range(n)])
+    cost[forbidden] = (cost[~forbidden].max(initial=0.0) + 1.0) * (n + 1)
+    return cost
+
+def check_dispatch(rng: random.Random, max_size: int) -> str:
+    priorities = list(MissionPriority)
+    missions = [PendingMission(id=i, priority=rng.choice(priorities), created_at=None,
+                               latitude=48.8 + rng.uniform(0, 0.2), longitude=2.3 + rng.uniform(0, 0.2))
+                for i in range(rng.randint(1, max_size))]
+    ambulances = [CandidateAmbulance(id=100 + i, latitude=48.8 + rng.uniform(0, 0.2), longitude=2.3 + rng.uniform(0, 0.2))
+                  for i in range(rng.randint(1, max_size))]
+    max_distance = rng.uniform(2, 15)
+    assignments, unassigned = plan_dispatch(missions, ambulances, max_distance_km=max_distance)
+    if any(assignment.distance_km > max_distance for assignment in assignments):
+        return "couple au-delà de la distance maximale"
+    if len(assignments) + len(unassigned) != len(missions):
+        return "missions perdues ou dupliquées"
+    # Nombre maximal de couples admissibles parmi les missions servies (les plus prioritaires)
+    ordered = sorted(missions, key=lambda mission: (PRIORITY_RANK[mission.priority], mission.id))[:len(ambulances)]
+    distances = haversine_matrix(np.array([mission.latitude for mission in ordered]), np.array([mission.longitude for mission in ordered]),
+                                 np.array([ambulance.latitude for ambulance in ambulances]),
+                                 np.array([ambulance.longitude for ambulance in ambulances]))
+    admissible = (distances <= max_distance).astype(float)
+    best = -brute_force(-admissible)
+    if len(assignments) != round(best):
+        return f"{len(assignments)} couples admissibles au lieu de {round(best)}"
+    return ""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=2000, help="Matrices aléatoires par contrôle")
+    parser.add_argument("--max-size", type=int, default=7, help="Taille maximale pour l'énumération exhaustive")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    failures = 0
+
+    def fail(label: str, message: str, cost=None):
+        nonlocal failures
+        failures += 1
+        print(f"ÉCHEC {label} : {message}")
+        if cost is not None:
+            print(np.array2string(cost, precision=3, max_line_width=200))
+
+    for size in ((0, 0), (0, 3), (3, 0)):
+        rows, cols = solve_assignment(np.zeros(size))
+        if len(rows) or len(cols):
+            fail(f"matrice vide {size}", "couples renvoyés")
+
+    for trial in range(args.trials):
+        n, m = rng.randint(1, args.max_size), rng.randint(1, args.max_size)
+        cost = random_matrix(rng, n, m)
+        rows, cols = solve_assignment(cost)
+        error = check_valid(cost, rows, cols)
+        if not error and abs(cost[rows, cols].sum() - brute_force(cost)) > 1e-6:
+            error = f"coût {cost[rows, cols].sum():.6f} au lieu de l'optimum {brute_force(cost):.6f}"
+        if error:
+            fail(f"exhaustif #{trial} ({n}x{m})", error, cost)
+    print(f"énumération exhaustive : {args.trials} matrices jusqu'à {args.max_size}x{args.max_size}")
+
+    large = max(1, args.trials // 20)
+    for trial in range(large):
+        n, m = rng.randint(10, 80), rng.randint(10, 80)
+        cost = random_matrix(rng, n, m)
+        rows, cols = solve_assignment(cost)
+        error = check_valid(cost, rows, cols) or check_swaps(cost, rows, cols)
+        if not error and linear_sum_assignment is not None:
+            ref_rows, ref_cols = linear_sum_assignment(cost)
+            if abs(cost[rows, cols].sum() - cost[ref_rows, ref_cols].sum()) > 1e-6:
+                error = f"coût {cost[rows, cols].sum():.6f} au lieu de {cost[ref_rows, ref_cols].sum():.6f} (scipy)"
+        if error:
+            fail(f"grande matrice #{trial} ({n}x{m})", error, cost)
+    reference = "échanges et scipy" if linear_sum_assignment is not None else "échanges (scipy absent)"
+    print(f"grandes matrices : {large} contrôlées par {reference}")
+
+    for trial in range(args.trials // 4):
+        error = check_dispatch(rng, min(args.max_size, 6))
+        if error:
+            fail(f"plan_dispatch #{trial}", error)
+    print(f"plan_dispatch : {args.trials // 4} flottes avec distance maximale")
+
+    if failures:
+        print(f"{failures} écart(s)")
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Contrôle du nombre de requêtes SQL par appel des listes de missions (régressions N+1)
+
+Monte le routeur des missions sur une base SQLite jetable, la peuple, puis appelle chaque
+route avec une petite et une grande page en comptant les requêtes émises. Sort en erreur
+(code 1) si une route dépasse son budget ou si le nombre de requêtes dépend du nombre de
+missions renvoyées : à lancer en CI après toute modification des requêtes ou des relations.
+
+Exemple :
+    python scripts/check_query_counts.py --missions 500 --verbose
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.api.deps import get_current_active_user
+from app.api.v1.endpoints import missions
+from app.database.base import Base, get_db
+from app.models.ambulance import Ambulance, AmbulanceStatus
+from app.models.hospital import Hospital
+from app.models.mission import Mission, MissionPriority, MissionStatus
+from app.models.user import User, UserRole
+from app.models import analytics, location, maintenance, personnel  # noqa: F401 (tables référencées par les clés étrangères)
+from app.services.read_cache import read_cache
+
+NOW = datetime(2026, 1, 15, 12, 0, 0)
+
+# (nom, chemin avec {limit} ou {id}, requêtes attendues quel que soit le nombre de missions)
+CASES = [
+    ("liste", "/missions/?limit={limit}", 1),
+    ("liste projetée", "/missions/?limit={limit}&fields=summary", 1),
+    ("liste + ambulance", "/missions/?limit={limit}&expand=ambulance", 2),
+    ("liste + hôpital", "/missions/?limit={limit}&expand=hospital", 2),
+    ("liste + ambulance + hôpital", "/missions/?limit={limit}&expand=ambulance,hospital", 3),
+    ("actives + ambulance + hôpital", "/missions/active?expand=ambulance,hospital", 3),
+    ("mission + ambulance + hôpital", "/missions/{id}?expand=ambulance,hospital", 1),
+]
+
+def seed(engine, missions_count: int, rng: random.Random) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(Hospital), [
+            {"id": i, "name": f"Hôpital {i}", "address": "-", "phone": "-", "latitude": 48.85, "longitude": 2.35}
+            for i in range(1, 51)
+        ])
+        conn.execute(insert(Ambulance), [
+            {"id": i, "plate_number": f"AMB-{i:05d}", "model": "-", "capacity": 2,
+             "status": AmbulanceStatus.EN_MISSION, "latitude": 48.85, "longitude": 2.35}
+            for i in range(1, missions_count + 1)
+        ])
+        conn.execute(insert(Mission), [
+            {"id": i, "patient_name": "-", "patient_phone": "-", "patient_condition": "-",
+             "priority": rng.choice(list(MissionPriority)),
+             # Une mission sur deux active : la liste des actives grandit avec la base
+             "status": MissionStatus.EN_COURS if i % 2 else MissionStatus.TERMINEE,
+             "pickup_address": "-", "pickup_latitude": 48.85, "pickup_longitude": 2.35,
+             "hospital_id": rng.randint(1, 50), "ambulance_id": i, "created_at": NOW - timedelta(minutes=i)}
+            for i in range(1, missions_count + 1)
+        ])
+
+def build_client(engine) -> TestClient:
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    app = FastAPI()
+    app.include_router(missions.router, prefix="/missions")
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Ni authentification ni cache de lecture : seules les requêtes de la route sont comptées
+    user = User(id=1, username="check", email="check@example.com", hashed_password="-", first_name="-",
+                last_name="-", role=UserRole.ADMIN, is_active=True)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    read_cache.ttl = 0
+    return TestClient(app)
+
+def check_counts(engine, client: TestClient, limits, verbose: bool) -> int:
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    failures = 0
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for name, path, expected in CASES:
+            counts = []
+            for limit in limits:
+                captured.clear()
+                response = client.get(path.format(limit=limit, id=limit))
+                if response.status_code != 200:
+                    raise SystemExit(f"{name} : HTTP {response.status_code} {response.text}")
+                counts.append(len(captured))
+                if verbose:
+                    print(f"    {path.format(limit=limit, id=limit)} -> {len(captured)} requête(s)")
+                    for statement in captured:
+                        print("      " + " ".join(statement.split())[:160])
+            regression = any(count != expected for count in counts)
+            failures += regression
+            label = "ÉCHEC" if regression else "ok"
+            print(f"[{label:>5}] {name} : {' / '.join(map(str, counts))} requête(s), attendu {expected}")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifie le nombre de requêtes SQL par appel des listes de missions")
+    parser.add_argument("--missions", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true", help="Afficher le SQL de chaque appel")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    try:
+        seed(engine, args.missions, random.Random(args.seed))
+        failures = check_counts(engine, build_client(engine), (5, args.missions), args.verbose)
+    finally:
+        engine.dispose()
+
+    if failures:
+        print(f"\n{failures} route(s) au-delà de leur budget de requêtes")
+        sys.exit(1)
+    print("\nNombre de requêtes constant sur toutes les routes")
+
+if __name__ == "__main__":
+    main()
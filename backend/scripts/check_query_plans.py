@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Contrôle des plans d'exécution des requêtes CRUD chaudes (missions, flotte, utilisateurs)
+
+Crée le schéma à partir des modèles sur une base jetable (SQLite en mémoire par défaut,
+ou --url vers une base MySQL de test vide), la peuple, exécute chaque fonction CRUD en
+capturant son SQL puis passe chaque SELECT à EXPLAIN. Sort en erreur (code 1) si une
+requête censée être indexée parcourt une table entière : à lancer en CI après toute
+modification des modèles, des index ou des requêtes.
+
+Exemple :
+    python scripts/check_query_plans.py --missions 50000 --verbose
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database.base import Base
+from app.crud import ambulance as crud_ambulance, location as crud_location, mission as crud_mission, user as crud_user
+from app.crud.pagination import encode_cursor
+from app.models.ambulance import Ambulance, AmbulanceStatus
+from app.models.hospital import Hospital
+from app.models.location import AmbulanceLocationHistory
+from app.models.mission import Mission, MissionPriority, MissionStatus
+from app.models.user import User, UserRole
+from app.models import maintenance, personnel  # noqa: F401 (tables référencées par les clés étrangères)
+
+NOW = datetime(2026, 1, 15, 12, 0, 0)
+
+# (nom, appel, parcours complet accepté). Les listes sans filtre (skip/limit) lisent la
+# table dans l'ordre de la clé primaire : un parcours y est attendu et n'est pas une régression.
+CASES = [
+    ("mission par id", lambda db: crud_mission.get_mission(db, 4242), False),
+    ("missions actives", lambda db: crud_mission.get_active_missions(db), False),
+    ("missions par statut", lambda db: crud_mission.get_missions_by_status(db, MissionStatus.EN_COURS), False),
+    ("page de missions", lambda db: crud_mission.get_missions_page(db, cursor=encode_cursor(5000, True), limit=50), False),
+    ("page de missions filtrée", lambda db: crud_mission.get_missions_page(
+        db, limit=50, status=MissionStatus.EN_ATTENTE, priority=MissionPriority.CRITIQUE), False),
+    # Statut + période triés par id : le planificateur peut préférer remonter la clé primaire
+    # depuis les missions les plus récentes et s'arrêter après `limit` lignes
+    ("page de missions par période", lambda db: crud_mission.get_missions_page(
+        db, limit=50, status=MissionStatus.EN_ATTENTE, created_from=NOW - timedelta(days=2)), True),
+    ("liste de missions", lambda db: crud_mission.get_missions(db, skip=0, limit=100), True),
+    ("ambulance par id", lambda db: crud_ambulance.get_ambulance(db, 42), False),
+    ("ambulance par immatriculation", lambda db: crud_ambulance.get_ambulance_by_plate(db, "AMB-00042"), False),
+    ("ambulances disponibles", lambda db: crud_ambulance.get_available_ambulances(db), False),
+    ("page d'ambulances par statut", lambda db: crud_ambulance.get_ambulances_page(
+        db, limit=50, status=AmbulanceStatus.EN_PANNE), False),
+    ("liste d'ambulances", lambda db: crud_ambulance.get_ambulances(db, skip=0, limit=100), True),
+    ("trace d'une ambulance", lambda db: crud_location.get_track_points(
+        db, 7, NOW - timedelta(hours=6), NOW), False),
+    ("utilisateur par nom", lambda db: crud_user.get_user_by_username(db, "user00042"), False),
+    ("utilisateur par email", lambda db: crud_user.get_user_by_email(db, "user00042@example.com"), False),
+    ("page d'utilisateurs", lambda db: crud_user.get_users_page(db, cursor=encode_cursor(100, False), limit=50), False),
+    ("liste d'utilisateurs", lambda db: crud_user.get_users(db, skip=0, limit=100), True),
+]
+
+MISSION_STATUS_WEIGHTS = [
+    (MissionStatus.TERMINEE, 85), (MissionStatus.ANNULEE, 7), (MissionStatus.EN_ATTENTE, 3),
+    (MissionStatus.ASSIGNEE, 2), (MissionStatus.EN_COURS, 3),
+]
+AMBULANCE_STATUS_WEIGHTS = [
+    (AmbulanceStatus.DISPONIBLE, 35), (AmbulanceStatus.EN_MISSION, 45),
+    (AmbulanceStatus.EN_PANNE, 5), (AmbulanceStatus.MAINTENANCE, 15),
+]
+
+def weighted(rng: random.Random, weights):
+    values, counts = zip(*weights)
+    return rng.choices(values, weights=counts)[0]
+
+def seed(engine, missions: int, ambulances: int, users: int, rng: random.Random) -> None:
+    """Données au profil de production : l'essentiel des missions est terminé, peu sont actives"""
+    with engine.begin() as conn:
+        conn.execute(insert(Hospital), [
+            {"id": i, "name": f"Hôpital {i}", "address": "-", "phone": "-", "latitude": 48.85, "longitude": 2.35}
+            for i in range(1, 31)
+        ])
+        conn.execute(insert(User), [
+            {"id": i, "username": f"user{i:05d}", "email": f"user{i:05d}@example.com", "hashed_password": "-",
+             "first_name": "-", "last_name": "-", "role": rng.choice(list(UserRole)), "is_active": True}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(Ambulance), [
+            {"id": i, "plate_number": f"AMB-{i:05d}", "model": "-", "capacity": 2,
+             "status": weighted(rng, AMBULANCE_STATUS_WEIGHTS), "latitude": 48.85, "longitude": 2.35,
+             "updated_at": NOW - timedelta(minutes=rng.randint(0, 10000))}
+            for i in range(1, ambulances + 1)
+        ])
+        rows = []
+        for i in range(1, missions + 1):
+            created_at = NOW - timedelta(minutes=(missions - i) * 2)
+            status = weighted(rng, MISSION_STATUS_WEIGHTS)
+            rows.append({
+                "id": i, "patient_name": "-", "patient_phone": "-", "patient_condition": "-",
+                "priority": rng.choice(list(MissionPriority)), "status": status,
+                "pickup_address": "-", "pickup_latitude": 48.85, "pickup_longitude": 2.35,
+                "hospital_id": rng.randint(1, 30),
+                "ambulance_id": None if status == MissionStatus.EN_ATTENTE else rng.randint(1, ambulances),
+                "created_at": created_at,
+            })
+        for start in range(0, len(rows), 5000):
+            conn.execute(insert(Mission), rows[start:start + 5000])
+        conn.execute(insert(AmbulanceLocationHistory), [
+            {"ambulance_id": ambulance_id, "recorded_at": NOW - timedelta(minutes=minute),
+             "latitude": 48.85, "longitude": 2.35}
+            for ambulance_id in range(1, min(ambulances, 50) + 1) for minute in range(0, 1440, 5)
+        ])
+        if engine.dialect.name in ("sqlite", "postgresql"):
+            conn.exec_driver_sql("ANALYZE")
+        elif engine.dialect.name == "mysql":
+            for table in ("hospitals", "users", "ambulances", "missions", "ambulance_locations"):
+                conn.exec_driver_sql(f"ANALYZE TABLE {table}")
+
+def explain(conn, statement: str, parameters):
+    """Retourne (lignes du plan, tables parcourues entièrement)"""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        plan = [row[-1] for row in rows]
+        # "SCAN missions" (ou "SCAN missions USING INDEX ...") : lecture de toute la table ou de tout l'index
+        scans = [detail.split()[1] for detail in plan if detail.startswith("SCAN ")]
+    elif dialect == "mysql":
+        result = conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+        rows = [dict(zip(result.keys(), row)) for row in result.fetchall()]
+        plan = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows]
+        scans = [row["table"] for row in rows if row["type"] in ("ALL", "index")]
+    elif dialect == "postgresql":
+        plan = [row[0] for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()]
+        scans = [line.split(" on ")[1].split()[0] for line in plan if "Seq Scan on " in line]
+    else:
+        raise SystemExit(f"Dialecte non pris en charge : {dialect}")
+    return plan, scans
+
+def check_plans(engine, verbose: bool) -> int:
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    failures = 0
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for name, call, allow_scan in CASES:
+            captured.clear()
+            db = session_factory()
+            try:
+                call(db)
+            finally:
+                db.close()
+            statements = list(captured)
+            with engine.connect() as conn:
+                for statement, parameters in statements:
+                    plan, scans = explain(conn, statement, parameters)
+                    regression = bool(scans) and not allow_scan
+                    failures += regression
+                    label = "ÉCHEC" if regression else ("scan attendu" if scans else "ok")
+                    print(f"[{label:>12}] {name}" + (f" (parcours : {', '.join(scans)})" if scans else ""))
+                    if verbose or regression:
+                        print("    " + " ".join(statement.split()))
+                        for line in plan:
+                            print(f"      {line}")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifie que les requêtes CRUD chaudes utilisent un index")
+    parser.add_argument("--url", default="sqlite://", help="Base jetable (le schéma y est créé puis supprimé)")
+    parser.add_argument("--missions", type=int, default=20000)
+    parser.add_argument("--ambulances", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true", help="Afficher le SQL et le plan de chaque requête")
+    args = parser.parse_args()
+
+    if args.url.startswith("sqlite"):
+        engine = create_engine(args.url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(args.url)
+    if inspect(engine).get_table_names():
+        raise SystemExit("La base cible n'est pas vide : utiliser une base de test dédiée")
+    Base.metadata.create_all(bind=engine)
+    try:
+        seed(engine, args.missions, args.ambulances, args.users, random.Random(args.seed))
+        failures = check_plans(engine, args.verbose)
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    if failures:
+        print(f"\n{failures} requête(s) sans index adapté")
+        sys.exit(1)
+    print("\nToutes les requêtes chaudes utilisent un index")
+
+if __name__ == "__main__":
+    main()
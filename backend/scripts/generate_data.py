@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Générateur de données synthétiques à grande échelle (tests de charge, dimensionnement)
+
+Produit des hôpitaux, une flotte, des utilisateurs et un historique de missions réalistes :
+répartis autour de grandes villes selon leur population, arrivées plus nombreuses en
+journée, priorités, délais d'affectation et durées tirés de lois plausibles, missions
+récentes encore actives. Les lignes sont générées par blocs (numpy) et écrites par INSERT
+ensemblistes, une transaction par lot ; les agrégats analytiques sont reconstruits à la fin.
+
+Les structures en mémoire des workers (index spatial, file des missions) se resynchronisent
+d'elles-mêmes ; redémarrer l'application pour en disposer immédiatement.
+
+Exemples :
+    python scripts/generate_data.py --ambulances 5000 --hospitals 200 --missions 10000000
+    python scripts/generate_data.py --url sqlite:///charge.db --missions 200000 --days 90
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.crud.analytics import rebuild_mission_rollups
+from app.database.base import Base
+from app.models import analytics, location, maintenance, personnel  # noqa: F401 (tables référencées par les clés étrangères)
+from app.models.ambulance import Ambulance, AmbulanceStatus
+from app.models.hospital import Hospital
+from app.models.mission import Mission, MissionPriority, MissionStatus
+from app.models.user import User, UserRole
+
+# (ville, latitude, longitude, poids ~ population de l'agglomération)
+CITIES = [
+    ("Paris", 48.8566, 2.3522, 10.9), ("Lyon", 45.7640, 4.8357, 2.3), ("Marseille", 43.2965, 5.3698, 1.9),
+    ("Toulouse", 43.6047, 1.4442, 1.4), ("Lille", 50.6292, 3.0573, 1.5), ("Bordeaux", 44.8378, -0.5792, 1.3),
+    ("Nice", 43.7102, 7.2620, 1.0), ("Nantes", 47.2184, -1.5536, 1.0), ("Strasbourg", 48.5734, 7.7521, 0.8),
+    ("Montpellier", 43.6108, 3.8767, 0.8), ("Rennes", 48.1173, -1.6778, 0.7), ("Grenoble", 45.1885, 5.7245, 0.7),
+    ("Rouen", 49.4432, 1.0999, 0.7), ("Toulon", 43.1242, 5.9280, 0.6), ("Clermont-Ferrand", 45.7772, 3.0870, 0.5),
+]
+CITY_SPREAD_DEG = 0.06  # écart type de la position autour du centre-ville (~5 km)
+
+SPECIALTIES = ["Cardiologie", "Neurologie", "Pédiatrie", "Traumatologie", "Orthopédie", "Réanimation",
+               "Maternité", "Pneumologie", "Brûlés", "Psychiatrie", "Toxicologie"]
+EQUIPMENT = ["Défibrillateur", "Respirateur", "Brancard", "Oxygène", "Aspirateur de mucosités", "Pousse-seringue"]
+MODELS = ["Mercedes Sprinter", "Volkswagen Crafter", "Ford Transit", "Renault Master", "Fiat Ducato"]
+
+# (pathologie, symptômes) ; tirées uniformément
+CONDITIONS = [
+    ("Douleur thoracique", ["douleur thoracique", "dyspnée", "sueurs"]),
+    ("Suspicion d'AVC", ["hémiparésie", "trouble de la parole"]),
+    ("Traumatisme", ["plaie", "douleur", "saignement"]),
+    ("Fracture", ["douleur", "déformation"]),
+    ("Détresse respiratoire", ["dyspnée", "cyanose"]),
+    ("Malaise", ["perte de connaissance", "vertiges"]),
+    ("Intoxication", ["vomissements", "confusion"]),
+    ("Accouchement", ["contractions"]),
+    ("Brûlure", ["brûlure", "douleur"]),
+]
+
+PRIORITIES = [MissionPriority.CRITIQUE, MissionPriority.URGENTE, MissionPriority.NORMALE, MissionPriority.FAIBLE]
+PRIORITY_WEIGHTS = [0.08, 0.27, 0.45, 0.20]
+# Délai médian d'affectation par priorité (secondes), loi log-normale
+ASSIGNMENT_MEDIAN_S = np.array([45.0, 150.0, 480.0, 1200.0])
+# Activité relative par heure de la journée (creux la nuit, pic en fin de matinée)
+HOURLY_ACTIVITY = np.array([0.45, 0.38, 0.33, 0.30, 0.30, 0.35, 0.50, 0.75, 0.95, 1.0, 1.0, 1.0,
+                            0.98, 0.95, 0.92, 0.90, 0.90, 0.92, 0.95, 0.90, 0.80, 0.70, 0.60, 0.52])
+ACTIVE_WINDOW = timedelta(hours=3)  # au-delà, une mission est terminée ou annulée
+
+AMBULANCE_STATUSES = [AmbulanceStatus.DISPONIBLE, AmbulanceStatus.EN_MISSION, AmbulanceStatus.MAINTENANCE, AmbulanceStatus.EN_PANNE]
+AMBULANCE_STATUS_WEIGHTS = [0.40, 0.45, 0.10, 0.05]
+
+def city_points(rng: np.random.Generator, count: int):
+    """Villes tirées selon leur poids et positions dispersées autour du centre"""
+    weights = np.array([city[3] for city in CITIES])
+    cities = rng.choice(len(CITIES), size=count, p=weights / weights.sum())
+    centers = np.array([(city[1], city[2]) for city in CITIES])[cities]
+    points = centers + rng.normal(0.0, CITY_SPREAD_DEG, size=(count, 2))
+    return cities, points[:, 0].round(6), points[:, 1].round(6)
+
+def insert_rows(engine, model, rows, chunk_size: int) -> None:
+    for start in range(0, len(rows), chunk_size):
+        with engine.begin() as conn:
+            conn.execute(insert(model), rows[start:start + chunk_size])
+
+def generate_hospitals(engine, rng: np.random.Generator, count: int, chunk_size: int) -> None:
+    cities, latitudes, longitudes = city_points(rng, count)
+    rows = [
+        dict(name=f"CH {CITIES[city][0]} {i}", address=f"{rng.integers(1, 200)} avenue de l'Hôpital, {CITIES[city][0]}",
+             phone=f"+33{rng.integers(100000000, 999999999)}", latitude=lat, longitude=lon,
+             emergency_beds=int(rng.integers(0, 60)), icu_beds=int(rng.integers(0, 25)), general_beds=int(rng.integers(50, 900)),
+             specialties=sorted(rng.choice(SPECIALTIES, size=int(rng.integers(2, 7)), replace=False).tolist()),
+             is_active=bool(rng.random() > 0.03))
+        for i, (city, lat, lon) in enumerate(zip(cities.tolist(), latitudes.tolist(), longitudes.tolist()), start=1)
+    ]
+    insert_rows(engine, Hospital, rows, chunk_size)
+
+def generate_ambulances(engine, rng: np.random.Generator, count: int, first_number: int, now: datetime, chunk_size: int) -> None:
+    _, latitudes, longitudes = city_points(rng, count)
+    statuses = rng.choice(len(AMBULANCE_STATUSES), size=count, p=AMBULANCE_STATUS_WEIGHTS)
+    rows = [
+        dict(plate_number=f"GEN-{first_number + i:06d}", model=MODELS[i % len(MODELS)], capacity=int(rng.integers(1, 3)),
+             status=AMBULANCE_STATUSES[status], latitude=lat, longitude=lon,
+             location_updated_at=now - timedelta(seconds=int(rng.integers(0, 600))),
+             equipment=sorted(rng.choice(EQUIPMENT, size=int(rng.integers(3, len(EQUIPMENT) + 1)), replace=False).tolist()),
+             fuel_level=int(rng.integers(10, 101)), mileage=int(rng.integers(1000, 400000)))
+        for i, (status, lat, lon) in enumerate(zip(statuses.tolist(), latitudes.tolist(), longitudes.tolist()))
+    ]
+    insert_rows(engine, Ambulance, rows, chunk_size)
+
+def generate_users(engine, count: int, first_number: int, chunk_size: int) -> None:
+    # Un seul hachage pour tous les comptes générés (mot de passe « demo123 »)
+    hashed = get_password_hash("demo123")
+    roles = [UserRole.AMBULANCIER] * 4 + [UserRole.REGULATEUR]
+    rows = [
+        dict(username=f"gen{first_number + i:06d}", email=f"gen{first_number + i:06d}@example.com", hashed_password=hashed,
+             first_name="Demo", last_name=f"{first_number + i}", role=roles[i % len(roles)], is_active=True)
+        for i in range(count)
+    ]
+    insert_rows(engine, User, rows, chunk_size)
+
+def ids_by_city(engine, model, latitude, longitude):
+    """Ids de `model` regroupés par ville la plus proche"""
+    with engine.connect() as conn:
+        rows = conn.execute(select(model.id, latitude, longitude)).all()
+    centers = np.array([(city[1], city[2]) for city in CITIES])
+    groups = [[] for _ in CITIES]
+    for row_id, lat, lon in rows:
+        groups[int(np.argmin(((centers - (lat, lon)) ** 2).sum(axis=1)))].append(row_id)
+    # Une ville sans hôpital ni ambulance se rabat sur l'ensemble
+    every = [row_id for group in groups for row_id in group]
+    return [np.array(group or every) for group in groups]
+
+def mission_timestamps(rng: np.random.Generator, start: datetime, end: datetime, count: int) -> np.ndarray:
+    """Horodatages triés dans [start, end), plus denses aux heures d'activité (rejet)"""
+    span = (end - start).total_seconds()
+    accepted = np.empty(0)
+    while accepted.size < count:
+        offsets = rng.uniform(0.0, span, size=2 * (count - accepted.size) + 16)
+        hours = ((start.hour * 3600 + start.minute * 60 + start.second + offsets) // 3600 % 24).astype(int)
+        accepted = np.concatenate([accepted, offsets[rng.random(offsets.size) < HOURLY_ACTIVITY[hours]]])
+    base = np.datetime64(start, "us")
+    return np.sort(base + (accepted[:count] * 1e6).astype("timedelta64[us]"))
+
+def mission_rows(rng: np.random.Generator, created: np.ndarray, now: datetime, hospitals, ambulances):
+    count = created.size
+    cities, latitudes, longitudes = city_points(rng, count)
+    priorities = rng.choice(len(PRIORITIES), size=count, p=PRIORITY_WEIGHTS)
+    conditions = rng.integers(0, len(CONDITIONS), size=count)
+    ages = np.clip(rng.normal(52, 22, size=count), 0, 102).astype(int)
+
+    latency = rng.lognormal(np.log(ASSIGNMENT_MEDIAN_S[priorities]), 0.6)
+    travel = rng.lognormal(np.log(9 * 60), 0.5, size=count)
+    duration = np.clip(rng.lognormal(np.log(35), 0.45, size=count), 5, 240)
+    assigned = created + (latency * 1e6).astype("timedelta64[us]")
+    started = assigned + (travel * 1e6).astype("timedelta64[us]")
+    completed = started + (duration * 60e6).astype("timedelta64[us]")
+
+    # Missions anciennes : terminées (quelques annulations) ; récentes : avancement selon l'heure actuelle
+    now64 = np.datetime64(now, "us")
+    old = created < now64 - np.timedelta64(int(ACTIVE_WINDOW.total_seconds()), "s")
+    cancelled = old & (rng.random(count) < 0.06)
+    status = np.where(completed <= now64, 3, np.where(started <= now64, 2, np.where(assigned <= now64, 1, 0)))
+    status = np.where(old, 3, status)
+    status = np.where(cancelled, 4, status)
+    statuses = [MissionStatus.EN_ATTENTE, MissionStatus.ASSIGNEE, MissionStatus.EN_COURS, MissionStatus.TERMINEE, MissionStatus.ANNULEE]
+
+    hospital_ids = [int(group[rng.integers(0, group.size)]) for group in (hospitals[c] for c in cities.tolist())]
+    ambulance_ids = [int(group[rng.integers(0, group.size)]) for group in (ambulances[c] for c in cities.tolist())]
+    rows = []
+    for i, (status_index, priority, condition, age, lat, lon, created_at, assigned_at, started_at, completed_at, minutes) in enumerate(zip(
+        status.tolist(), priorities.tolist(), conditions.tolist(), ages.tolist(), latitudes.tolist(), longitudes.tolist(),
+        created.tolist(), assigned.tolist(), started.tolist(), completed.tolist(), duration.round().astype(int).tolist()
+    )):
+        has_ambulance = 1 <= status_index <= 3 or (status_index == 4 and i % 2 == 0)
+        rows.append(dict(
+            patient_name=f"Patient {created_at:%y%m%d}-{i}", patient_phone="+336" + f"{(i * 7919) % 100000000:08d}",
+            patient_age=age, patient_condition=CONDITIONS[condition][0], symptoms=CONDITIONS[condition][1],
+            priority=PRIORITIES[priority], status=statuses[status_index],
+            pickup_address=f"{(i % 180) + 1} rue {CITIES[cities[i]][0]}", pickup_latitude=lat, pickup_longitude=lon,
+            hospital_id=hospital_ids[i], ambulance_id=ambulance_ids[i] if has_ambulance else None,
+            assigned_personnel=[], estimated_duration=30,
+            created_at=created_at,
+            assigned_at=assigned_at if has_ambulance else None,
+            started_at=started_at if 2 <= status_index <= 3 else None,
+            completed_at=completed_at if status_index == 3 else None,
+            actual_duration=minutes if status_index == 3 else None,
+        ))
+    return rows
+
+def generate_missions(engine, rng: np.random.Generator, count: int, start: datetime, now: datetime, chunk_size: int) -> None:
+    hospitals = ids_by_city(engine, Hospital, Hospital.latitude, Hospital.longitude)
+    ambulances = ids_by_city(engine, Ambulance, Ambulance.latitude, Ambulance.longitude)
+    chunks = max(1, -(-count // chunk_size))
+    span = (now - start) / chunks
+    started, written, next_report = time.perf_counter(), 0, 0.1
+    for index in range(chunks):
+        # Un lot par tranche de temps : les ids croissent avec created_at, comme en production
+        size = min(chunk_size, count - written)
+        created = mission_timestamps(rng, start + span * index, start + span * (index + 1), size)
+        rows = mission_rows(rng, created, now, hospitals, ambulances)
+        with engine.begin() as conn:
+            conn.execute(insert(Mission), rows)
+        written += size
+        if written / count >= next_report or written == count:
+            elapsed = time.perf_counter() - started
+            print(f"  missions : {written:>11,} / {count:,}  ({written / elapsed:,.0f} lignes/s)")
+            next_report += 0.1
+
+def table_count(engine, model) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model)).scalar_one()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.DATABASE_URL, help="Base cible (DATABASE_URL par défaut)")
+    parser.add_argument("--hospitals", type=int, default=200)
+    parser.add_argument("--ambulances", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--missions", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=365, help="Profondeur de l'historique des missions")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Lignes par INSERT (une transaction par lot)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--append", action="store_true", help="Autoriser l'ajout à une base déjà peuplée")
+    parser.add_argument("--skip-rollups", action="store_true", help="Ne pas reconstruire les agrégats analytiques")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    Base.metadata.create_all(bind=engine)
+    existing = {model.__tablename__: table_count(engine, model) for model in (Hospital, Ambulance, Mission, User)}
+    if any(existing.values()) and not args.append:
+        raise SystemExit(f"La base contient déjà des données ({existing}) : utiliser --append ou une base dédiée")
+    if args.missions and not (args.hospitals or existing["hospitals"]) or args.missions and not (args.ambulances or existing["ambulances"]):
+        raise SystemExit("Des missions demandent au moins un hôpital et une ambulance")
+
+    rng = np.random.default_rng(args.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    start = now - timedelta(days=args.days)
+    total_started = time.perf_counter()
+    for label, count, generate in (
+        ("hôpitaux", args.hospitals, lambda: generate_hospitals(engine, rng, args.hospitals, args.chunk_size)),
+        ("ambulances", args.ambulances, lambda: generate_ambulances(engine, rng, args.ambulances, existing["ambulances"] + 1, now, args.chunk_size)),
+        ("utilisateurs", args.users, lambda: generate_users(engine, args.users, existing["users"] + 1, args.chunk_size)),
+        ("missions", args.missions, lambda: generate_missions(engine, rng, args.missions, start, now, args.chunk_size)),
+    ):
+        if not count:
+            continue
+        step_started = time.perf_counter()
+        generate()
+        print(f"{label:<13} {count:>11,} en {time.perf_counter() - step_started:7.1f} s")
+
+    if args.missions and not args.skip_rollups:
+        step_started = time.perf_counter()
+        db = sessionmaker(bind=engine)()
+        try:
+            stats = rebuild_mission_rollups(db, start.replace(hour=0, minute=0, second=0), None)
+        finally:
+            db.close()
+        print(f"{'agrégats':<13} {stats['count_rows'] + stats['metric_rows']:>11,} en {time.perf_counter() - step_started:7.1f} s")
+    print(f"Terminé en {time.perf_counter() - total_started:.1f} s")
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Script de maintenance des partitions mensuelles de l'historique des positions (ambulance_locations)
+
+À lancer quotidiennement (cron) : crée les partitions des prochains mois et purge celles
+sorties de la fenêtre de rétention. Sans effet sur une base autre que MySQL.
+"""
+import argparse
+import sys
+import os
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.database.base import engine
+from app.services.location_history import drop_expired_partitions, ensure_monthly_partitions
+
+def manage_partitions():
+    parser = argparse.ArgumentParser(description="Maintenance des partitions de ambulance_locations")
+    parser.add_argument("--months-ahead", type=int, default=3, help="Nombre de mois futurs à préparer")
+    parser.add_argument("--retention-months", type=int, default=None, help="Purger les mois plus anciens")
+    args = parser.parse_args()
+
+    created = ensure_monthly_partitions(engine, months_ahead=args.months_ahead)
+    print(f"Partitions créées: {', '.join(created) or 'aucune'}")
+    if args.retention_months is not None:
+        dropped = drop_expired_partitions(engine, retention_months=args.retention_months)
+        print(f"Partitions supprimées: {', '.join(dropped) or 'aucune'}")
+
+if __name__ == "__main__":
+    manage_partitions()